@@ -1,8 +1,10 @@
 export default {
     "api-docs": "API Docs",
     caching: "Caching",
+    execution: "Execution",
     logging: "Logging & Webhooks",
     messages: "Messages",
+    "network-info": "Network Info",
     "structured-output": "Structured Output",
     "web-ui": "Web UI",
 };
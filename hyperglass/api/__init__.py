@@ -14,8 +14,18 @@ from hyperglass.constants import __version__
 from hyperglass.exceptions import HyperglassError
 
 # Local
-from .events import check_redis
-from .routes import info, query, device, devices, queries
+from .events import (
+    init_rpki,
+    check_redis,
+    close_redis,
+    init_plugins,
+    stop_executor,
+    stop_webhooks,
+    stop_coalescer,
+    init_network_info,
+    close_http_clients,
+)
+from .routes import info, query, device, devices, queries, query_batch
 from .middleware import COMPRESSION_CONFIG, create_cors_config
 from .error_handlers import app_handler, http_handler, default_handler, validation_handler
 
@@ -41,6 +51,7 @@ HANDLERS = [
     queries,
     info,
     query,
+    query_batch,
 ]
 
 if not STATE.settings.disable_ui:
@@ -63,7 +74,8 @@ app = Litestar(
         ValidationException: validation_handler,
         Exception: default_handler,
     },
-    on_startup=[check_redis],
+    on_startup=[check_redis, init_plugins, init_rpki, init_network_info],
+    on_shutdown=[stop_coalescer, stop_executor, stop_webhooks, close_http_clients, close_redis],
     debug=STATE.settings.debug,
     cors_config=create_cors_config(state=STATE),
     compression_config=COMPRESSION_CONFIG,
@@ -0,0 +1,231 @@
+"""Coalesce identical, concurrent queries into a single device query."""
+
+# Standard Library
+import time
+import typing as t
+import asyncio
+import secrets
+from functools import lru_cache
+
+# Project
+from hyperglass.log import log
+from hyperglass.state import use_state
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.state.redis import AsyncRedisManager
+
+__all__ = ("QueryCoalescer", "use_coalescer")
+
+ResultT = t.TypeVar("ResultT")
+
+NOTIFY_CHANNEL = "hyperglass.query.done"
+
+# Fallback interval at which followers re-check the cache, in case a notification is missed.
+POLL_INTERVAL = 0.5
+
+# Release the lock only if it's still held by this leader, & notify waiting workers.
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    redis.call("del", KEYS[1])
+end
+return redis.call("publish", ARGV[2], ARGV[3])
+"""
+
+
+class QueryCoalescer:
+    """Ensure only one of many identical, concurrent queries reaches the device.
+
+    Within a worker process, the first query for a cache key becomes the leader and any
+    identical query that arrives while it's running awaits the leader's result.
+
+    Across worker processes, the leader holds a short-lived Redis lock for the cache key. Leaders
+    in other workers wait for a notification that the lock holder has cached its result, then
+    read the cached result instead of querying the device. If the lock holder fails or its lock
+    expires without a cached result, a waiting worker takes over as leader. Workers wait no longer
+    than the lock timeout; after that, they run the query themselves.
+    """
+
+    redis: "AsyncRedisManager"
+
+    def __init__(self, redis: "AsyncRedisManager") -> None:
+        """Initialize coalescer with no queries in flight."""
+        self.redis = redis
+        self._inflight: t.Dict[str, asyncio.Future] = {}
+        self._waiters: t.Dict[str, t.List[asyncio.Future]] = {}
+        self._listener: t.Optional[asyncio.Task] = None
+        self._background: t.Dict[str, asyncio.Task] = {}
+
+    def __repr__(self) -> str:
+        """Represent coalescer by in-flight cache keys."""
+        return "QueryCoalescer(inflight={!r})".format(tuple(self._inflight.keys()))
+
+    async def run(
+        self,
+        key: str,
+        *,
+        leader: t.Callable[[], t.Awaitable[ResultT]],
+        follower: t.Callable[[], t.Awaitable[t.Optional[ResultT]]],
+        lock_timeout: float,
+    ) -> ResultT:
+        """Run `leader` once for all concurrent calls with the same `key`.
+
+        `leader` must cache its result under `key`. `follower` reads the cached result, returning
+        `None` if it doesn't exist (yet), and is used when another worker process is the leader.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            log.bind(cache_key=key).debug("Awaiting in-flight query")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the result as retrieved, even if there are no followers.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await self._run(key, leader, follower, lock_timeout)
+        except BaseException as err:
+            if isinstance(err, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._inflight[key]
+        return result
+
+    def run_in_background(
+        self,
+        key: str,
+        *,
+        leader: t.Callable[[], t.Awaitable[ResultT]],
+        follower: t.Callable[[], t.Awaitable[t.Optional[ResultT]]],
+        lock_timeout: float,
+    ) -> bool:
+        """Start `run` without waiting for its result, unless `key` is already in flight.
+
+        Returns `True` if a new run was started.
+        """
+        if key in self._inflight or key in self._background:
+            return False
+
+        async def _run() -> None:
+            try:
+                await self.run(key, leader=leader, follower=follower, lock_timeout=lock_timeout)
+            except Exception as err:
+                log.bind(cache_key=key, error=str(err)).warning("Background query failed")
+
+        task = asyncio.create_task(_run())
+        self._background[key] = task
+        task.add_done_callback(lambda _: self._background.pop(key, None))
+        return True
+
+    async def _run(
+        self,
+        key: str,
+        leader: t.Callable[[], t.Awaitable[ResultT]],
+        follower: t.Callable[[], t.Awaitable[t.Optional[ResultT]]],
+        lock_timeout: float,
+    ) -> ResultT:
+        lock = self.redis.key((key, "lock"))
+        token = secrets.token_hex(8)
+        start = time.monotonic()
+        while True:
+            acquired = await self.redis.instance.set(
+                lock, token, nx=True, px=int(lock_timeout * 1000)
+            )
+            if acquired:
+                try:
+                    return await leader()
+                finally:
+                    await self.redis.instance.eval(
+                        RELEASE_SCRIPT, 1, lock, token, NOTIFY_CHANNEL, key
+                    )
+
+            remaining = lock_timeout - (time.monotonic() - start)
+            if remaining <= 0:
+                # Other workers have held the lock for longer than a single query may take, so
+                # run the query without it, rather than waiting indefinitely.
+                log.bind(cache_key=key, wait=time.monotonic() - start).warning(
+                    "Timed out waiting for query from another worker"
+                )
+                try:
+                    return await leader()
+                finally:
+                    await self.redis.instance.publish(NOTIFY_CHANNEL, key)
+
+            # Another worker is running this query; wait for it to cache its result.
+            self._listen()
+            await self._wait(key, min(POLL_INTERVAL, remaining))
+            result = await follower()
+            if result is not None:
+                log.bind(cache_key=key, wait=time.monotonic() - start).debug(
+                    "Received result of query from another worker"
+                )
+                return result
+
+    async def _wait(self, key: str, timeout: float) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(key, [])
+            if waiter in waiters:
+                waiters.remove(waiter)
+            if not waiters:
+                self._waiters.pop(key, None)
+
+    def _notify(self, key: str) -> None:
+        for waiter in self._waiters.pop(key, []):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _subscribe(self) -> None:
+        """Wake local waiters as other workers complete queries."""
+        pubsub = self.redis.instance.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(NOTIFY_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                key = message["data"]
+                if isinstance(key, bytes):
+                    key = key.decode()
+                self._notify(key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as err:
+            # Followers fall back to polling until the next wait resubscribes.
+            log.bind(error=str(err)).warning("Query notification listener stopped")
+        finally:
+            self._listener = None
+            await pubsub.close()
+
+    def _listen(self) -> None:
+        """Subscribe to query completion notifications, if not already subscribed."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._subscribe())
+
+    async def close(self) -> None:
+        """Stop background queries & listening for query completion notifications."""
+        tasks = [*self._background.values(), self._listener]
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+        for task in tasks:
+            if task is not None:
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+
+@lru_cache
+def use_coalescer() -> QueryCoalescer:
+    """Get this process's query coalescer."""
+    return QueryCoalescer(use_state("async_cache"))
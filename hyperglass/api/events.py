@@ -8,11 +8,74 @@ from litestar import Litestar
 
 # Project
 from hyperglass.state import use_state
+from hyperglass.plugins import InputPluginManager, OutputPluginManager
+from hyperglass.external.rpki import local_vrp_table
+from hyperglass.execution.drivers import close_session_pool, close_device_clients
+from hyperglass.external._clients import use_client_pool
+from hyperglass.external.bgptools import local_network_table
+from hyperglass.external.webhooks import use_webhook_dispatcher
+from hyperglass.execution.executor import shutdown_executor
 
-__all__ = ("check_redis",)
+# Local
+from .coalesce import use_coalescer
+
+__all__ = (
+    "check_redis",
+    "close_http_clients",
+    "close_redis",
+    "init_network_info",
+    "init_plugins",
+    "init_rpki",
+    "stop_coalescer",
+    "stop_executor",
+    "stop_webhooks",
+)
 
 
 async def check_redis(_: Litestar) -> t.NoReturn:
     """Ensure Redis is running before starting server."""
-    cache = use_state("cache")
-    cache.check()
+    cache = use_state("async_cache")
+    await cache.check()
+
+
+async def init_plugins(_: Litestar) -> None:
+    """Build each worker's plugin pipelines before serving requests."""
+    for manager in (InputPluginManager, OutputPluginManager):
+        manager().pipeline()
+
+
+async def init_rpki(_: Litestar) -> None:
+    """Load the VRP table before serving requests, if RPKI states are validated locally."""
+    local_vrp_table()
+
+
+async def init_network_info(_: Litestar) -> None:
+    """Load the network table before serving requests, if network info is looked up locally."""
+    local_network_table()
+
+
+async def stop_executor(_: Litestar) -> None:
+    """Close the worker's pooled device sessions & stop its driver thread pool."""
+    close_session_pool()
+    shutdown_executor()
+
+
+async def stop_coalescer(_: Litestar) -> None:
+    """Stop listening for queries completed by other workers."""
+    await use_coalescer().close()
+
+
+async def stop_webhooks(_: Litestar) -> None:
+    """Deliver the worker's queued webhooks, then close its webhook client."""
+    await use_webhook_dispatcher().close()
+
+
+async def close_http_clients(_: Litestar) -> None:
+    """Close the worker's device & external HTTP clients, logging external connection reuse."""
+    await close_device_clients()
+    await use_client_pool().close()
+
+
+async def close_redis(_: Litestar) -> None:
+    """Close the worker's asyncio Redis connections."""
+    await use_state("async_cache").close()
@@ -3,11 +3,17 @@
 # Standard Library
 import time
 import typing as t
-from datetime import UTC, datetime
+import asyncio
+from collections import deque
+from importlib.util import find_spec
 
 # Third Party
+import msgspec
 from litestar import Request, Response, get, post
+from pydantic import ValidationError
 from litestar.di import Provide
+from litestar.response import Stream
+from litestar.exceptions import ClientException
 from litestar.background_tasks import BackgroundTask
 
 # Project
@@ -18,13 +24,17 @@ from hyperglass.models.api import Query
 from hyperglass.models.data import OutputDataModel
 from hyperglass.util.typing import is_type
 from hyperglass.execution.main import execute
+from hyperglass.execution.limiter import device_queue
+from hyperglass.state.query_cache import CachedQuery, use_cache_stats, use_local_cache
 from hyperglass.models.api.response import QueryResponse
 from hyperglass.models.config.params import Params, APIParams
+from hyperglass.models.data.columnar import RouteColumns
 from hyperglass.models.config.devices import Devices, APIDevice
 
 # Local
 from .state import get_state, get_params, get_devices
 from .tasks import send_webhook
+from .coalesce import use_coalescer
 from .fake_output import fake_output
 
 __all__ = (
@@ -33,6 +43,20 @@ __all__ = (
     "queries",
     "info",
     "query",
+    "query_batch",
+)
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Media types in which structured query output can be returned, in order of preference. Arrow IPC
+# requires the optional `pyarrow` package.
+STRUCTURED_MEDIA_TYPES = (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    *((ARROW_MEDIA_TYPE,) if find_spec("pyarrow") is not None else ()),
 )
 
 
@@ -60,106 +84,474 @@ async def info(params: Params) -> APIParams:
     return params.export_api()
 
 
-@post("/api/query", dependencies={"_state": Provide(get_state)})
-async def query(_state: HyperglassState, request: Request, data: Query) -> QueryResponse:
-    """Ingest request data pass it to the backend application to perform the query."""
+# Fields of a query's cached output.
+CACHED_ITEMS = ("output", "timestamp", "expires")
 
-    timestamp = datetime.now(UTC)
 
-    # Initialize cache
-    cache = _state.redis
+class QueryRun(t.TypedDict, total=False):
+    """Output & execution details of a query that was not already cached."""
 
-    # Use hashed `data` string as key for for k/v cache store so
-    # each command output value is unique.
-    cache_key = f"hyperglass.query.{data.digest()}"
+    output: t.Union[RouteColumns, t.Dict[str, t.Any], str]
+    timestamp: str
+    expires: float
+    runtime: int
+    queue_depth: int
+    queue_time: float
 
+
+async def _run_query(_state: HyperglassState, data: Query, cache_key: str) -> QueryRun:
+    """Execute a query and cache its output."""
     _log = log.bind(query=data.summary())
+    cache = _state.async_cache
+    run: QueryRun = {}
+
+    starttime = time.time()
+
+    if _state.params.fake_output:
+        # Return fake, static data for development purposes, if enabled.
+        output = await fake_output(
+            query_type=data.query_type,
+            structured=data.device.structured_output or False,
+        )
+    else:
+        # Wait for the device to be available, then pass request to execution module.
+        timeout = _state.params.request_timeout - 1
+        async with device_queue(data.device).slot(data.device, timeout=timeout) as queued:
+            output = await execute(data, timeout=timeout - queued.wait)
+        run["queue_depth"] = queued.depth
+        run["queue_time"] = round(queued.wait, 4)
+
+    endtime = time.time()
+    elapsedtime = round(endtime - starttime, 4)
+    _log.debug("Runtime: {!s} seconds", elapsedtime)
+
+    if output is None:
+        raise HyperglassError(message=_state.params.messages.general, alert="danger")
+
+    json_output = is_type(output, OutputDataModel)
 
-    _log.info("Starting query execution")
+    if json_output:
+        raw_output = RouteColumns.from_table(output)
+    else:
+        raw_output = str(output)
+
+    cache_config = _state.params.cache
+    run["output"] = raw_output
+    run["timestamp"] = data.timestamp
+    run["expires"] = time.time() + cache_config.timeout
+    # Keep the response in Redis after it expires, so it can be served while it's refreshed.
+    await cache.set_map(
+        cache_key,
+        {"output": raw_output, "timestamp": data.timestamp, "expires": run["expires"]},
+        expire_in=cache_config.timeout + cache_config.stale_while_revalidate,
+    )
 
-    cache_response = cache.get_map(cache_key, "output")
-    json_output = False
-    cached = False
-    runtime = 65535
+    _log.bind(cache_timeout=cache_config.timeout).debug("Response cached")
 
-    if cache_response:
-        _log.bind(cache_key=cache_key).debug("Cache hit")
+    run["runtime"] = int(round(elapsedtime, 0))
+    return run
 
-        # If a cached response exists, reset the expiration time.
-        cache.expire(cache_key, expire_in=_state.params.cache.timeout)
 
-        cached = True
-        runtime = 0
-        timestamp = cache.get_map(cache_key, "timestamp")
+def _cache_key(data: Query) -> str:
+    """Get the cache key of a query's output."""
+    # Use hashed `data` string as key for for k/v cache store so
+    # each command output value is unique.
+    return f"hyperglass.query.{data.digest()}"
+
+
+async def _answer(  # noqa: C901
+    _state: HyperglassState,
+    data: Query,
+    cache_key: str,
+    *,
+    generation: int,
+    local_entry: t.Optional[CachedQuery],
+    cached_run: QueryRun,
+) -> t.Tuple[t.Union[RouteColumns, t.Dict[str, t.Any], str], t.Dict[str, t.Any]]:
+    """Answer a query from its cached output if there is any, or by running it.
+
+    Returns the query's output & the other fields of its response.
+    """
+    cache = _state.async_cache
+    cache_timeout = _state.params.cache.timeout
+    stale_window = _state.params.cache.stale_while_revalidate
+    local_cache = use_local_cache()
+    cache_stats = use_cache_stats()
 
-    elif not cache_response:
-        _log.bind(cache_key=cache_key).debug("Cache miss")
+    _log = log.bind(query=data.summary())
 
-        timestamp = data.timestamp
+    cache_tier = None
+    stale = False
+    queue_depth = 0
+    queue_time = 0.0
 
-        starttime = time.time()
+    def is_fresh(run: QueryRun) -> bool:
+        """Determine if a cached response has not yet expired."""
+        return stale_window == 0 or run.get("expires", 0) > time.time()
 
-        if _state.params.fake_output:
-            # Return fake, static data for development purposes, if enabled.
-            output = await fake_output(
-                query_type=data.query_type,
-                structured=data.device.structured_output or False,
-            )
-        else:
-            # Pass request to execution module
-            output = await execute(data)
+    async def other_run() -> t.Optional[QueryRun]:
+        """Get the result of an identical query run by another worker, if it's cached."""
+        run = await cache.get_map_items(
+            cache_key,
+            *CACHED_ITEMS,
+            expire_in=None if stale_window else cache_timeout,
+        )
+        if not run.get("output") or not is_fresh(run):
+            return None
+        return {**run, "runtime": int(round(time.time() - starttime, 0))}
 
-        endtime = time.time()
-        elapsedtime = round(endtime - starttime, 4)
-        _log.debug("Runtime: {!s} seconds", elapsedtime)
+    starttime = time.time()
 
-        if output is None:
-            raise HyperglassError(message=_state.params.messages.general, alert="danger")
+    if local_entry is not None:
+        _log.bind(cache_key=cache_key, tier="local").debug("Cache hit")
 
-        json_output = is_type(output, OutputDataModel)
+        cache_tier = "local"
+        runtime = 0
+        cache_response = local_entry.output
+        timestamp = local_entry.timestamp
 
-        if json_output:
-            raw_output = output.export_dict()
-        else:
-            raw_output = str(output)
+    elif cached_run.get("output"):
+        _log.bind(cache_key=cache_key, tier="redis").debug("Cache hit")
 
-        cache.set_map_item(cache_key, "output", raw_output)
-        cache.set_map_item(cache_key, "timestamp", timestamp)
-        cache.expire(cache_key, expire_in=_state.params.cache.timeout)
+        cache_tier = "redis"
+        runtime = 0
+        cache_response = cached_run["output"]
+        timestamp = cached_run.get("timestamp")
+
+        if not is_fresh(cached_run):
+            # Serve the expired response & refresh it in the background, once across all workers.
+            stale = True
+            refreshing = use_coalescer().run_in_background(
+                cache_key,
+                leader=lambda: _run_query(_state, data, cache_key),
+                follower=other_run,
+                lock_timeout=_state.params.request_timeout,
+            )
+            _log.bind(cache_key=cache_key, refreshing=refreshing).debug("Serving stale response")
 
-        _log.bind(cache_timeout=_state.params.cache.timeout).debug("Response cached")
+    else:
+        _log.bind(cache_key=cache_key).debug("Cache miss")
 
-        runtime = int(round(elapsedtime, 0))
+        # Identical queries that arrive while this one is running wait for its result, rather
+        # than querying the device again.
+        run = await use_coalescer().run(
+            cache_key,
+            leader=lambda: _run_query(_state, data, cache_key),
+            follower=other_run,
+            lock_timeout=_state.params.request_timeout,
+        )
+        runtime = run["runtime"]
+        queue_depth = run.get("queue_depth", 0)
+        queue_time = run.get("queue_time", 0.0)
+        cache_response = run["output"]
+        timestamp = run.get("timestamp")
+        cached_run = run
+
+    # Structured output is stored as JSON-compatible columns by the JSON & MessagePack codecs.
+    cache_response = RouteColumns.coerce(cache_response)
+
+    if local_cache is not None and cache_tier != "local" and not stale:
+        # Keep the response in memory no longer than it's fresh in Redis.
+        ttl = cache_timeout
+        if stale_window:
+            ttl = min(ttl, cached_run.get("expires", 0) - time.time())
+        local_cache.put(
+            cache_key,
+            output=cache_response,
+            timestamp=timestamp,
+            ttl=ttl,
+            generation=generation,
+        )
 
-    # If it does, return the cached entry
-    cache_response = cache.get_map(cache_key, "output")
+    cache_stats.record(cache_tier)
 
-    json_output = is_type(cache_response, t.Dict)
+    json_output = isinstance(cache_response, (RouteColumns, dict))
     response_format = "text/plain"
 
     if json_output:
         response_format = "application/json"
-    _log.info("Execution completed")
 
     response = {
-        "output": cache_response,
         "id": cache_key,
-        "cached": cached,
+        "cached": cache_tier is not None,
+        "cache_tier": cache_tier,
+        "stale": stale,
         "runtime": runtime,
         "timestamp": timestamp,
         "format": response_format,
         "random": data.random(),
         "level": "success",
         "keywords": [],
+        "queue_depth": queue_depth,
+        "queue_time": queue_time,
     }
+    return cache_response, response
 
-    return Response(
-        response,
+
+@post("/api/query", dependencies={"_state": Provide(get_state)})
+async def query(_state: HyperglassState, request: Request, data: Query) -> QueryResponse:
+    """Ingest request data pass it to the backend application to perform the query."""
+
+    cache = _state.async_cache
+    local_cache = use_local_cache()
+    generation = _state.snapshot.generation
+    cache_key = _cache_key(data)
+
+    _log = log.bind(query=data.summary())
+
+    _log.info("Starting query execution")
+
+    local_entry = None
+    if local_cache is not None:
+        local_entry = local_cache.get(cache_key, generation=generation)
+
+    cached_run = {}
+    if local_entry is None:
+        # If a cached response exists, reset the expiration time. Responses that may be served
+        # stale expire at a fixed time instead, so they're eventually refreshed.
+        cached_run = await cache.get_map_items(
+            cache_key, *CACHED_ITEMS, expire_in=_cache_expiry(_state)
+        )
+
+    output, response = await _answer(
+        _state,
+        data,
+        cache_key,
+        generation=generation,
+        local_entry=local_entry,
+        cached_run=cached_run,
+    )
+    await use_cache_stats().flush(cache)
+
+    _log.info("Execution completed")
+
+    return _response(
+        request,
+        output=output,
+        envelope=response,
         background=BackgroundTask(
             send_webhook,
             params=_state.params,
             data=data,
             request=request,
-            timestamp=timestamp,
+            timestamp=response["timestamp"],
         ),
     )
+
+
+def _cache_expiry(_state: HyperglassState) -> t.Optional[int]:
+    """Get the expiration to reset cached output to when it's read.
+
+    Responses that may be served stale expire at a fixed time instead, so they're eventually
+    refreshed.
+    """
+    cache_config = _state.params.cache
+    return None if cache_config.stale_while_revalidate else cache_config.timeout
+
+
+def _error(_state: HyperglassState, err: BaseException) -> t.Dict[str, t.Any]:
+    """Get the response to a query in a batch that failed, as the error handlers would."""
+    if isinstance(err, HyperglassError):
+        return {
+            "output": err.message,
+            "level": err.level,
+            "keywords": err.keywords,
+            "status_code": err.status_code,
+        }
+    if isinstance(err, ValidationError):
+        return {
+            "output": "\n".join(
+                "{}: {}".format(".".join(str(loc) for loc in error["loc"]), error["msg"])
+                for error in err.errors()
+            ),
+            "level": "error",
+            "keywords": [],
+            "status_code": 422,
+        }
+    log.bind(detail=str(err)).critical("Error")
+    return {
+        "output": _state.params.messages.general,
+        "level": "danger",
+        "keywords": [],
+        "status_code": 500,
+    }
+
+
+def _encode(
+    index: int,
+    output: t.Union[RouteColumns, t.Dict[str, t.Any], str, None],
+    response: t.Dict[str, t.Any],
+) -> bytes:
+    """Serialize the response to a query in a batch as JSON."""
+    if isinstance(output, RouteColumns):
+        return output.to_json(index=index, **response)
+    if output is None:
+        return msgspec.json.encode({"index": index, **response})
+    return msgspec.json.encode({"output": output, "index": index, **response})
+
+
+@post("/api/query/batch", dependencies={"_state": Provide(get_state)})
+async def query_batch(  # noqa: C901
+    _state: HyperglassState, request: Request, data: t.List[t.Dict[str, t.Any]]
+) -> Response:
+    """Run multiple queries, answering identical queries once.
+
+    Every query is validated before any is run. Cached output is read in a single round trip,
+    and queries that aren't cached are run concurrently, up to each device's concurrency limit.
+    Responses are returned as a JSON array in the order of the queries, or as newline-delimited
+    JSON in the order they complete.
+    """
+    batch_size = _state.params.execution.batch_size
+    if len(data) > batch_size:
+        raise ClientException(detail=f"A batch may contain at most {batch_size} queries")
+
+    cache = _state.async_cache
+    local_cache = use_local_cache()
+    generation = _state.snapshot.generation
+
+    # Validate every query, and answer identical queries once.
+    queries: t.Dict[str, Query] = {}
+    indexes: t.Dict[str, t.List[int]] = {}
+    invalid: t.List[t.Tuple[int, t.Dict[str, t.Any]]] = []
+    for index, item in enumerate(data):
+        try:
+            query = Query(**item)
+        except (HyperglassError, ValidationError) as err:
+            invalid.append((index, _error(_state, err)))
+            continue
+        cache_key = _cache_key(query)
+        queries.setdefault(cache_key, query)
+        indexes.setdefault(cache_key, []).append(index)
+
+    log.bind(queries=len(data), unique=len(queries), invalid=len(invalid)).info(
+        "Starting batch query execution"
+    )
+
+    local_entries: t.Dict[str, t.Optional[CachedQuery]] = {
+        cache_key: local_cache.get(cache_key, generation=generation) if local_cache else None
+        for cache_key in queries
+    }
+    remote = [cache_key for cache_key, entry in local_entries.items() if entry is None]
+    cached_runs: t.Dict[str, QueryRun] = dict(
+        zip(
+            remote,
+            await cache.get_many_map_items(remote, *CACHED_ITEMS, expire_in=_cache_expiry(_state)),
+        )
+    )
+
+    answered: "asyncio.Queue[t.Tuple[str, t.Any, t.Dict[str, t.Any]]]" = asyncio.Queue()
+    webhooks: t.List[t.Tuple[Query, t.Any]] = []
+
+    async def answer(cache_key: str) -> None:
+        """Answer a query & queue its response."""
+        try:
+            output, response = await _answer(
+                _state,
+                queries[cache_key],
+                cache_key,
+                generation=generation,
+                local_entry=local_entries[cache_key],
+                cached_run=cached_runs.get(cache_key, {}),
+            )
+        except Exception as err:
+            output, response = None, _error(_state, err)
+        else:
+            webhooks.append((queries[cache_key], response["timestamp"]))
+        answered.put_nowait((cache_key, output, response))
+
+    async def run_device(cache_keys: t.Deque[str]) -> None:
+        """Run a device's queries one at a time, so a pooled session can be reused."""
+        while cache_keys:
+            await answer(cache_keys.popleft())
+
+    # Queries that aren't cached are run at most `concurrency.limit` at a time per device, so
+    # they don't fill the device's queue.
+    tasks: t.List[t.Awaitable] = []
+    misses: t.Dict[str, t.Deque[str]] = {}
+    limits: t.Dict[str, int] = {}
+    for cache_key, query in queries.items():
+        if local_entries[cache_key] is None and not cached_runs[cache_key].get("output"):
+            misses.setdefault(query.device.id, deque()).append(cache_key)
+            limits[query.device.id] = query.device.concurrency.limit
+        else:
+            tasks.append(answer(cache_key))
+    for device_id, cache_keys in misses.items():
+        workers = min(limits[device_id], len(cache_keys))
+        tasks.extend(run_device(cache_keys) for _ in range(workers))
+
+    async def answers() -> t.AsyncIterator[t.Tuple[int, bytes]]:
+        """Get the response to each query, as they're answered."""
+        for index, response in invalid:
+            yield index, _encode(index, None, response)
+
+        running = asyncio.gather(*tasks)
+        try:
+            for _ in range(len(queries)):
+                cache_key, output, response = await answered.get()
+                for index in indexes[cache_key]:
+                    yield index, _encode(index, output, response)
+            await running
+        finally:
+            if not running.done():
+                running.cancel()
+            await use_cache_stats().flush(cache)
+            log.info("Batch query execution completed")
+
+    async def send_webhooks() -> None:
+        """Send a webhook for each query that was answered."""
+        for query, timestamp in webhooks:
+            await send_webhook(
+                params=_state.params, data=query, request=request, timestamp=timestamp
+            )
+
+    background = BackgroundTask(send_webhooks)
+    media_type = request.accept.best_match(
+        (JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE), default=JSON_MEDIA_TYPE
+    )
+
+    if media_type == NDJSON_MEDIA_TYPE:
+
+        async def lines() -> t.AsyncIterator[bytes]:
+            async for _, line in answers():
+                yield line + b"\n"
+
+        return Stream(lines(), media_type=NDJSON_MEDIA_TYPE, background=background)
+
+    results: t.List[bytes] = [b""] * len(data)
+    async for index, item in answers():
+        results[index] = item
+    return Response(
+        b"[" + b",".join(results) + b"]", media_type=JSON_MEDIA_TYPE, background=background
+    )
+
+
+def _response(
+    request: Request,
+    *,
+    output: t.Union[RouteColumns, t.Dict[str, t.Any], str],
+    envelope: t.Dict[str, t.Any],
+    background: BackgroundTask,
+) -> Response:
+    """Serialize query output in the media type preferred by the client's `Accept` header.
+
+    Structured output can be serialized as JSON, MessagePack or Arrow IPC. JSON responses are
+    encoded directly from the output's columns.
+    """
+    media_types = (
+        STRUCTURED_MEDIA_TYPES if isinstance(output, RouteColumns) else STRUCTURED_MEDIA_TYPES[:2]
+    )
+    media_type = request.accept.best_match(media_types, default=JSON_MEDIA_TYPE)
+
+    if media_type == ARROW_MEDIA_TYPE:
+        content = output.to_arrow(**envelope)
+    elif media_type == MSGPACK_MEDIA_TYPE:
+        if isinstance(output, RouteColumns):
+            content = output.to_msgpack(**envelope)
+        else:
+            content = msgspec.msgpack.encode({"output": output, **envelope})
+    elif isinstance(output, RouteColumns):
+        content = output.to_json(**envelope)
+    else:
+        content = {"output": output, **envelope}
+
+    return Response(content, media_type=media_type, background=background)
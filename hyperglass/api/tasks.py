@@ -10,8 +10,8 @@ from litestar import Request
 
 # Project
 from hyperglass.log import log
-from hyperglass.external import Webhook, bgptools
 from hyperglass.models.api import Query
+from hyperglass.external.webhooks import use_webhook_dispatcher
 
 if t.TYPE_CHECKING:
     # Project
@@ -39,8 +39,8 @@ async def send_webhook(
     data: Query,
     request: Request,
     timestamp: datetime,
-) -> t.NoReturn:
-    """If webhooks are enabled, get request info and send a webhook."""
+) -> None:
+    """If webhooks are enabled, get request info and queue a webhook for delivery."""
     try:
         if params.logging.http is not None:
             headers = await process_headers(headers=request.headers)
@@ -52,19 +52,11 @@ async def send_webhook(
             else:
                 host = request.client.host
 
-            network_info = await bgptools.network_info(host)
-
-            async with Webhook(params.logging.http) as hook:
-                await hook.send(
-                    query={
-                        **data.dict(),
-                        "headers": headers,
-                        "source": host,
-                        "network": network_info.get(host, {}),
-                        "timestamp": timestamp,
-                    }
-                )
+            use_webhook_dispatcher().submit(
+                params.logging.http,
+                {**data.dict(), "headers": headers, "source": host, "timestamp": timestamp},
+            )
     except Exception as err:
         log.bind(destination=params.logging.http.provider, error=str(err)).error(
-            "Failed to send webhook"
+            "Failed to queue webhook"
         )
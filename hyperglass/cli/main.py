@@ -138,6 +138,32 @@ def _clear_cache():
         raise typer.Exit(1)
 
 
+@cli.command(name="cache-stats")
+def _cache_stats():
+    """Show the share of queries served by each cache tier"""
+    # Third Party
+    from rich.table import Table
+
+    # Project
+    from hyperglass.state import use_state
+    from hyperglass.state.query_cache import STATS_KEY, tier_hit_rates
+
+    # Local
+    from .static import MD_BOX
+
+    cache = use_state("cache")
+    counts = {
+        key.decode(): int(value)
+        for key, value in cache.instance.hgetall(cache.key(STATS_KEY)).items()
+    }
+    rates = tier_hit_rates(counts)
+
+    table = Table("Tier", "Queries", "Share", box=MD_BOX)
+    for tier, rate in rates.items():
+        table.add_row(tier, str(counts.get(tier, 0)), f"{rate:.1%}")
+    echo.plain(table)
+
+
 @cli.command(name="devices")
 def _devices(
     search: t.Optional[str] = typer.Argument(None, help="Device ID or Name Search Pattern")
@@ -32,14 +32,10 @@ def init_user_config(
     builtins = init_builtin_directives()
     _custom = directives or init_directives()
     _directives = builtins + _custom
-    with state.cache.pipeline() as pipeline:
-        # Write params and directives to the cache first to avoid a race condition where ui_params
-        # or devices try to access params or directives before they're available.
-        pipeline.set("params", _params)
-        pipeline.set("directives", _directives)
+    # Write params and directives to the cache first to avoid a race condition where ui_params
+    # or devices try to access params or directives before they're available.
+    state.publish(params=_params, directives=_directives)
 
     _devices = devices or init_devices()
     ui_params = init_ui_params(params=_params, devices=_devices)
-    with state.cache.pipeline() as pipeline:
-        pipeline.set("devices", _devices)
-        pipeline.set("ui_params", ui_params)
+    state.publish(devices=_devices, ui_params=ui_params)
@@ -0,0 +1,30 @@
+"""Test fixtures shared by all hyperglass tests."""
+
+# Standard Library
+import typing as t
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.config.params import Params
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.state import HyperglassState
+
+
+@pytest.fixture
+def params() -> t.Dict[str, t.Any]:
+    """Get the parameters published by the `state` fixture; override to change them."""
+    return {}
+
+
+@pytest.fixture
+def state(params: t.Dict[str, t.Any]) -> t.Generator["HyperglassState", None, None]:
+    """Publish configuration parameters to the Redis store, & clear it afterwards."""
+    _state = use_state()
+    _state.publish(params=Params(**params))
+    yield _state
+    _state.clear()
@@ -96,6 +96,11 @@ class HyperglassError(Exception):
         """Return HTTP status code based on level level."""
         return STATUS_CODE_MAP.get(self._level, 500)
 
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Return HTTP headers to send with the error response."""
+        return {}
+
 
 class PublicHyperglassError(HyperglassError):
     """Base exception class for user-facing errors.
@@ -48,6 +48,29 @@ class DeviceTimeout(PublicHyperglassError, template="request_timeout", level="da
         super().__init__(error=str(error), device=device.name, proxy=device.proxy)
 
 
+class DeviceBusy(PublicHyperglassError, template="device_busy"):
+    """Raised when a device's query queue is full.
+
+    The device may accept the query once queued queries complete, so the response tells clients
+    & proxies the error is temporary, and when to retry.
+    """
+
+    def __init__(self, *, device: "Device", retry_after: int):
+        """Initialize parent error."""
+        super().__init__(device=device.name)
+        self._retry_after = retry_after
+
+    @property
+    def status_code(self) -> int:
+        """Report the device as temporarily unavailable."""
+        return 503
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Return the number of seconds after which the query may be retried."""
+        return {"Retry-After": str(self._retry_after)}
+
+
 class InvalidQuery(PublicHyperglassError, template="request_timeout"):
     """Raised when input validation fails."""
 
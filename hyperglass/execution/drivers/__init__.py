@@ -1,12 +1,18 @@
 """Individual transport driver classes & subclasses."""
 
 # Local
+from ._pool import SessionPool, get_session_pool, close_session_pool
 from ._common import Connection
-from .http_client import HttpClient
+from .http_client import HttpClient, device_client, close_device_clients
 from .ssh_netmiko import NetmikoConnection
 
 __all__ = (
     "Connection",
     "HttpClient",
     "NetmikoConnection",
+    "SessionPool",
+    "close_device_clients",
+    "close_session_pool",
+    "device_client",
+    "get_session_pool",
 )
@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 # Project
 from hyperglass.types import Series
 from hyperglass.plugins import OutputPluginManager
+from hyperglass.models.data import BGPRouteTable
 
 # Local
 from ._construct import Construct
@@ -45,4 +46,8 @@ class Connection(ABC):
         if response is None:
             response = ()
 
+        if isinstance(response, BGPRouteTable):
+            # Validate RPKI states for the whole table at once, rather than route by route.
+            await response.validate_rpki()
+
         return response
@@ -87,9 +87,10 @@ class Construct:
             }
         )
 
-    def format(self, command: str) -> str:
+    def format(self, command: str, keys: t.Optional[t.Sequence[str]] = None) -> str:
         """Return formatted command for 'Scrape' endpoints (SSH)."""
-        keys = get_fmt_keys(command)
+        if keys is None:
+            keys = get_fmt_keys(command)
         attrs = {k: v for k, v in self.device.attrs.items() if k in keys}
         for key in [k for k in keys if k != "target" and k != "mask"]:
             if key not in attrs:
@@ -116,16 +117,15 @@ class Construct:
         """Return queries for each enabled AFI."""
         query = []
 
-        rules = [r for r in self.directive.rules if r._passed is True]
-        if len(rules) < 1:
+        rule = getattr(self.query, "rule", None)
+        if rule is None:
             raise InputInvalid(
                 error="No validation rules matched target '{target}'",
                 target=self.query.query_target,
             )
 
-        for rule in [r for r in self.directive.rules if r._passed is True]:
-            for command in rule.commands:
-                query.append(self.format(command))
+        for command, keys in rule.templates:
+            query.append(self.format(command, keys))
         self._log.bind(constructed_query=query).debug("Constructed query")
         return query
 
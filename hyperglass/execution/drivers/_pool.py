@@ -0,0 +1,285 @@
+"""Pool of authenticated driver sessions, per device."""
+
+# Standard Library
+import time
+import typing as t
+import threading
+from contextlib import contextmanager
+from collections import Counter, deque
+
+# Project
+from hyperglass.log import log
+from hyperglass.state import use_state
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.models.config.execution import SessionPool as SessionPoolConfig
+
+__all__ = ("SessionPool", "get_session_pool", "close_session_pool")
+
+SessionT = t.TypeVar("SessionT")
+
+
+class PooledSession(t.Generic[SessionT]):
+    """An open session & the time it was last released."""
+
+    __slots__ = ("session", "close", "released_at")
+
+    def __init__(self, session: SessionT, close: t.Callable[[SessionT], None]) -> None:
+        """Wrap an open session."""
+        self.session = session
+        self.close = close
+        self.released_at = time.monotonic()
+
+
+class PoolStats(t.TypedDict):
+    """Session pool counters for a single device."""
+
+    hits: int
+    misses: int
+    stale: int
+    evicted: int
+    waits: int
+    open: int
+    idle: int
+
+
+class SessionPool:
+    """Keep authenticated driver sessions open & reuse them across queries.
+
+    Sessions are checked out from the pool in the driver thread pool, so all bookkeeping is
+    guarded by a single lock. At most `max_sessions` sessions are open per device at any time;
+    additional checkouts wait for a session to be released. Idle sessions are health-checked
+    before reuse and closed once they've been idle for `idle_timeout` seconds.
+    """
+
+    max_sessions: int
+    idle_timeout: float
+
+    def __init__(self, *, max_sessions: int, idle_timeout: float) -> None:
+        """Initialize an empty pool & start the idle session sweeper."""
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._idle: t.Dict[str, t.Deque[PooledSession]] = {}
+        self._open: t.Dict[str, int] = {}
+        self._stats: t.Dict[str, Counter] = {}
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._sweeper = threading.Thread(
+            target=self._sweep, name="hyperglass-session-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def __repr__(self) -> str:
+        """Represent pool by its limits & open session count."""
+        return "SessionPool(max_sessions={!r}, idle_timeout={!r}, open={!r})".format(
+            self.max_sessions, self.idle_timeout, sum(self._open.values())
+        )
+
+    def _count(self, key: str, counter: str) -> None:
+        self._stats.setdefault(key, Counter())[counter] += 1
+
+    def _discard(self, key: str, pooled: PooledSession) -> None:
+        """Close a session that is no longer tracked by the pool."""
+        try:
+            pooled.close(pooled.session)
+        except Exception as err:
+            log.bind(device=key, error=str(err)).debug("Error closing pooled session")
+
+    def _expired(self, key: str, now: float) -> t.List[PooledSession]:
+        """Remove & return sessions of `key` that have been idle too long. Lock must be held."""
+        idle = self._idle.get(key)
+        expired = []
+        while idle and now - idle[0].released_at >= self.idle_timeout:
+            expired.append(idle.popleft())
+            self._open[key] -= 1
+            self._count(key, "evicted")
+        if expired:
+            self._cond.notify_all()
+        return expired
+
+    def _sweep(self) -> None:
+        """Periodically close idle sessions until the pool is closed."""
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while not self._closed.wait(interval):
+            self.evict_idle()
+
+    def evict_idle(self) -> int:
+        """Close all sessions that have been idle longer than `idle_timeout`."""
+        now = time.monotonic()
+        with self._cond:
+            expired = [(key, p) for key in tuple(self._idle) for p in self._expired(key, now)]
+        for key, pooled in expired:
+            self._discard(key, pooled)
+        if expired:
+            log.bind(count=len(expired)).debug("Evicted idle sessions")
+        return len(expired)
+
+    def _checkout(
+        self,
+        key: str,
+        connect: t.Callable[[], SessionT],
+        alive: t.Callable[[SessionT], bool],
+        timeout: t.Optional[float],
+    ) -> SessionT:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                expired = self._expired(key, time.monotonic())
+                idle = self._idle.setdefault(key, deque())
+                pooled = idle.pop() if idle else None
+                can_open = pooled is None and self._open.get(key, 0) < self.max_sessions
+                if can_open:
+                    self._open[key] = self._open.get(key, 0) + 1
+                    self._count(key, "misses")
+                elif pooled is None:
+                    self._count(key, "waits")
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"Timed out waiting for a session to {key!r}")
+                    self._cond.wait(remaining)
+            for stale in expired:
+                self._discard(key, stale)
+
+            if pooled is not None:
+                if self._healthy(pooled, alive):
+                    with self._cond:
+                        self._count(key, "hits")
+                    return pooled.session
+                # Session was closed by the device or the network, replace it.
+                with self._cond:
+                    self._open[key] -= 1
+                    self._count(key, "stale")
+                    self._cond.notify_all()
+                self._discard(key, pooled)
+                continue
+
+            if can_open:
+                try:
+                    return connect()
+                except BaseException:
+                    with self._cond:
+                        self._open[key] -= 1
+                        self._cond.notify_all()
+                    raise
+
+    @staticmethod
+    def _healthy(pooled: PooledSession, alive: t.Callable[[t.Any], bool]) -> bool:
+        try:
+            return alive(pooled.session)
+        except Exception:
+            return False
+
+    @contextmanager
+    def session(
+        self,
+        key: str,
+        *,
+        connect: t.Callable[[], SessionT],
+        alive: t.Callable[[SessionT], bool],
+        close: t.Callable[[SessionT], None],
+        timeout: t.Optional[float] = None,
+    ) -> t.Generator[SessionT, None, None]:
+        """Check out a session to `key`, opening one with `connect` if none are idle.
+
+        The session is returned to the pool when the context exits. If an exception is raised
+        while the session is in use, its state is unknown, so it's closed instead.
+        """
+        session = self._checkout(key, connect, alive, timeout)
+        pooled = PooledSession(session, close)
+        try:
+            yield session
+        except BaseException:
+            with self._cond:
+                self._open[key] -= 1
+                self._cond.notify_all()
+            self._discard(key, pooled)
+            raise
+        if self._closed.is_set():
+            with self._cond:
+                self._open[key] -= 1
+            self._discard(key, pooled)
+            return
+        pooled.released_at = time.monotonic()
+        with self._cond:
+            self._idle.setdefault(key, deque()).append(pooled)
+            self._cond.notify_all()
+
+    def retire(self, prefix: str, current: str) -> int:
+        """Close idle sessions with keys starting with `prefix`, other than those of `current`.
+
+        Used to close sessions opened with a device's previous connection settings.
+        """
+        with self._cond:
+            retired = []
+            for key in tuple(self._idle):
+                if key != current and key.startswith(prefix) and self._idle[key]:
+                    sessions = self._idle.pop(key)
+                    self._open[key] -= len(sessions)
+                    retired.extend((key, pooled) for pooled in sessions)
+            if retired:
+                self._cond.notify_all()
+        for key, pooled in retired:
+            self._discard(key, pooled)
+        return len(retired)
+
+    def stats(self) -> t.Dict[str, PoolStats]:
+        """Get hit, miss & eviction counters and open & idle session counts per device."""
+        with self._cond:
+            return {
+                key: {
+                    "hits": counters["hits"],
+                    "misses": counters["misses"],
+                    "stale": counters["stale"],
+                    "evicted": counters["evicted"],
+                    "waits": counters["waits"],
+                    "open": self._open.get(key, 0),
+                    "idle": len(self._idle.get(key, ())),
+                }
+                for key, counters in self._stats.items()
+            }
+
+    def close(self) -> None:
+        """Stop the idle session sweeper & close all idle sessions."""
+        self._closed.set()
+        with self._cond:
+            idle = [(key, p) for key, sessions in self._idle.items() for p in sessions]
+            for key, _ in idle:
+                self._open[key] -= 1
+            self._idle = {}
+            self._cond.notify_all()
+        for key, pooled in idle:
+            self._discard(key, pooled)
+
+
+_pool: t.Optional[SessionPool] = None
+_pool_config: t.Optional["SessionPoolConfig"] = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> t.Optional[SessionPool]:
+    """Get this process's session pool, or `None` if session pooling is disabled.
+
+    If the session pool configuration has changed, the pool is replaced. Sessions of the previous
+    pool are closed once they're released.
+    """
+    global _pool, _pool_config
+    config = use_state("params").execution.session_pool
+    with _pool_lock:
+        if _pool is not None and config != _pool_config:
+            _pool.close()
+            _pool = None
+        _pool_config = config
+        if _pool is None and config.enable is True:
+            _pool = SessionPool(max_sessions=config.max_sessions, idle_timeout=config.idle_timeout)
+        return _pool
+
+
+def close_session_pool() -> None:
+    """Close this process's session pool, if it has been started."""
+    global _pool, _pool_config
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        _pool_config = None
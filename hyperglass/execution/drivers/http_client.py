@@ -2,12 +2,13 @@
 
 # Standard Library
 import typing as t
+import asyncio
+import weakref
 
 # Third Party
 import httpx
 
 # Project
-from hyperglass.util import get_fmt_keys
 from hyperglass.exceptions.public import AuthError, RestError, DeviceTimeout, ResponseEmpty
 
 # Local
@@ -20,17 +21,64 @@ if t.TYPE_CHECKING:
     from hyperglass.models.config.http_client import HttpConfiguration
 
 
+class DeviceClient(t.NamedTuple):
+    """A device's HTTP client, & the device configuration it was created from."""
+
+    config: "HttpConfiguration"
+    address: str
+    port: int
+    client: httpx.AsyncClient
+
+
+# Clients are bound to the event loop they were created in, so each event loop keeps its own
+# client for each device.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, t.Dict[str, DeviceClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def device_client(device: "Device") -> httpx.AsyncClient:
+    """Get the running event loop's HTTP client for a device.
+
+    The client is created on first use & kept open, so its connections are reused across
+    queries. If the device's configuration has changed, the client is replaced.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    cached = clients.get(device.id)
+    address = str(device.address)
+    if cached is not None:
+        if (cached.config, cached.address, cached.port) == (device.http, address, device.port):
+            return cached.client
+        # The previous client is closed once requests already sent with it have timed out.
+        previous = cached.client
+        loop.call_later(cached.config.timeout, lambda: asyncio.ensure_future(previous.aclose()))
+    client = device.http.create_client(device=device)
+    clients[device.id] = DeviceClient(device.http, address, device.port, client)
+    return client
+
+
+async def close_device_clients() -> None:
+    """Close the running event loop's device HTTP clients."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for cached in clients.values():
+        await cached.client.aclose()
+
+
 class HttpClient(Connection):
     """Interact with an http-based device."""
 
     config: "HttpConfiguration"
-    client: httpx.AsyncClient
 
     def __init__(self, device: "Device", query_data: "Query") -> None:
-        """Initialize base connection and set http config & client."""
+        """Initialize base connection and set http config."""
         super().__init__(device, query_data)
         self.config = device.http
-        self.client = self.config.create_client(device=device)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the device's pooled HTTP client."""
+        return device_client(self.device)
 
     def setup_proxy(self: "Connection"):
         """HTTP Client does not support SSH proxies."""
@@ -47,12 +95,11 @@ class HttpClient(Connection):
             return {
                 key: value.format(
                     **{
-                        str(v): str(getattr(self.query_data, k, None))
-                        for k, v in self.config.attribute_map.model_dump().items()
-                        if v in get_fmt_keys(value)
+                        fmt_key: str(getattr(self.query_data, field, None))
+                        for fmt_key, field in fields.items()
                     }
                 )
-                for key, value in self.config.query.items()
+                for key, (value, fields) in self.config._query_templates.items()
             }
         return {}
 
@@ -90,28 +137,27 @@ class HttpClient(Connection):
         query = self._query_params()
         responses = ()
 
-        async with self.client as client:
-            body = {}
-            if self.config.method in ("POST", "PATCH", "PUT"):
-                body = self._body()
+        body = {}
+        if self.config.method in ("POST", "PATCH", "PUT"):
+            body = self._body()
 
-            try:
-                response: httpx.Response = await client.request(
-                    method=self.config.method, url=self.config.path, params=query, **body
-                )
-                response.raise_for_status()
-                data = response.text.strip()
+        try:
+            response: httpx.Response = await self.client.request(
+                method=self.config.method, url=self.config.path, params=query, **body
+            )
+            response.raise_for_status()
+            data = response.text.strip()
 
-                if len(data) == 0:
-                    raise ResponseEmpty(query=self.query_data)
+            if len(data) == 0:
+                raise ResponseEmpty(query=self.query_data)
 
-                responses += (data,)
+            responses += (data,)
 
-            except httpx.TimeoutException as error:
-                raise DeviceTimeout(error=error, device=self.device) from error
+        except httpx.TimeoutException as error:
+            raise DeviceTimeout(error=error, device=self.device) from error
 
-            except httpx.HTTPStatusError as error:
-                if error.response.status_code == 401:
-                    raise AuthError(error=error, device=self.device) from error
-                raise RestError(error=error, device=self.device) from error
-            return responses
+        except httpx.HTTPStatusError as error:
+            if error.response.status_code == 401:
+                raise AuthError(error=error, device=self.device) from error
+            raise RestError(error=error, device=self.device) from error
+        return responses
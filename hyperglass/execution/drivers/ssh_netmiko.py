@@ -5,10 +5,12 @@ https://github.com/ktbyers/netmiko
 
 # Standard Library
 import math
-from typing import Iterable
+import hashlib
+from typing import Any, Dict, Tuple, Iterable
 
 # Third Party
 from netmiko import (  # type: ignore
+    BaseConnection,
     ConnectHandler,
     NetMikoTimeoutException,
     NetMikoAuthenticationException,
@@ -21,6 +23,8 @@ from hyperglass.exceptions.public import AuthError, DeviceTimeout, ResponseEmpty
 
 # Local
 from .ssh import SSHConnection
+from ._pool import get_session_pool
+from ..executor import run_blocking
 
 netmiko_device_globals = {
     # Netmiko doesn't currently handle Mikrotik echo verification well,
@@ -37,6 +41,16 @@ netmiko_device_send_args = {
 }
 
 
+def session_key(device_id: str, driver_kwargs: Dict[str, Any]) -> str:
+    """Get the key under which sessions opened with `driver_kwargs` are pooled.
+
+    The key includes a digest of the connection settings, including credentials, so sessions
+    opened before a device's settings changed aren't reused.
+    """
+    settings = repr(sorted(driver_kwargs.items())).encode()
+    return "{}:{}".format(device_id, hashlib.sha256(settings).hexdigest()[:16])
+
+
 class NetmikoConnection(SSHConnection):
     """Handle a device connection via Netmiko."""
 
@@ -44,8 +58,12 @@ class NetmikoConnection(SSHConnection):
         """Connect directly to a device.
 
         Directly connects to the router via Netmiko library, returns the
-        command output.
+        command output. Netmiko is blocking, so the session is run in the
+        driver thread pool.
         """
+        return await run_blocking(self._collect, host, port)
+
+    def _collect(self, host: str = None, port: int = None) -> Iterable:
         params = use_state("params")
         _log = log.bind(
             device=self.device.name,
@@ -88,16 +106,31 @@ class NetmikoConnection(SSHConnection):
                 # private key password.
                 driver_kwargs["passphrase"] = self.device.credential.password.get_secret_value()
 
-        try:
-            nm_connect_direct = ConnectHandler(**driver_kwargs)
-
-            responses = ()
-
-            for query in self.query:
-                raw = nm_connect_direct.send_command(query, **send_args)
-                responses += (raw,)
+        # Sessions through an SSH proxy only live as long as the query's tunnel, so they're
+        # never pooled.
+        pool = get_session_pool() if self.device.proxy is None else None
 
-            nm_connect_direct.disconnect()
+        try:
+            if pool is None:
+                nm_connect_direct = ConnectHandler(**driver_kwargs)
+                responses = self._send_commands(nm_connect_direct, send_args)
+                nm_connect_direct.disconnect()
+            else:
+                key = session_key(self.device.id, driver_kwargs)
+                # Device IDs can't contain colons, so other devices' keys never match.
+                pool.retire(f"{self.device.id}:", key)
+                with pool.session(
+                    key,
+                    connect=lambda: ConnectHandler(**driver_kwargs),
+                    alive=lambda session: session.is_alive(),
+                    close=lambda session: session.disconnect(),
+                    timeout=params.request_timeout - 1,
+                ) as nm_connect_pooled:
+                    responses = self._send_commands(nm_connect_pooled, send_args)
+                _log.bind(**pool.stats()[key]).debug("Session pool")
+
+        except TimeoutError as pool_error:
+            raise DeviceTimeout(error=pool_error, device=self.device) from pool_error
 
         except NetMikoTimeoutException as scrape_error:
             raise DeviceTimeout(error=scrape_error, device=self.device) from scrape_error
@@ -109,3 +142,11 @@ class NetmikoConnection(SSHConnection):
             raise ResponseEmpty(query=self.query_data)
 
         return responses
+
+    def _send_commands(self, connection: BaseConnection, send_args: Dict[str, Any]) -> Tuple[str]:
+        """Send each of the query's commands over an open Netmiko session."""
+        responses = ()
+        for query in self.query:
+            raw = connection.send_command(query, **send_args)
+            responses += (raw,)
+        return responses
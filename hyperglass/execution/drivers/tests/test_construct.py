@@ -88,3 +88,35 @@ def test_construct(state):
     )
     constructor = Construct(device=state.devices["test1"], query=query)
     assert constructor.target == "192.0.2.0/24"
+
+
+@pytest.mark.parametrize(
+    "directives",
+    (
+        [
+            {
+                "juniper_bgp_route": {
+                    "name": "BGP Route",
+                    "field": {"description": "test"},
+                    "rules": [
+                        {"condition": "192.0.2.0/24", "action": "deny"},
+                        {
+                            "condition": "0.0.0.0/0",
+                            "command": "show route {target} source {source4}",
+                        },
+                        {"condition": "::/0", "command": "show route {target} source {source6}"},
+                    ],
+                }
+            }
+        ],
+    ),
+)
+def test_construct_matched_rule(state):
+    query = Query(
+        queryLocation="test1",
+        queryTarget="198.51.100.0/24",
+        queryType="juniper_bgp_route",
+    )
+    assert query.rule is query.directive.rules[1]
+    constructor = Construct(device=state.devices["test1"], query=query)
+    assert constructor.queries() == ["show route 198.51.100.0/24 source 192.0.2.1"]
@@ -0,0 +1,89 @@
+"""Test pooled HTTP device clients."""
+
+# Standard Library
+import asyncio
+import threading
+from types import SimpleNamespace
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.config.http_client import HttpConfiguration
+
+# Local
+from ..http_client import device_client, close_device_clients
+
+
+class DeviceHandler(BaseHTTPRequestHandler):
+    """Local stand-in for an HTTP device, which keeps connections open between requests."""
+
+    protocol_version = "HTTP/1.1"
+    # Client address of each request.
+    clients = []
+
+    def do_GET(self):  # noqa: N802
+        """Respond with the requested path."""
+        self.clients.append(self.client_address)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Silence request logging."""
+        pass
+
+
+@pytest.fixture
+def port():
+    """Serve the stand-in device."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DeviceHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    DeviceHandler.clients = []
+    yield server.server_port
+    server.shutdown()
+    server.server_close()
+
+
+def _device(port: int, **http):
+    return SimpleNamespace(
+        id="rs1", address="127.0.0.1", port=port, http=HttpConfiguration(scheme="http", **http)
+    )
+
+
+def test_device_client(port):
+    device = _device(port)
+
+    async def run():
+        client = device_client(device)
+        responses = [(await client.get(f"/{i}")).text for i in range(3)]
+        # Devices with an unchanged configuration keep their client.
+        assert device_client(_device(port)) is client
+        changed = device_client(_device(port, timeout=1))
+        assert changed is not client
+        responses.append((await changed.get("/3")).text)
+        await close_device_clients()
+        return responses
+
+    assert asyncio.run(run()) == ["/0", "/1", "/2", "/3"]
+    # Queries reuse the device's connection, until its client is replaced.
+    assert len(set(DeviceHandler.clients[:3])) == 1
+    assert DeviceHandler.clients[3] != DeviceHandler.clients[0]
+
+
+def test_query_templates():
+    config = HttpConfiguration(
+        query={"target": "{t}", "where": "{loc}/{t}", "static": "value"},
+        attribute_map={"query_target": "t", "query_location": "loc"},
+    )
+    assert config._query_templates == {
+        "target": ("{t}", {"t": "query_target"}),
+        "where": ("{loc}/{t}", {"t": "query_target", "loc": "query_location"}),
+        "static": ("value", {}),
+    }
+    assert HttpConfiguration()._query_templates == {}
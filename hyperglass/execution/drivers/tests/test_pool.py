@@ -0,0 +1,174 @@
+"""Test driver session pool."""
+
+# Standard Library
+import time
+import typing as t
+import threading
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.config.params import Params
+
+# Local
+from .._pool import SessionPool, get_session_pool, close_session_pool
+from ..ssh_netmiko import session_key
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.state import HyperglassState
+
+
+class FakeSession:
+    """Stand-in for a driver session."""
+
+    def __init__(self) -> None:
+        self.alive = True
+        self.closed = False
+
+    def is_alive(self) -> bool:
+        """Report whether the session is still connected."""
+        return self.alive
+
+    def disconnect(self) -> None:
+        """Close the session."""
+        self.closed = True
+
+
+@pytest.fixture
+def pool() -> t.Generator[SessionPool, None, None]:
+    _pool = SessionPool(max_sessions=2, idle_timeout=60)
+    yield _pool
+    _pool.close()
+
+
+def _checkout(pool: SessionPool, key: str = "test1", **kwargs: t.Any) -> t.Any:
+    return pool.session(
+        key,
+        connect=FakeSession,
+        alive=lambda s: s.is_alive(),
+        close=lambda s: s.disconnect(),
+        **kwargs,
+    )
+
+
+def test_session_reuse(pool):
+    with _checkout(pool) as first:
+        pass
+    with _checkout(pool) as second:
+        pass
+    assert first is second
+    stats = pool.stats()["test1"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["open"] == 1
+    assert stats["idle"] == 1
+
+
+def test_stale_session_replaced(pool):
+    with _checkout(pool) as first:
+        pass
+    first.alive = False
+    with _checkout(pool) as second:
+        pass
+    assert first is not second
+    assert first.closed is True
+    assert pool.stats()["test1"]["stale"] == 1
+
+
+def test_failed_session_closed(pool):
+    with pytest.raises(RuntimeError):
+        with _checkout(pool) as session:
+            raise RuntimeError("Command failed")
+    assert session.closed is True
+    assert pool.stats()["test1"]["open"] == 0
+
+
+def test_idle_eviction():
+    pool = SessionPool(max_sessions=2, idle_timeout=0.05)
+    try:
+        with _checkout(pool) as session:
+            pass
+        time.sleep(0.1)
+        assert pool.evict_idle() == 1
+        assert session.closed is True
+        assert pool.stats()["test1"]["evicted"] == 1
+    finally:
+        pool.close()
+
+
+def test_max_sessions(pool):
+    release = threading.Event()
+
+    def hold() -> None:
+        with _checkout(pool):
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    while pool.stats().get("test1", {}).get("open", 0) < 2:
+        time.sleep(0.01)
+
+    with pytest.raises(TimeoutError):
+        with _checkout(pool, timeout=0.05):
+            pass
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    with _checkout(pool, timeout=0.05):
+        pass
+    stats = pool.stats()["test1"]
+    assert stats["open"] == 2
+    assert stats["waits"] >= 1
+
+
+def test_retire(pool):
+    with _checkout(pool, "test1:old") as old, _checkout(pool, "test10:old") as other:
+        pass
+    with _checkout(pool, "test1:new"):
+        pass
+    # Only the device's idle sessions with other settings are closed.
+    assert pool.retire("test1:", "test1:new") == 1
+    assert old.closed is True
+    assert other.closed is False
+    assert pool.stats()["test1:old"]["open"] == 0
+    assert pool.stats()["test1:new"]["idle"] == 1
+
+
+def test_session_key():
+    settings = {"host": "192.0.2.1", "port": 22, "username": "user", "password": "one"}
+    key = session_key("test1", settings)
+    assert key.startswith("test1:")
+    assert session_key("test1", dict(reversed(settings.items()))) == key
+    assert session_key("test1", {**settings, "password": "two"}) != key
+    assert session_key("test1", {**settings, "port": 830}) != key
+
+
+@pytest.fixture
+def session_pool(state: "HyperglassState") -> t.Generator[None, None, None]:
+    """Close the session pool, which is configured from the published parameters."""
+    yield
+    close_session_pool()
+
+
+def test_reconfigure(state, session_pool):
+    assert get_session_pool() is None
+    state.publish(params=Params(execution={"session_pool": {"enable": True}}))
+    pool = get_session_pool()
+    assert pool is not None
+    assert get_session_pool() is pool
+    with _checkout(pool) as session:
+        state.publish(
+            params=Params(execution={"session_pool": {"enable": True, "max_sessions": 4}})
+        )
+        replaced = get_session_pool()
+        assert replaced is not pool
+        assert replaced.max_sessions == 4
+    # Sessions of the previous pool are closed once they're released.
+    assert session.closed is True
+    state.publish(params=Params())
+    assert get_session_pool() is None
@@ -0,0 +1,92 @@
+"""Run blocking driver I/O outside of the event loop.
+
+Drivers such as Netmiko are synchronous. Running them directly in a coroutine blocks the
+entire worker process, including cached responses and other API routes, until the device
+responds. Instead, blocking calls are run in a bounded, per-process thread pool.
+
+Threads can't be interrupted, so a call whose caller is cancelled (e.g. when a query's deadline
+passes) keeps its thread until the call returns. These abandoned calls are counted & logged, so
+a pool filled by unresponsive devices doesn't go unnoticed.
+"""
+
+# Standard Library
+import typing as t
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Project
+from hyperglass.log import log
+from hyperglass.state import use_state
+
+__all__ = ("abandoned_calls", "get_executor", "run_blocking", "shutdown_executor")
+
+ReturnT = t.TypeVar("ReturnT")
+
+_executor: t.Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+# Number of calls still holding a thread after their caller was cancelled.
+_abandoned = 0
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get this process's driver thread pool, creating it on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            params = use_state("params")
+            _executor = ThreadPoolExecutor(
+                max_workers=params.execution.max_workers,
+                thread_name_prefix="hyperglass-driver",
+            )
+            log.bind(max_workers=params.execution.max_workers).debug("Started driver executor")
+        return _executor
+
+
+async def run_blocking(func: t.Callable[..., ReturnT], *args: t.Any, **kwargs: t.Any) -> ReturnT:
+    """Run a blocking function in the driver thread pool & await its result."""
+    executor = get_executor()
+    future = executor.submit(functools.partial(func, *args, **kwargs))
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Calls that haven't started are cancelled with their caller; started calls aren't.
+        if not future.done():
+            _abandon(future, func, executor)
+        raise
+
+
+def _abandon(future: Future, func: t.Callable[..., t.Any], executor: ThreadPoolExecutor) -> None:
+    """Count a started call whose caller was cancelled, until its thread is released."""
+    global _abandoned
+    with _lock:
+        _abandoned += 1
+        abandoned = _abandoned
+    log.bind(
+        call=getattr(func, "__qualname__", repr(func)),
+        abandoned=abandoned,
+        max_workers=executor._max_workers,
+    ).warning("Blocking driver call is still running after its query was cancelled")
+
+    def release(_: Future) -> None:
+        global _abandoned
+        with _lock:
+            _abandoned -= 1
+
+    future.add_done_callback(release)
+
+
+def abandoned_calls() -> int:
+    """Get the number of driver threads held by calls whose caller was cancelled."""
+    with _lock:
+        return _abandoned
+
+
+def shutdown_executor() -> None:
+    """Shut down this process's driver thread pool, if it has been started."""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
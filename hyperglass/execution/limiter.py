@@ -0,0 +1,196 @@
+"""Limit concurrent queries per device."""
+
+# Standard Library
+import time
+import typing as t
+import asyncio
+import secrets
+from contextlib import asynccontextmanager
+from collections import deque
+
+# Project
+from hyperglass.log import log
+from hyperglass.state import use_state
+from hyperglass.exceptions.public import DeviceBusy, DeviceTimeout
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.state.redis import AsyncRedisManager
+    from hyperglass.models.config.devices import Device
+
+__all__ = ("DeviceQueue", "QueueSlot", "device_queue")
+
+LEASE_KEY = "hyperglass.limiter"
+# Interval at which queries waiting for another worker's query to the device retry.
+LEASE_POLL_INTERVAL = 0.1
+# Seconds a lease is held for if the query has no deadline, unless it's released sooner.
+LEASE_TIMEOUT = 60.0
+# Seconds after which clients are asked to retry queries rejected because the device is busy.
+RETRY_AFTER = 5
+
+# Take a lease on one of the device's sessions, if fewer than `limit` leases are held. Leases
+# are scored by their expiry time, so leases of workers that stopped without releasing them are
+# discarded once they expire.
+ACQUIRE_SCRIPT = """
+local time = redis.call("time")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call("zremrangebyscore", KEYS[1], "-inf", now)
+if redis.call("zcard", KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("zadd", KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+if redis.call("pttl", KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+class QueueSlot(t.NamedTuple):
+    """Queueing details of a single query."""
+
+    # Number of queries waiting for the device ahead of this one when it arrived.
+    depth: int
+    # Seconds spent waiting for the device.
+    wait: float
+
+
+class DeviceQueue:
+    """First-in, first-out queue of queries to a single device.
+
+    At most `limit` queries run at once. Up to `depth` further queries wait in arrival order;
+    queries beyond that are rejected immediately, rather than waiting for the request to time
+    out.
+
+    Each worker process has its own queue. If `redis` is set, queries also take a lease stored
+    in Redis under `key` before running, so at most `limit` queries run against the device at
+    once across all worker processes. Leases expire at the query's deadline, in case a worker
+    stops without releasing them.
+    """
+
+    limit: int
+    depth: int
+    redis: t.Optional["AsyncRedisManager"]
+    key: t.Optional[str]
+
+    def __init__(
+        self,
+        *,
+        limit: int,
+        depth: int,
+        redis: t.Optional["AsyncRedisManager"] = None,
+        key: t.Optional[str] = None,
+    ) -> None:
+        """Initialize an idle queue."""
+        self.limit = limit
+        self.depth = depth
+        self.redis = redis
+        self.key = key
+        self.running = 0
+        self._waiters: t.Deque[asyncio.Future] = deque()
+
+    def __repr__(self) -> str:
+        """Represent queue by its limits & current usage."""
+        return "DeviceQueue(limit={!r}, depth={!r}, running={!r}, waiting={!r})".format(
+            self.limit, self.depth, self.running, self.waiting
+        )
+
+    @property
+    def waiting(self) -> int:
+        """Get the number of queries waiting for the device."""
+        return len(self._waiters)
+
+    def _wake(self) -> None:
+        """Hand free capacity to waiting queries, in arrival order."""
+        while self._waiters and self.running < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.running += 1
+                waiter.set_result(None)
+
+    async def _acquire(self, device: "Device", timeout: t.Optional[float]) -> QueueSlot:
+        depth = self.waiting
+        if self.running < self.limit and depth == 0:
+            self.running += 1
+            return QueueSlot(depth=0, wait=0.0)
+
+        if depth >= self.depth:
+            raise DeviceBusy(device=device, retry_after=RETRY_AFTER)
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as err:
+            if waiter.done() and not waiter.cancelled():
+                # Capacity was handed to this query as it was cancelled; pass it on.
+                self.running -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(err, TimeoutError):
+                error = TimeoutError("Timed out waiting for device")
+                raise DeviceTimeout(error=error, device=device) from err
+            raise
+        return QueueSlot(depth=depth, wait=time.monotonic() - start)
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._wake()
+
+    async def _lease(self, device: "Device", timeout: t.Optional[float]) -> str:
+        """Wait for a lease on one of the device's sessions shared by all worker processes."""
+        key = self.redis.key(self.key)
+        token = secrets.token_hex(8)
+        ttl = int((LEASE_TIMEOUT if timeout is None else timeout) * 1000) + 1000
+        start = time.monotonic()
+        while not await self.redis.instance.eval(ACQUIRE_SCRIPT, 1, key, self.limit, ttl, token):
+            if timeout is not None and time.monotonic() - start >= timeout:
+                error = TimeoutError("Timed out waiting for device")
+                raise DeviceTimeout(error=error, device=device)
+            await asyncio.sleep(LEASE_POLL_INTERVAL)
+        return token
+
+    @asynccontextmanager
+    async def slot(
+        self, device: "Device", *, timeout: t.Optional[float] = None
+    ) -> t.AsyncGenerator[QueueSlot, None]:
+        """Wait for the device to be available, for up to `timeout` seconds."""
+        start = time.monotonic()
+        slot = await self._acquire(device, timeout)
+        token = None
+        try:
+            if self.redis is not None:
+                remaining = None if timeout is None else max(timeout - slot.wait, 0)
+                token = await self._lease(device, remaining)
+                slot = slot._replace(wait=time.monotonic() - start)
+            if slot.depth > 0 or slot.wait >= LEASE_POLL_INTERVAL:
+                log.bind(device=device.name, depth=slot.depth, wait=slot.wait).debug("Query queued")
+            yield slot
+        finally:
+            if token is not None:
+                await self.redis.instance.zrem(self.redis.key(self.key), token)
+            self._release()
+
+
+_queues: t.Dict[str, DeviceQueue] = {}
+
+
+def device_queue(device: "Device") -> DeviceQueue:
+    """Get this process's query queue for `device`, creating it if needed.
+
+    The queue's limit is shared with the other worker processes through Redis. If the device's
+    concurrency configuration has changed, a new queue is created. Queries already holding or
+    waiting for the previous queue are unaffected.
+    """
+    config = device.concurrency
+    queue = _queues.get(device.id)
+    if queue is None or (queue.limit, queue.depth) != (config.limit, config.queue):
+        # Device IDs can't contain dots, & the prefix keeps them from matching a namespace part.
+        key = f"{LEASE_KEY}.device:{device.id}"
+        queue = DeviceQueue(
+            limit=config.limit, depth=config.queue, redis=use_state("async_cache"), key=key
+        )
+        _queues[device.id] = queue
+    return queue
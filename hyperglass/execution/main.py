@@ -7,8 +7,8 @@ http client API calls, returns the output back to the front end.
 """
 
 # Standard Library
-import signal
-from typing import TYPE_CHECKING, Any, Dict, Union, Callable
+import asyncio
+from typing import TYPE_CHECKING, Set, Dict, Union, Callable, Iterable, Optional
 
 # Project
 from hyperglass.log import log
@@ -17,12 +17,17 @@ from hyperglass.util.typing import is_series
 from hyperglass.exceptions.public import DeviceTimeout, ResponseEmpty
 
 if TYPE_CHECKING:
+    from hyperglass.compat import SSHTunnelForwarder
     from hyperglass.models.api import Query
     from .drivers import Connection
     from hyperglass.models.data import OutputDataModel
 
 # Local
 from .drivers import HttpClient, NetmikoConnection
+from .executor import run_blocking
+
+# Tunnels being closed in the background, referenced until they're closed.
+_closing: Set["asyncio.Future[None]"] = set()
 
 
 def map_driver(driver_name: str) -> "Connection":
@@ -34,17 +39,53 @@ def map_driver(driver_name: str) -> "Connection":
     return NetmikoConnection
 
 
-def handle_timeout(**exc_args: Any) -> Callable:
-    """Return a function signal can use to raise a timeout exception."""
+def _open_tunnel(proxy: Callable[[], "SSHTunnelForwarder"]) -> "SSHTunnelForwarder":
+    """Create & start an SSH tunnel."""
+    tunnel = proxy()
+    tunnel.__enter__()
+    return tunnel
+
+
+def _close_tunnel(tunnel: "SSHTunnelForwarder") -> "asyncio.Future[None]":
+    """Stop an SSH tunnel in the driver thread pool, whether or not its caller is cancelled."""
+    closing = asyncio.ensure_future(run_blocking(tunnel.__exit__))
+    _closing.add(closing)
+    closing.add_done_callback(_closing.discard)
+    return closing
 
-    def handler(*args: Any, **kwargs: Any) -> None:
-        raise DeviceTimeout(**exc_args)
 
-    return handler
+def _close_opened_tunnel(opening: "asyncio.Future[SSHTunnelForwarder]") -> None:
+    """Stop a tunnel that finished opening after its query was cancelled."""
+    if not opening.cancelled() and opening.exception() is None:
+        _close_tunnel(opening.result())
 
 
-async def execute(query: "Query") -> Union["OutputDataModel", str]:
-    """Initiate query validation and execution."""
+async def collect(driver: "Connection", query: "Query") -> Iterable:
+    """Collect raw output from a device, through its SSH proxy if one is configured."""
+    if query.device.proxy:
+        # Opening & closing the tunnel is blocking, so it's run in the driver thread pool. A tunnel
+        # is still opened if the query is cancelled while it's opening, so it's closed once open.
+        opening = asyncio.ensure_future(run_blocking(_open_tunnel, driver.setup_proxy()))
+        try:
+            tunnel = await asyncio.shield(opening)
+        except asyncio.CancelledError:
+            opening.add_done_callback(_close_opened_tunnel)
+            raise
+        try:
+            return await driver.collect(tunnel.local_bind_host, tunnel.local_bind_port)
+        finally:
+            await asyncio.shield(_close_tunnel(tunnel))
+    return await driver.collect()
+
+
+async def execute(
+    query: "Query", *, timeout: Optional[float] = None
+) -> Union["OutputDataModel", str]:
+    """Initiate query validation and execution.
+
+    The query must complete within `timeout` seconds, or `request_timeout` minus one second if
+    no timeout is specified.
+    """
     params = use_state("params")
     output = params.messages.general
     _log = log.bind(query=query, device=query.device)
@@ -53,18 +94,16 @@ async def execute(query: "Query") -> Union["OutputDataModel", str]:
     mapped_driver = map_driver(query.device.driver)
     driver: "Connection" = mapped_driver(query.device, query)
 
-    signal.signal(
-        signal.SIGALRM,
-        handle_timeout(error=TimeoutError("Connection timed out"), device=query.device),
-    )
-    signal.alarm(params.request_timeout - 1)
+    if timeout is None:
+        timeout = params.request_timeout - 1
 
-    if query.device.proxy:
-        proxy = driver.setup_proxy()
-        with proxy() as tunnel:
-            response = await driver.collect(tunnel.local_bind_host, tunnel.local_bind_port)
-    else:
-        response = await driver.collect()
+    # Each query has its own deadline, so concurrent queries don't affect each other's timeouts.
+    try:
+        async with asyncio.timeout(timeout):
+            response = await collect(driver, query)
+    except TimeoutError as err:
+        error = TimeoutError("Connection timed out")
+        raise DeviceTimeout(error=error, device=query.device) from err
 
     output = await driver.response(response)
     _log.bind(response=response).debug("Query response")
@@ -86,6 +125,4 @@ async def execute(query: "Query") -> Union["OutputDataModel", str]:
         if not output:
             raise ResponseEmpty(query=query)
 
-    signal.alarm(0)
-
     return output
@@ -0,0 +1,82 @@
+"""Load test cached response latency while slow device queries are in flight.
+
+Requires a running Redis instance. Run with:
+
+    python3 -m hyperglass.execution.tests.bench_executor
+"""
+
+# Standard Library
+import time
+import typing as t
+import asyncio
+import statistics
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.config.params import Params
+
+# Local
+from ..executor import run_blocking, shutdown_executor
+
+SLOW_QUERIES = 8
+DEVICE_DELAY = 0.5
+CACHE_HITS = 500
+HIT_INTERVAL = 0.001
+CACHE_KEY = "hyperglass.query.bench"
+
+
+def _device_session() -> t.Tuple[str]:
+    """Simulate a blocking SSH session to a slow device."""
+    time.sleep(DEVICE_DELAY)
+    return ("output",)
+
+
+async def _inline_query() -> t.Tuple[str]:
+    """Driver I/O run directly on the event loop, as before."""
+    return _device_session()
+
+
+async def _executor_query() -> t.Tuple[str]:
+    """Driver I/O run in the driver thread pool."""
+    return await run_blocking(_device_session)
+
+
+async def _cache_hit(cache: t.Any, received: float) -> float:
+    """Serve a cached response, returning its latency since it was received."""
+    cache.get_map(CACHE_KEY, "output")
+    return (time.perf_counter() - received) * 1000
+
+
+async def _measure(query: t.Callable[[], t.Awaitable[t.Any]]) -> t.Tuple[float, float]:
+    cache = use_state("cache")
+    slow = [asyncio.create_task(query()) for _ in range(SLOW_QUERIES)]
+    hits = []
+    # Cache hits arrive at a steady rate while the slow queries are in flight.
+    for _ in range(CACHE_HITS):
+        hits.append(asyncio.create_task(_cache_hit(cache, time.perf_counter())))
+        await asyncio.sleep(HIT_INTERVAL)
+    latencies = await asyncio.gather(*hits)
+    await asyncio.gather(*slow)
+    return statistics.median(latencies), max(latencies)
+
+
+def main() -> None:
+    """Compare cache hit latency with inline & executor-backed device I/O."""
+    state = use_state()
+    state.publish(params=Params())
+    state.redis.set_map_item(CACHE_KEY, "output", "cached output")
+
+    try:
+        inline = asyncio.run(_measure(_inline_query))
+        executor = asyncio.run(_measure(_executor_query))
+    finally:
+        shutdown_executor()
+        state.clear()
+
+    print(f"slow queries: {SLOW_QUERIES} x {DEVICE_DELAY}s, cache hits: {CACHE_HITS}")
+    for name, (median, worst) in (("inline", inline), ("executor", executor)):
+        print(f"{name + ' driver I/O:':<20} median {median:.3f} ms, max {worst:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Test blocking driver calls & SSH tunnels when queries are cancelled."""
+
+# Standard Library
+import typing as t
+import asyncio
+import threading
+from types import SimpleNamespace
+
+# Third Party
+import pytest
+
+# Local
+from ..main import collect
+from ..executor import run_blocking, abandoned_calls, shutdown_executor
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.state import HyperglassState
+
+
+@pytest.fixture
+def executor(state: "HyperglassState") -> t.Generator[None, None, None]:
+    """Shut down the driver thread pool, which is sized from the published parameters."""
+    yield
+    shutdown_executor()
+
+
+async def _wait_for(condition: t.Callable[[], bool]) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met")
+
+
+class Tunnel:
+    """Stand-in SSH tunnel, which opens once `release` is set."""
+
+    local_bind_host = "localhost"
+    local_bind_port = 2222
+
+    def __init__(self, release: threading.Event) -> None:
+        self.release = release
+        self.opened = False
+        self.closed = False
+
+    def __enter__(self) -> "Tunnel":
+        """Open the tunnel once released."""
+        self.release.wait()
+        self.opened = True
+        return self
+
+    def __exit__(self, *_: t.Any) -> None:
+        """Close the tunnel."""
+        self.closed = True
+
+
+class Driver:
+    """Stand-in driver, which connects through a `Tunnel`."""
+
+    def __init__(self, release: threading.Event) -> None:
+        self.tunnel = Tunnel(release)
+
+    def setup_proxy(self) -> t.Callable[[], Tunnel]:
+        """Get the tunnel opener."""
+        return lambda: self.tunnel
+
+    async def collect(self, host: str, port: int) -> t.Tuple[str]:
+        """Respond with the tunnel's local address."""
+        return (f"{host}:{port}",)
+
+
+QUERY = SimpleNamespace(device=SimpleNamespace(proxy=True))
+
+
+def test_abandoned_calls(executor):
+    release = threading.Event()
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(run_blocking(release.wait), 0.05)
+        # The call keeps its thread until it returns.
+        assert abandoned_calls() == 1
+        release.set()
+        await _wait_for(lambda: abandoned_calls() == 0)
+
+    asyncio.run(run())
+
+
+def test_proxy(executor):
+    release = threading.Event()
+    release.set()
+    driver = Driver(release)
+    assert asyncio.run(collect(driver, QUERY)) == ("localhost:2222",)
+    assert driver.tunnel.closed
+
+
+def test_proxy_cancelled(executor):
+    release = threading.Event()
+    driver = Driver(release)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(collect(driver, QUERY), 0.05)
+        assert not driver.tunnel.opened
+        # Tunnels opened after their query is cancelled are closed once open.
+        release.set()
+        await _wait_for(lambda: driver.tunnel.closed)
+
+    asyncio.run(run())
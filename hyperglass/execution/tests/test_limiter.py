@@ -0,0 +1,105 @@
+"""Test per-device query limits."""
+
+# Standard Library
+import typing as t
+import asyncio
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.exceptions.public import DeviceBusy, DeviceTimeout
+
+# Local
+from ..limiter import DeviceQueue
+
+DEVICE = type("Device", (), {"id": "test1", "name": "Test 1", "proxy": None})
+
+
+async def _hold(queue: DeviceQueue, order: t.List[int], index: int, release: asyncio.Event):
+    async with queue.slot(DEVICE) as slot:
+        order.append(index)
+        await release.wait()
+    return slot
+
+
+def test_queue_order():
+    async def run():
+        queue = DeviceQueue(limit=1, depth=4)
+        order = []
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(queue, order, i, release)) for i in range(4)]
+        await asyncio.sleep(0)
+        assert queue.running == 1
+        assert queue.waiting == 3
+        release.set()
+        slots = await asyncio.gather(*tasks)
+        assert order == [0, 1, 2, 3]
+        assert [slot.depth for slot in slots] == [0, 0, 1, 2]
+        assert queue.running == 0
+
+    asyncio.run(run())
+
+
+def test_queue_full(state):
+    async def run():
+        queue = DeviceQueue(limit=1, depth=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(queue, [], i, release)) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(DeviceBusy) as busy:
+            async with queue.slot(DEVICE):
+                pass
+        # Full queues are reported as temporary back-pressure, rather than a bad request.
+        assert busy.value.status_code == 503
+        assert busy.value.headers == {"Retry-After": "5"}
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+
+def test_queue_timeout(state):
+    async def run():
+        queue = DeviceQueue(limit=1, depth=1)
+        release = asyncio.Event()
+        task = asyncio.create_task(_hold(queue, [], 0, release))
+        await asyncio.sleep(0)
+        with pytest.raises(DeviceTimeout):
+            async with queue.slot(DEVICE, timeout=0.01):
+                pass
+        assert queue.waiting == 0
+        release.set()
+        await task
+        assert queue.running == 0
+
+    asyncio.run(run())
+
+
+def test_shared_limit(state):
+    async def run():
+        redis = use_state("async_cache")
+        key = "hyperglass.limiter.device:test1"
+        await redis.delete(key)
+        # Each queue stands in for another worker process's queue for the same device.
+        first, second = (DeviceQueue(limit=1, depth=1, redis=redis, key=key) for _ in range(2))
+        release = asyncio.Event()
+        task = asyncio.create_task(_hold(first, [], 0, release))
+        await asyncio.sleep(0.05)
+        with pytest.raises(DeviceTimeout):
+            async with second.slot(DEVICE, timeout=0.2):
+                pass
+        assert second.running == 0
+        release.set()
+        await task
+        async with second.slot(DEVICE, timeout=0.2) as slot:
+            assert slot.depth == 0
+
+        # Leases that aren't released, e.g. by a worker that stopped, expire at their deadline.
+        await first._lease(DEVICE, 0)
+        async with second.slot(DEVICE, timeout=2) as slot:
+            assert slot.wait > 0.5
+        await redis.close()
+
+    asyncio.run(run())
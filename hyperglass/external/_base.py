@@ -14,11 +14,13 @@ import httpx
 # Project
 from hyperglass.log import log
 from hyperglass.util import parse_exception, repr_from_attrs
-from hyperglass.settings import Settings
 from hyperglass.constants import __version__
 from hyperglass.models.fields import JsonValue, HttpMethod, Primitives
 from hyperglass.exceptions.private import ExternalError
 
+# Local
+from ._clients import use_client_pool
+
 if t.TYPE_CHECKING:
     # Standard Library
     from types import TracebackType
@@ -46,8 +48,15 @@ class BaseExternal:
         verify_ssl: bool = True,
         timeout: int = 10,
         parse: bool = True,
+        http2: bool = True,
+        test_connection: bool = False,
     ) -> None:
-        """Initialize connection instance."""
+        """Initialize connection instance.
+
+        Requests are sent with clients from the process-wide client pool, which are shared by every
+        instance with the same base URL & TLS settings. The base URL's port is only tested before
+        use if `test_connection` is set.
+        """
         self.__name__ = getattr(self, "name", "BaseExternal")
         self.name = self.__name__
         self.config = config
@@ -57,20 +66,20 @@ class BaseExternal:
         self.verify_ssl = verify_ssl
         self.timeout = timeout
         self.parse = parse
-
-        context = httpx.create_ssl_context(verify=verify_ssl)
-
-        if Settings.ca_cert is not None:
-            context.load_verify_locations(cafile=str(Settings.ca_cert))
-
-        client_kwargs = {
-            "base_url": self.base_url,
-            "timeout": self.timeout,
-            "verify": context,
-        }
-
-        self._session = httpx.Client(**client_kwargs)
-        self._asession = httpx.AsyncClient(**client_kwargs)
+        self.http2 = http2
+        self.test_connection = test_connection
+
+    @property
+    def _session(self: "BaseExternal") -> httpx.Client:
+        """Get the pooled synchronous client for the base URL."""
+        return use_client_pool().client(self.base_url, verify_ssl=self.verify_ssl, http2=self.http2)
+
+    @property
+    def _asession(self: "BaseExternal") -> httpx.AsyncClient:
+        """Get the running event loop's pooled asynchronous client for the base URL."""
+        return use_client_pool().async_client(
+            self.base_url, verify_ssl=self.verify_ssl, http2=self.http2
+        )
 
     @classmethod
     def __init_subclass__(
@@ -81,8 +90,8 @@ class BaseExternal:
         cls.name = name or cls.__name__
 
     async def __aenter__(self: "BaseExternal") -> "BaseExternal":
-        """Test connection on entry."""
-        available = await self._atest()
+        """Test connection on entry, if enabled."""
+        available = await self._atest() if self.test_connection else True
 
         if available:
             log.bind(url=self.base_url).debug("Initialized session")
@@ -95,20 +104,17 @@ class BaseExternal:
         exc_value: t.Optional[BaseException] = None,
         traceback: t.Optional["TracebackType"] = None,
     ) -> True:
-        """Close connection on exit."""
-        log.bind(url=self.base_url).debug("Closing session")
-
+        """Log errors on exit; pooled clients are kept open for reuse."""
         if exc_type is not None:
             log.error(str(exc_value))
 
-        await self._asession.aclose()
         if exc_value is not None:
             raise exc_value
         return True
 
     def __enter__(self: "BaseExternal") -> "BaseExternal":
-        """Test connection on entry."""
-        available = self._test()
+        """Test connection on entry, if enabled."""
+        available = self._test() if self.test_connection else True
 
         if available:
             log.bind(url=self.base_url).debug("Initialized session")
@@ -121,10 +127,9 @@ class BaseExternal:
         exc_value: t.Optional[BaseException] = None,
         exc_traceback: t.Optional["TracebackType"] = None,
     ) -> bool:
-        """Close connection on exit."""
+        """Log errors on exit; pooled clients are kept open for reuse."""
         if exc_type is not None:
             log.error(str(exc_value))
-        self._session.close()
         if exc_value is not None:
             raise exc_value
         return True
@@ -208,7 +213,9 @@ class BaseExternal:
             data,
             timeout,
             response_required,
-        ) = itemgetter(*kwargs.keys())(kwargs)
+        ) = itemgetter(
+            *kwargs.keys()
+        )(kwargs)
 
         if method.upper() not in supported_methods:
             raise self._exception(
@@ -274,7 +281,7 @@ class BaseExternal:
             headers=None,
             params=params,
             data=data,
-            timeout=timeout,
+            timeout=self.timeout if timeout is None else timeout,
             response_required=response_required,
         )
 
@@ -284,12 +291,18 @@ class BaseExternal:
             if response.status_code not in range(200, 300):
                 status = httpx.codes(response.status_code)
                 error = self._parse_response(response)
+                # The response is passed as an argument, since it may contain braces.
                 raise self._exception(
-                    f'{status.name.replace("_", " ")}: {error}', level="danger"
+                    "{status}: {detail}",
+                    level="danger",
+                    status=status.name.replace("_", " "),
+                    detail=error,
                 ) from None
 
         except httpx.HTTPError as http_err:
-            raise self._exception(parse_exception(http_err), level="danger") from None
+            raise self._exception(
+                "{detail}", level="danger", detail=parse_exception(http_err)
+            ) from None
 
         return self._parse_response(response)
 
@@ -330,7 +343,7 @@ class BaseExternal:
             headers=None,
             params=params,
             data=data,
-            timeout=timeout,
+            timeout=self.timeout if timeout is None else timeout,
             response_required=response_required,
         )
 
@@ -340,12 +353,18 @@ class BaseExternal:
             if response.status_code not in range(200, 300):
                 status = httpx.codes(response.status_code)
                 error = self._parse_response(response)
+                # The response is passed as an argument, since it may contain braces.
                 raise self._exception(
-                    f'{status.name.replace("_", " ")}: {error}', level="danger"
+                    "{status}: {detail}",
+                    level="danger",
+                    status=status.name.replace("_", " "),
+                    detail=error,
                 ) from None
 
         except httpx.HTTPError as http_err:
-            raise self._exception(parse_exception(http_err), level="danger") from None
+            raise self._exception(
+                "{detail}", level="danger", detail=parse_exception(http_err)
+            ) from None
 
         return self._parse_response(response)
 
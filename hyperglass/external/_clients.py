@@ -0,0 +1,163 @@
+"""Process-wide pool of keep-alive HTTP clients, shared by all external data sources."""
+
+# Standard Library
+import ssl
+import typing as t
+import asyncio
+import weakref
+import threading
+from importlib.util import find_spec
+
+# Third Party
+import httpx
+
+# Project
+from hyperglass.log import log
+from hyperglass.settings import Settings
+
+# HTTP/2 is negotiated when the optional `h2` package is installed.
+HTTP2 = find_spec("h2") is not None
+# Seconds an idle connection is kept open for reuse.
+KEEPALIVE_EXPIRY = 60.0
+LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=KEEPALIVE_EXPIRY
+)
+
+# Base URL, whether TLS certificates are verified, CA certificate path & whether HTTP/2 is used.
+ClientKey = t.Tuple[str, bool, t.Optional[str], bool]
+AsyncClients = t.Dict[ClientKey, httpx.AsyncClient]
+
+
+class ClientStats(t.TypedDict):
+    """Connection reuse counters for a single base URL."""
+
+    requests: int
+    connections: int
+    reuse_rate: float
+
+
+class HTTPClientPool:
+    """Keep HTTP clients open & share them across requests to the same base URL.
+
+    Clients are keyed by base URL & TLS settings, so every integration requesting the same URL
+    with the same TLS settings shares one connection pool, and TLS contexts are only built once.
+    Synchronous clients are shared by the whole process; asynchronous clients are bound to the
+    event loop they were created in, so each event loop gets its own.
+    """
+
+    def __init__(self) -> None:
+        """Start without any clients; clients are created on first use."""
+        self._lock = threading.Lock()
+        self._contexts: t.Dict[t.Tuple[bool, t.Optional[str]], ssl.SSLContext] = {}
+        self._clients: t.Dict[ClientKey, httpx.Client] = {}
+        self._aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClients]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._stats: t.Dict[str, t.Dict[str, int]] = {}
+
+    def _key(self, base_url: str, verify_ssl: bool, http2: bool) -> ClientKey:
+        ca_cert = None if Settings.ca_cert is None else str(Settings.ca_cert)
+        return (base_url, verify_ssl, ca_cert, http2 and HTTP2)
+
+    def _options(self, key: ClientKey) -> t.Dict[str, t.Any]:
+        """Get client options for a key, building its TLS context if needed."""
+        base_url, verify_ssl, ca_cert, http2 = key
+        context = self._contexts.get((verify_ssl, ca_cert))
+        if context is None:
+            context = httpx.create_ssl_context(verify=verify_ssl)
+            if ca_cert is not None:
+                context.load_verify_locations(cafile=ca_cert)
+            self._contexts[(verify_ssl, ca_cert)] = context
+        return {"base_url": base_url, "verify": context, "http2": http2, "limits": LIMITS}
+
+    def _count(self, base_url: str, counter: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(base_url, {"requests": 0, "connections": 0})
+            counters[counter] += 1
+
+    def _trace(self, base_url: str) -> t.Callable[[str, t.Any], None]:
+        """Count new connections opened by requests to `base_url`."""
+
+        def trace(event: str, _: t.Any) -> None:
+            if event == "connection.connect_tcp.complete":
+                self._count(base_url, "connections")
+
+        return trace
+
+    def client(self, base_url: str, *, verify_ssl: bool = True, http2: bool = True) -> httpx.Client:
+        """Get the synchronous client for a base URL & TLS settings."""
+        key = self._key(base_url, verify_ssl, http2)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                trace = self._trace(base_url)
+
+                def on_request(request: httpx.Request) -> None:
+                    request.extensions["trace"] = trace
+                    self._count(base_url, "requests")
+
+                client = self._clients[key] = httpx.Client(
+                    **self._options(key), event_hooks={"request": [on_request]}
+                )
+        return client
+
+    def async_client(
+        self, base_url: str, *, verify_ssl: bool = True, http2: bool = True
+    ) -> httpx.AsyncClient:
+        """Get the running event loop's asynchronous client for a base URL & TLS settings."""
+        key = self._key(base_url, verify_ssl, http2)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._aclients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                trace = self._trace(base_url)
+
+                async def atrace(event: str, info: t.Any) -> None:
+                    trace(event, info)
+
+                async def on_request(request: httpx.Request) -> None:
+                    request.extensions["trace"] = atrace
+                    self._count(base_url, "requests")
+
+                client = clients[key] = httpx.AsyncClient(
+                    **self._options(key), event_hooks={"request": [on_request]}
+                )
+        return client
+
+    def stats(self) -> t.Dict[str, ClientStats]:
+        """Get request & connection counters, and the share of requests reusing a connection."""
+        with self._lock:
+            return {
+                base_url: {
+                    "requests": counters["requests"],
+                    "connections": counters["connections"],
+                    "reuse_rate": (
+                        max(counters["requests"] - counters["connections"], 0)
+                        / counters["requests"]
+                        if counters["requests"]
+                        else 0.0
+                    ),
+                }
+                for base_url, counters in self._stats.items()
+            }
+
+    async def close(self) -> None:
+        """Close the running event loop's asynchronous clients & all synchronous clients."""
+        with self._lock:
+            aclients = self._aclients.pop(asyncio.get_running_loop(), {})
+            clients, self._clients = self._clients, {}
+        for client in aclients.values():
+            await client.aclose()
+        for client in clients.values():
+            client.close()
+        for base_url, stats in self.stats().items():
+            log.bind(url=base_url, **stats).info("HTTP client connection reuse")
+
+
+_pool = HTTPClientPool()
+
+
+def use_client_pool() -> HTTPClientPool:
+    """Get this process's HTTP client pool."""
+    return _pool
@@ -0,0 +1,79 @@
+"""In-memory indexes of files on disk, reloaded when the files change."""
+
+# Standard Library
+import time
+import typing as t
+import threading
+from pathlib import Path
+
+# Project
+from hyperglass.log import log
+
+
+class ReloadingIndex:
+    """In-memory index of one or more files, reloaded when any of them change.
+
+    The files' modification times are checked at most once per `check_interval` seconds. When one
+    changes, the files are reloaded in a background thread, while the previous index keeps being
+    used. Subclasses load the files in `_load()`, and call `_check()` before each lookup.
+    """
+
+    # Plural name of the indexed data, used in logs.
+    name: t.ClassVar[str] = "files"
+    paths: t.Tuple[Path, ...]
+    check_interval: float
+
+    def __init__(self, *paths: Path, check_interval: float = 5.0) -> None:
+        """Load the files."""
+        self.paths = paths
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._reloading: t.Optional[threading.Thread] = None
+        self._checked_at = time.monotonic()
+        self._mtimes = self._stat()
+        self._load()
+
+    def _stat(self) -> t.Tuple[int, ...]:
+        """Get the modification time of each file."""
+        return tuple(path.stat().st_mtime_ns for path in self.paths)
+
+    def _files(self) -> str:
+        """Represent the indexed files for logs."""
+        return ", ".join(str(path) for path in self.paths)
+
+    def _load(self) -> None:
+        """Read & index the files, then replace the current index."""
+        raise NotImplementedError
+
+    def _reload(self) -> None:
+        """Reload the files, keeping the current index if they can't be loaded."""
+        try:
+            self._load()
+        except Exception as err:
+            log.bind(path=self._files(), error=str(err)).error("Failed to reload {}", self.name)
+
+    def _check(self) -> None:
+        """Start reloading the files if any have changed since the last check."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            if self._reloading is not None and self._reloading.is_alive():
+                return
+            self._checked_at = now
+            try:
+                mtimes = self._stat()
+            except OSError as err:
+                log.bind(path=self._files(), error=str(err)).warning("Unable to read {}", self.name)
+                return
+            if mtimes == self._mtimes:
+                return
+            self._mtimes = mtimes
+            self._reloading = threading.Thread(
+                target=self._reload,
+                name="hyperglass-{}-reload".format(type(self).__name__.lower()),
+                daemon=True,
+            )
+            self._reloading.start()
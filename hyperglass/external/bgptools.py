@@ -1,4 +1,4 @@
-"""Query & parse data from bgp.tools.
+"""Query & parse data from bgp.tools, or look it up in local datasets.
 
 - See https://bgp.tools/credits for acknowledgements and licensing.
 - See https://bgp.tools/kb/api for query documentation.
@@ -8,15 +8,26 @@
 import re
 import typing as t
 import asyncio
+import weakref
 from ipaddress import IPv4Address, IPv6Address, ip_address
 
 # Project
 from hyperglass.log import log
 from hyperglass.state import use_state
+from hyperglass.external.network_db import NetworkTable, use_network_table
 
 DEFAULT_KEYS = ("asn", "ip", "prefix", "country", "rir", "allocated", "org")
 
 CACHE_KEY = "hyperglass.external.bgptools"
+# Each target's network info is cached for this many seconds.
+CACHE_TIMEOUT = 86400
+
+WHOIS_HOST = "bgp.tools"
+WHOIS_PORT = 43
+# Seconds to wait for a whois session to complete.
+WHOIS_TIMEOUT = 10
+# Seconds to collect targets missing from the cache, so they're queried in one whois session.
+BATCH_WINDOW = 0.05
 
 TargetDetail = t.TypedDict(
     "TargetDetail",
@@ -65,7 +76,7 @@ def default_ip_targets(*targets: str) -> t.Tuple[TargetData, t.Tuple[str, ...]]:
     return default_data, query
 
 
-def parse_whois(output: str, targets: t.List[str]) -> TargetDetail:
+def parse_whois(output: str, targets: t.Sequence[str]) -> TargetData:
     """Parse raw whois output from bgp.tools.
 
     Sample output:
@@ -76,9 +87,12 @@ def parse_whois(output: str, targets: t.List[str]) -> TargetDetail:
     def lines(raw):
         """Generate clean string values for each column."""
         for r in (r for r in raw.split("\n") if r):
-            fields = (re.sub(r"(\n|\r)", "", field).strip(" ") for field in r.split("|"))
-            yield fields
+            fields = [re.sub(r"(\n|\r)", "", field).strip(" ") for field in r.split("|")]
+            # Skip anything that isn't a result, such as an error message.
+            if len(fields) == len(DEFAULT_KEYS):
+                yield fields
 
+    wanted = set(targets)
     data = {}
 
     for line in lines(output):
@@ -86,9 +100,8 @@ def parse_whois(output: str, targets: t.List[str]) -> TargetDetail:
         asn, ip, prefix, country, rir, allocated, org = line
 
         # Match the line to the item in the list of resources to query.
-        if ip in targets:
-            i = targets.index(ip)
-            data[targets[i]] = {
+        if ip in wanted:
+            data[ip] = {
                 "asn": asn,
                 "ip": ip,
                 "prefix": prefix,
@@ -101,71 +114,174 @@ def parse_whois(output: str, targets: t.List[str]) -> TargetDetail:
     return data
 
 
-async def run_whois(targets: t.List[str]) -> str:
-    """Open raw socket to bgp.tools and execute query."""
+async def run_whois(targets: t.Sequence[str]) -> str:
+    """Open raw socket to bgp.tools and execute a bulk query."""
 
     # Construct bulk query
     query = "\n".join(("begin", *targets, "end\n")).encode()
 
     # Open the socket to bgp.tools
     log.debug("Opening connection to bgp.tools")
-    reader, writer = await asyncio.open_connection("bgp.tools", port=43)
-
-    # Send the query
-    writer.write(query)
-    if writer.can_write_eof():
-        writer.write_eof()
-    await writer.drain()
-
-    # Read the response
-    response = b""
-    while True:
-        data = await reader.read(128)
-        if data:
-            response += data
-        else:
-            log.debug("Closing connection to bgp.tools")
-            writer.close()
-            break
+    reader, writer = await asyncio.open_connection(WHOIS_HOST, port=WHOIS_PORT)
+    try:
+        # Send the query
+        writer.write(query)
+        if writer.can_write_eof():
+            writer.write_eof()
+        await writer.drain()
+
+        # Read the response until the server closes the connection, in buffer-sized chunks.
+        response = await reader.read()
+    finally:
+        log.debug("Closing connection to bgp.tools")
+        writer.close()
 
     return response.decode()
 
 
+class WhoisBatcher:
+    """Query targets missing from the cache together, in one whois session per collection window.
+
+    Targets requested while a query for them is pending or running share its result.
+    """
+
+    def __init__(self) -> None:
+        """Start with no pending targets."""
+        self._futures: t.Dict[str, "asyncio.Future[t.Optional[TargetDetail]]"] = {}
+        self._pending: t.List[str] = []
+        self._timer: t.Optional[asyncio.TimerHandle] = None
+        self._tasks: t.Set[asyncio.Task] = set()
+
+    async def lookup(self, targets: t.Sequence[str]) -> TargetData:
+        """Get network info for targets; targets bgp.tools has no info for are omitted."""
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for target in targets:
+            future = self._futures.get(target)
+            if future is None:
+                future = self._futures[target] = loop.create_future()
+                self._pending.append(target)
+            futures[target] = future
+
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(BATCH_WINDOW, self._flush)
+
+        # Shield the shared futures, so one cancelled request doesn't cancel others' results.
+        results = await asyncio.gather(*(asyncio.shield(future) for future in futures.values()))
+        return {target: detail for target, detail in zip(futures, results) if detail is not None}
+
+    def _flush(self) -> None:
+        """Query all pending targets."""
+        self._timer = None
+        targets, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._query(targets))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _query(self, targets: t.List[str]) -> None:
+        """Query targets in one whois session, share the results & cache them."""
+        data: TargetData = {}
+        try:
+            data = parse_whois(await asyncio.wait_for(run_whois(targets), WHOIS_TIMEOUT), targets)
+        except Exception as err:
+            log.bind(targets=targets, error=str(err)).error("Failed to query bgp.tools")
+        finally:
+            for target in targets:
+                future = self._futures.pop(target)
+                if not future.done():
+                    future.set_result(data.get(target))
+
+        if data:
+            try:
+                await use_state("async_cache").set_many_maps(
+                    {_cache_key(target): {"data": detail} for target, detail in data.items()},
+                    expire_in=CACHE_TIMEOUT,
+                )
+                log.bind(targets=list(data)).debug("Cached network info")
+            except Exception as err:
+                log.bind(error=str(err)).error("Failed to cache network info")
+
+
+# Futures & timers are bound to the event loop they were created in, so each event loop gets its
+# own batcher.
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WhoisBatcher]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _batcher() -> WhoisBatcher:
+    """Get the whois batcher for the running event loop."""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = WhoisBatcher()
+    return batcher
+
+
+def local_network_table() -> t.Optional[NetworkTable]:
+    """Get the network table used to look up network info, if local datasets are configured."""
+    config = use_state("params").network_info
+    if config.local:
+        return use_network_table(
+            pfx2as=config.pfx2as_file,
+            delegations=config.delegation_files,
+            asn_names=config.asn_names_file,
+        )
+    return None
+
+
+def _cache_key(target: str) -> str:
+    """Get a target's cache key; each target is cached separately, with its own expiry.
+
+    Cache keys are split on dots & repeated parts are removed, so IPv4 addresses' dots are
+    replaced. IPv6 addresses never contain dashes, so the encoded targets remain unique.
+    """
+    return "{}.{}".format(CACHE_KEY, target.replace(".", "-"))
+
+
 async def network_info(*targets: str) -> TargetData:
-    """Get ASN, Containing Prefix, and other info about an internet resource."""
+    """Get ASN, Containing Prefix, and other info about an internet resource.
 
-    default_data, query_targets = default_ip_targets(*targets)
+    If local datasets are configured, targets are looked up in them first. Otherwise, or if they
+    don't cover a target & falling back is enabled, targets are looked up with bgp.tools.
+    """
 
-    cache = use_state("cache")
+    default_data, query_targets = default_ip_targets(*targets)
+    query_targets = tuple(dict.fromkeys(query_targets))
 
     # Set default data structure.
     query_data = {t: {k: "" for k in DEFAULT_KEYS} for t in query_targets}
 
-    # Get all cached bgp.tools data.
-    cached = cache.get_map(CACHE_KEY) or {}
-
-    # Try to use cached data for each of the items in the list of
-    # resources.
-    for target in (target for target in query_targets if target in cached):
-        # Reassign the cached network info to the matching resource.
-        query_data[target] = cached[target]
-        log.bind(target=target).debug("Using cached network info")
-
-    # Remove cached items from the resource list so they're not queried.
-    targets = [t for t in query_targets if t not in cached]
+    table = local_network_table()
+    if table is not None:
+        local_data = {}
+        for target in query_targets:
+            detail = table.lookup(target)
+            if detail is not None:
+                local_data[target] = detail
+        query_data.update(local_data)
+        # Only query bgp.tools for targets the local datasets don't cover, if enabled.
+        if not use_state("params").network_info.fallback:
+            return {**default_data, **query_data}
+        query_targets = tuple(target for target in query_targets if target not in local_data)
 
     try:
-        if targets:
-            whoisdata = await run_whois(targets)
-
-            if whoisdata:
-                # If the response is not empty, parse it.
-                query_data.update(parse_whois(whoisdata, targets))
+        # Get cached bgp.tools data for all targets in a single round trip.
+        cached = await use_state("async_cache").get_many_map_items(
+            [_cache_key(target) for target in query_targets], "data"
+        )
+        # Remove cached items from the resource list so they're not queried.
+        targets = []
+        for target, items in zip(query_targets, cached):
+            if "data" in items:
+                # Reassign the cached network info to the matching resource.
+                query_data[target] = items["data"]
+                log.bind(target=target).debug("Using cached network info")
+            else:
+                targets.append(target)
 
-                # Cache the response
-                for target in targets:
-                    cache.set_map_item(CACHE_KEY, target, query_data[target])
-                    log.bind(target=t).debug("Cached network info")
+        if targets:
+            query_data.update(await _batcher().lookup(targets))
 
     except Exception as err:
         log.error(err)
@@ -5,7 +5,7 @@ import typing as t
 
 # Project
 from hyperglass.log import log
-from hyperglass.models.webhook import Webhook
+from hyperglass.models.webhook import Webhook, WebhookDigest
 
 # Local
 from ._base import BaseExternal
@@ -21,7 +21,9 @@ class GenericHook(BaseExternal, name="Generic"):
     def __init__(self: "GenericHook", config: "Http") -> None:
         """Initialize external base class with http connection details."""
 
-        super().__init__(base_url=f"{config.host.scheme}://{config.host.host}", config=config)
+        super().__init__(
+            base_url=f"{config.host.scheme}://{config.host.host}:{config.host.port}", config=config
+        )
 
     async def send(self: "GenericHook", query: t.Dict[str, t.Any]):
         """Send an incoming webhook to http endpoint."""
@@ -35,3 +37,19 @@ class GenericHook(BaseExternal, name="Generic"):
             params=self.config.params,
             data=payload.export_dict(),
         )
+
+    async def send_many(self: "GenericHook", queries: t.Sequence[t.Dict[str, t.Any]]):
+        """Send several queries to http endpoint, combined into one request if needed."""
+
+        if len(queries) == 1:
+            return await self.send(queries[0])
+
+        digest = WebhookDigest(webhooks=queries)
+        log.bind(host=self.config.host.host, count=len(queries)).debug("Sending digest")
+
+        return await self._apost(
+            endpoint=self.config.host.path,
+            headers=self.config.headers,
+            params=self.config.params,
+            data=digest.export_dict(),
+        )
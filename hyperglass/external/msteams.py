@@ -6,7 +6,7 @@ import typing as t
 # Project
 from hyperglass.log import log
 from hyperglass.external._base import BaseExternal
-from hyperglass.models.webhook import Webhook
+from hyperglass.models.webhook import Webhook, WebhookDigest
 
 if t.TYPE_CHECKING:
     # Project
@@ -28,3 +28,14 @@ class MSTeams(BaseExternal, name="MSTeams"):
         log.bind(destination="MS Teams", payload=payload).debug("Sending request")
 
         return await self._apost(endpoint=self.config.host.path, data=payload.msteams())
+
+    async def send_many(self: "MSTeams", queries: t.Sequence[t.Dict[str, t.Any]]):
+        """Send several queries to Microsoft Teams, combined into one message if needed."""
+
+        if len(queries) == 1:
+            return await self.send(queries[0])
+
+        digest = WebhookDigest(webhooks=queries)
+        log.bind(destination="MS Teams", count=len(queries)).debug("Sending digest")
+
+        return await self._apost(endpoint=self.config.host.path, data=digest.msteams())
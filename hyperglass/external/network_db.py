@@ -0,0 +1,350 @@
+"""Look up network info for IP addresses locally, from prefix-to-AS & RIR delegation datasets.
+
+Supported datasets:
+
+- Prefix-to-AS: CAIDA's RouteViews pfx2as format (`<network> <length> <asn>`), for the origin ASN
+  & prefix routing each address.
+- RIR delegations: the RIRs' extended delegation statistics (`delegated-<rir>-extended-latest`),
+  for the country, registry & allocation date of each address.
+- ASN names: bgp.tools' `asns.csv`, or `<asn> <name>` lines, for the organization of each ASN.
+
+Address ranges are flattened into sorted, disjoint intervals, where each interval maps to the most
+specific range covering it. A lookup is a binary search of each dataset's interval starts.
+"""
+
+# Standard Library
+import io
+import re
+import csv
+import sys
+import time
+import socket
+import typing as t
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+# Project
+from hyperglass.log import log
+
+# Local
+from ._reload import ReloadingIndex
+
+__all__ = ("NetworkTable", "use_network_table")
+
+# (start, end, value) of an address range, where start & end are inclusive integer addresses.
+Interval = t.Tuple[int, int, int]
+
+# Registry names, as bgp.tools reports them.
+REGISTRIES = {
+    "afrinic": "AfriNIC",
+    "apnic": "APNIC",
+    "arin": "ARIN",
+    "lacnic": "LACNIC",
+    "ripencc": "RIPE",
+}
+
+ASN_SEPARATOR = re.compile(r"[_,]")
+
+
+def _parse_address(address: str) -> t.Tuple[int, int]:
+    """Parse an IP address into its version & integer value, much faster than `ipaddress`."""
+    version, family = (6, socket.AF_INET6) if ":" in address else (4, socket.AF_INET)
+    try:
+        return version, int.from_bytes(socket.inet_pton(family, address), "big")
+    except OSError as err:
+        raise ValueError(f"{address!r} is not a valid IP address") from err
+
+
+def _format_address(version: int, address: int) -> str:
+    """Format an integer IP address."""
+    if version == 6:
+        return socket.inet_ntop(socket.AF_INET6, address.to_bytes(16, "big"))
+    return socket.inet_ntop(socket.AF_INET, address.to_bytes(4, "big"))
+
+
+def _address_array(version: int) -> t.MutableSequence[int]:
+    """Get an empty, compact sequence for integer addresses of an IP version."""
+    # IPv6 addresses don't fit in any array type.
+    return array("I") if version == 4 else []
+
+
+class Intervals:
+    """Sorted, disjoint address intervals, each mapped to an integer value."""
+
+    __slots__ = ("starts", "ends", "values")
+
+    def __init__(self, version: int, intervals: t.Iterable[Interval]) -> None:
+        """Flatten address ranges, which may be nested but must not otherwise overlap.
+
+        Where ranges are nested, addresses map to the value of the most specific range.
+        """
+        self.starts = _address_array(version)
+        self.ends = _address_array(version)
+        self.values = array("I")
+        # Enclosing ranges come before the ranges they contain.
+        stack: t.List[t.Tuple[int, int]] = []
+        cursor = 0
+        for start, end, value in sorted(intervals, key=lambda i: (i[0], -i[1])):
+            # Close ranges ending before this one starts.
+            while stack and stack[-1][0] < start:
+                closed_end, closed_value = stack.pop()
+                self._add(cursor, closed_end, closed_value)
+                cursor = max(cursor, closed_end + 1)
+            if stack:
+                self._add(cursor, start - 1, stack[-1][1])
+            cursor = start
+            stack.append((end, value))
+        while stack:
+            closed_end, closed_value = stack.pop()
+            self._add(cursor, closed_end, closed_value)
+            cursor = max(cursor, closed_end + 1)
+
+    def __len__(self) -> int:
+        """Count intervals."""
+        return len(self.starts)
+
+    def _add(self, start: int, end: int, value: int) -> None:
+        if start > end:
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+        self.values.append(value)
+
+    def find(self, address: int) -> t.Optional[int]:
+        """Get the value of the interval containing an address, if any."""
+        i = bisect_right(self.starts, address) - 1
+        if i >= 0 and address <= self.ends[i]:
+            return self.values[i]
+        return None
+
+    def memory(self) -> int:
+        """Estimate the memory used by the intervals, in bytes."""
+        size = sum(sys.getsizeof(i) for i in (self.starts, self.ends, self.values))
+        if isinstance(self.starts, list):
+            size += sum(sys.getsizeof(i) for i in self.starts)
+            size += sum(sys.getsizeof(i) for i in self.ends)
+        return size
+
+
+class Prefixes(t.NamedTuple):
+    """Routed prefixes of an IP version, & the intervals mapping addresses to them."""
+
+    intervals: Intervals
+    networks: t.MutableSequence[int]
+    lengths: "array[int]"
+    asns: "array[int]"
+
+
+class Delegations(t.NamedTuple):
+    """Delegated ranges of an IP version, mapped to (country, registry, allocated) details."""
+
+    intervals: Intervals
+    details: t.List[t.Tuple[str, str, str]]
+
+
+def _parse_asn(value: str) -> int:
+    """Parse an ASN formatted as an integer or as 'AS<number>'."""
+    return int(value.strip().upper().removeprefix("AS"))
+
+
+def _read_pfx2as(data: str) -> t.Iterator[t.Tuple[int, int, int, int]]:
+    """Read (IP version, network, prefix length, origin ASN) from pfx2as data."""
+    for line in data.splitlines():
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        try:
+            if "/" in fields[0]:
+                address, _, length = fields[0].partition("/")
+                asn = fields[1]
+            else:
+                address, length, asn = fields[:3]
+            version, network = _parse_address(address)
+            length = int(length)
+            # Multi-origin prefixes & AS sets list several ASNs; use the first.
+            origin = _parse_asn(ASN_SEPARATOR.split(asn, 1)[0])
+        except (IndexError, ValueError):
+            continue
+        host_bits = (32 if version == 4 else 128) - length
+        if host_bits < 0 or length < 0:
+            continue
+        yield version, network >> host_bits << host_bits, length, origin
+
+
+def _read_delegations(data: str) -> t.Iterator[t.Tuple[int, int, int, t.Tuple[str, str, str]]]:
+    """Read (IP version, first address, last address, details) from delegation statistics."""
+    for line in data.splitlines():
+        fields = line.split("|")
+        # Skip comments, the version line, summary lines & ASN delegations.
+        if len(fields) < 7 or fields[2] not in ("ipv4", "ipv6") or fields[1] == "*":
+            continue
+        registry, country, kind, start, value, date, status = fields[:7]
+        if status not in ("allocated", "assigned"):
+            continue
+        try:
+            version, first = _parse_address(start)
+            if kind == "ipv4":
+                last = first + int(value) - 1
+            else:
+                last = first + 2 ** (128 - int(value)) - 1
+        except ValueError:
+            continue
+        allocated = f"{date[:4]}-{date[4:6]}-{date[6:8]}" if date.strip("0") else ""
+        details = (country.upper(), REGISTRIES.get(registry.lower(), registry.upper()), allocated)
+        yield version, first, last, details
+
+
+def _read_asn_names(data: str) -> t.Iterator[t.Tuple[int, str]]:
+    """Read (ASN, name) from bgp.tools' asns.csv, or from '<asn> <name>' lines."""
+    if data[:4].lower() == "asn,":
+        rows = csv.reader(io.StringIO(data))
+    else:
+        rows = (line.split(None, 1) for line in data.splitlines())
+    for row in rows:
+        if len(row) < 2:
+            continue
+        try:
+            yield _parse_asn(row[0]), row[1].strip()
+        except ValueError:
+            # Skip the header row.
+            continue
+
+
+def _build_prefixes(data: str) -> t.Dict[int, Prefixes]:
+    """Index routed prefixes per IP version."""
+    prefixes = {
+        version: Prefixes(None, _address_array(version), array("B"), array("I"))
+        for version in (4, 6)
+    }
+    intervals: t.Dict[int, t.List[Interval]] = {4: [], 6: []}
+    for version, network, length, asn in _read_pfx2as(data):
+        table = prefixes[version]
+        bits = 32 if version == 4 else 128
+        intervals[version].append(
+            (network, network + (1 << (bits - length)) - 1, len(table.networks))
+        )
+        table.networks.append(network)
+        table.lengths.append(length)
+        table.asns.append(asn)
+    return {
+        version: table._replace(intervals=Intervals(version, intervals[version]))
+        for version, table in prefixes.items()
+    }
+
+
+def _build_delegations(data: t.Iterable[str]) -> t.Dict[int, Delegations]:
+    """Index delegated ranges per IP version, from each RIR's delegation statistics."""
+    details: t.Dict[t.Tuple[str, str, str], int] = {}
+    intervals: t.Dict[int, t.List[Interval]] = {4: [], 6: []}
+    for text in data:
+        for version, first, last, detail in _read_delegations(text):
+            # Many ranges share details, so each distinct set of details is stored once.
+            intervals[version].append((first, last, details.setdefault(detail, len(details))))
+    unique = list(details)
+    return {
+        version: Delegations(Intervals(version, ranges), unique)
+        for version, ranges in intervals.items()
+    }
+
+
+class NetworkTable(ReloadingIndex):
+    """In-memory index of network info datasets, reloaded when any of the files change."""
+
+    name = "network info"
+    pfx2as: t.Optional[Path]
+    delegations: t.Tuple[Path, ...]
+    asn_names: t.Optional[Path]
+    memory: int
+
+    def __init__(
+        self,
+        *,
+        pfx2as: t.Optional[Path] = None,
+        delegations: t.Sequence[Path] = (),
+        asn_names: t.Optional[Path] = None,
+        check_interval: float = 5.0,
+    ) -> None:
+        """Load the datasets."""
+        self.pfx2as = pfx2as
+        self.delegations = tuple(delegations)
+        self.asn_names = asn_names
+        paths = (pfx2as, *self.delegations, asn_names)
+        super().__init__(*(p for p in paths if p is not None), check_interval=check_interval)
+
+    def __repr__(self) -> str:
+        """Represent network table by files & size."""
+        return "NetworkTable(path={!r}, memory={!r})".format(self._files(), self.memory)
+
+    def _load(self) -> None:
+        """Read & index the datasets, then replace the current indexes."""
+        started = time.perf_counter()
+        prefixes = _build_prefixes(self.pfx2as.read_text() if self.pfx2as else "")
+        delegations = _build_delegations(path.read_text() for path in self.delegations)
+        names = dict(_read_asn_names(self.asn_names.read_text() if self.asn_names else ""))
+        memory = sys.getsizeof(names) + sum(sys.getsizeof(name) for name in names.values())
+        for version in (4, 6):
+            table = prefixes[version]
+            memory += table.intervals.memory() + delegations[version].intervals.memory()
+            memory += sum(sys.getsizeof(i) for i in (table.networks, table.lengths, table.asns))
+            if isinstance(table.networks, list):
+                memory += sum(sys.getsizeof(i) for i in table.networks)
+        # Replace all indexes at once, so lookups never see a partial set.
+        self._prefixes, self._delegations, self._names = prefixes, delegations, names
+        self.memory = memory
+        log.bind(
+            path=self._files(),
+            prefixes=sum(len(p.asns) for p in prefixes.values()),
+            delegations=sum(len(d.intervals) for d in delegations.values()),
+            names=len(names),
+            memory=f"{memory / 1024 / 1024:.1f} MB",
+            duration=f"{time.perf_counter() - started:.2f}s",
+        ).info("Loaded network info")
+
+    def lookup(self, target: str) -> t.Optional[t.Dict[str, str]]:
+        """Get network info for an IP address, or `None` if no dataset covers it."""
+        self._check()
+        version, address = _parse_address(target)
+        prefixes = self._prefixes[version]
+        delegations = self._delegations[version]
+        prefix = prefixes.intervals.find(address)
+        delegation = delegations.intervals.find(address)
+        if prefix is None and delegation is None:
+            return None
+
+        detail = dict.fromkeys(("asn", "prefix", "country", "rir", "allocated", "org"), "")
+        detail["ip"] = target
+        if prefix is not None:
+            asn = prefixes.asns[prefix]
+            network = _format_address(version, prefixes.networks[prefix])
+            detail.update(
+                asn=str(asn),
+                prefix=f"{network}/{prefixes.lengths[prefix]}",
+                org=self._names.get(asn, ""),
+            )
+        if delegation is not None:
+            country, rir, allocated = delegations.details[delegation]
+            detail.update(country=country, rir=rir, allocated=allocated)
+        return detail
+
+
+_tables: t.Dict[t.Tuple[t.Any, ...], NetworkTable] = {}
+_tables_lock = threading.Lock()
+
+
+def use_network_table(
+    *,
+    pfx2as: t.Optional[Path] = None,
+    delegations: t.Sequence[Path] = (),
+    asn_names: t.Optional[Path] = None,
+) -> NetworkTable:
+    """Get this process's network table for a set of datasets, loading it on first use."""
+    key = (pfx2as, tuple(delegations), asn_names)
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = _tables[key] = NetworkTable(
+                pfx2as=pfx2as, delegations=delegations, asn_names=asn_names
+            )
+        return table
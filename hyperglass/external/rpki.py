@@ -1,11 +1,13 @@
-"""Validate RPKI state via Cloudflare GraphQL API."""
+"""Validate RPKI state via Cloudflare GraphQL API, or a local VRP export."""
 
 # Standard Library
 import typing as t
+import asyncio
 
 # Project
 from hyperglass.log import log
 from hyperglass.state import use_state
+from hyperglass.external.vrp import VRPTable, use_vrp_table
 from hyperglass.external._base import BaseExternal
 
 if t.TYPE_CHECKING:
@@ -14,46 +16,168 @@ if t.TYPE_CHECKING:
 
 RPKI_STATE_MAP = {"Invalid": 0, "Valid": 1, "NotFound": 2, "DEFAULT": 3}
 RPKI_NAME_MAP = {v: k for k, v in RPKI_STATE_MAP.items()}
+RPKI_URL = "https://rpki.cloudflare.com"
 CACHE_KEY = "hyperglass.external.rpki"
+# Cached RPKI states are discarded together, at most this many seconds after the first is cached.
+CACHE_TIMEOUT = 3600
+# Maximum number of validations requested in a single GraphQL query.
+BATCH_SIZE = 50
+# Maximum number of GraphQL queries in flight at once.
+MAX_CONCURRENT = 4
 
+RPKITarget = t.Tuple[str, int]
 
-def rpki_state(prefix: t.Union["IPv4Address", "IPv6Address", str], asn: t.Union[int, str]) -> int:
-    """Get RPKI state and map to expected integer."""
-    _log = log.bind(prefix=prefix, asn=asn)
-    _log.debug("Validating RPKI State")
 
-    cache = use_state("cache")
+def local_vrp_table() -> t.Optional[VRPTable]:
+    """Get the VRP table used to validate RPKI states, if local validation is configured."""
+    rpki = use_state("params").structured.rpki
+    if rpki.mode == "local":
+        return use_vrp_table(rpki.vrp_file)
+    return None
 
-    state = 3
-    ro = f"{prefix!s}@{asn!s}"
 
-    cached = cache.get_map(CACHE_KEY, ro)
+def _cache_item(target: RPKITarget) -> str:
+    """Get the hash map item under which a (prefix, origin ASN) pair's RPKI state is cached."""
+    prefix, asn = target
+    return f"{prefix}@{asn}"
 
-    if cached is not None:
-        state = cached
-    else:
-        ql = 'query GetValidation {{ validation(prefix: "{}", asn: {}) {{ state }} }}'
-        query = ql.format(prefix, asn)
-        _log.bind(query=query).debug("Cloudflare RPKI GraphQL Query")
+
+def _graphql_query(targets: t.Sequence[RPKITarget]) -> str:
+    """Construct a GraphQL query validating each target, aliased by its index."""
+    fields = " ".join(
+        f'r{idx}: validation(prefix: "{prefix}", asn: {asn}) {{ state }}'
+        for idx, (prefix, asn) in enumerate(targets)
+    )
+    return f"query GetValidation {{ {fields} }}"
+
+
+async def _validate(
+    client: BaseExternal, targets: t.Sequence[RPKITarget], semaphore: asyncio.Semaphore
+) -> t.Dict[RPKITarget, int]:
+    """Validate a batch of targets in a single GraphQL query."""
+    query = _graphql_query(targets)
+    log.bind(query=query).debug("Cloudflare RPKI GraphQL Query")
+
+    async with semaphore:
+        response = await client._apost("/api/graphql", data={"query": query})
+    return _parse_states(targets, response)
+
+
+def _parse_states(targets: t.Sequence[RPKITarget], response: t.Any) -> t.Dict[RPKITarget, int]:
+    """Map each target's state in a GraphQL response to the expected integer."""
+    data = response.get("data") or {}
+    states = {}
+    for idx, target in enumerate(targets):
         try:
-            with BaseExternal(base_url="https://rpki.cloudflare.com") as client:
-                response = client._post("/api/graphql", data={"query": query})
-            try:
-                validation_state = response["data"]["validation"]["state"]
-            except KeyError as missing:
-                _log.error("Response from Cloudflare missing key '{}': {!r}", missing, response)
-                validation_state = 3
-
-            state = RPKI_STATE_MAP[validation_state]
-            cache.set_map_item(CACHE_KEY, ro, state)
+            states[target] = RPKI_STATE_MAP[data[f"r{idx}"]["state"]]
+        except (KeyError, TypeError) as missing:
+            log.bind(target=target).error(
+                "Response from Cloudflare missing key '{}': {!r}", missing, response
+            )
+    return states
+
+
+async def _fetch(targets: t.Sequence[RPKITarget]) -> t.Dict[RPKITarget, int]:
+    """Validate targets in concurrent, batched GraphQL queries over the pooled HTTP client."""
+    batches = [targets[i : i + BATCH_SIZE] for i in range(0, len(targets), BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT)
+    client = BaseExternal(base_url=RPKI_URL)
+    results = await asyncio.gather(
+        *(_validate(client, batch, semaphore) for batch in batches), return_exceptions=True
+    )
+
+    states = {}
+    for result in results:
+        if isinstance(result, BaseException):
+            # Targets in a failed batch are left out, so their state isn't cached.
+            log.error(result)
+            continue
+        states.update(result)
+    return states
+
+
+async def rpki_states(
+    targets: t.Iterable[t.Tuple[t.Union["IPv4Address", "IPv6Address", str], t.Union[int, str]]]
+) -> t.Dict[RPKITarget, int]:
+    """Get RPKI states of (prefix, origin ASN) pairs and map to expected integers.
+
+    Each unique pair is looked up once. If local validation is configured, pairs are validated
+    against the local VRP table. Otherwise, cached states are fetched in a single round trip, and
+    the remaining pairs are validated in batched GraphQL queries.
+    """
+    unique = tuple(dict.fromkeys((str(prefix), int(asn)) for prefix, asn in targets))
+    if len(unique) == 0:
+        return {}
+
+    table = local_vrp_table()
+    if table is not None:
+        # Local lookups are faster than a cache round trip, so their results aren't cached.
+        return {target: table.validate(*target) for target in unique}
+
+    cache = use_state("async_cache")
+
+    cached = await cache.get_map_items(CACHE_KEY, *(_cache_item(target) for target in unique))
+    states = {
+        target: cached[_cache_item(target)] for target in unique if _cache_item(target) in cached
+    }
+    misses = [target for target in unique if target not in states]
+    log.bind(cached=len(states), queried=len(misses)).debug("Validating RPKI States")
+
+    if misses:
+        try:
+            validated = await _fetch(misses)
+            if validated:
+                await cache.set_map(
+                    CACHE_KEY,
+                    {_cache_item(target): state for target, state in validated.items()},
+                    expire_in=CACHE_TIMEOUT,
+                    nx=True,
+                )
+            states.update(validated)
         except Exception as err:
             log.error(err)
-            # Don't cache the state when an error produced it.
-            state = 3
 
-    msg = "RPKI Validation State for {} via AS{} is {}".format(prefix, asn, RPKI_NAME_MAP[state])
-    if cached is not None:
-        msg += " [CACHED]"
+    # Don't fail the query when a state couldn't be validated, use the default state instead.
+    return {target: states.get(target, 3) for target in unique}
 
-    log.debug(msg)
+
+def rpki_state(prefix: t.Union["IPv4Address", "IPv6Address", str], asn: t.Union[int, str]) -> int:
+    """Get RPKI state and map to expected integer.
+
+    This is the synchronous counterpart of `rpki_states`, using the synchronous cache & HTTP
+    client, so it may be called from within a running event loop; however, it blocks the loop
+    while the state is validated, so coroutines should await `rpki_states` instead.
+    """
+    target = (str(prefix), int(asn))
+    table = local_vrp_table()
+    if table is not None:
+        state = table.validate(*target)
+    else:
+        state = _rpki_state_sync(target)
+    log.bind(prefix=prefix, asn=asn).debug(
+        "RPKI Validation State for {} via AS{} is {}", prefix, asn, RPKI_NAME_MAP[state]
+    )
     return state
+
+
+def _rpki_state_sync(target: RPKITarget) -> int:
+    """Get a target's cached RPKI state, or validate it in a single GraphQL query."""
+    # States are cached with the same codec as `rpki_states` uses.
+    cache = use_state("cache").with_codec(use_state("params").cache.query_codec)
+    query = _graphql_query((target,))
+    try:
+        cached = cache.get_map(CACHE_KEY, _cache_item(target))
+        if cached is not None:
+            return cached
+        log.bind(query=query).debug("Cloudflare RPKI GraphQL Query")
+        with BaseExternal(base_url=RPKI_URL) as client:
+            response = client._post("/api/graphql", data={"query": query})
+        states = _parse_states((target,), response)
+        if target in states:
+            cache.set_map_item(CACHE_KEY, _cache_item(target), states[target])
+            cache.expire(CACHE_KEY, expire_in=CACHE_TIMEOUT, nx=True)
+    except Exception as err:
+        log.error(err)
+        # Don't cache the state when an error produced it.
+        return 3
+    return states.get(target, 3)
@@ -6,7 +6,7 @@ import typing as t
 # Project
 from hyperglass.log import log
 from hyperglass.external._base import BaseExternal
-from hyperglass.models.webhook import Webhook
+from hyperglass.models.webhook import Webhook, WebhookDigest
 
 if t.TYPE_CHECKING:
     # Project
@@ -28,3 +28,14 @@ class SlackHook(BaseExternal, name="Slack"):
         log.bind(destination="Slack", payload=payload).debug("Sending request")
 
         return await self._apost(endpoint=self.config.host.path, data=payload.slack())
+
+    async def send_many(self: "SlackHook", queries: t.Sequence[t.Dict[str, t.Any]]):
+        """Send several queries to Slack, combined into one message if there's more than one."""
+
+        if len(queries) == 1:
+            return await self.send(queries[0])
+
+        digest = WebhookDigest(webhooks=queries)
+        log.bind(destination="Slack", count=len(queries)).debug("Sending digest")
+
+        return await self._apost(endpoint=self.config.host.path, data=digest.slack())
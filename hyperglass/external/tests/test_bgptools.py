@@ -2,49 +2,170 @@
 
 # Standard Library
 import asyncio
+import threading
+import socketserver
 
 # Third Party
 import pytest
 
+# Project
+from hyperglass.state import use_state
+
 # Local
-from ..bgptools import run_whois, parse_whois, network_info
+from .. import bgptools
+from ..bgptools import CACHE_TIMEOUT, run_whois, parse_whois, network_info
+
+WHOIS_HEADER = "AS    | IP      | BGP Prefix | CC | Registry | Allocated  | AS Name"
 
 WHOIS_OUTPUT = """AS    | IP      | BGP Prefix | CC | Registry | Allocated  | AS Name
 13335 | 1.1.1.1 | 1.1.1.0/24 | US | ARIN     | 2010-07-14 | Cloudflare, Inc."""
 
+# Network info the stand-in server has for each address.
+WHOIS_DATA = {
+    "1.1.1.1": "13335 | 1.1.1.1 | 1.1.1.0/24 | US | ARIN | 2010-07-14 | Cloudflare, Inc.",
+    "8.8.8.8": "15169 | 8.8.8.8 | 8.8.8.0/24 | US | ARIN | 1992-12-01 | Google LLC",
+    "8.8.4.4": "15169 | 8.8.4.4 | 8.8.4.0/24 | US | ARIN | 1992-12-01 | Google LLC",
+    "2606:4700::1111": (
+        "13335 | 2606:4700::1111 | 2606:4700::/44 | US | ARIN | 2011-11-01 | Cloudflare, Inc."
+    ),
+}
+
+
+class WhoisHandler(socketserver.StreamRequestHandler):
+    """Local stand-in for bgp.tools' bulk whois service."""
+
+    sessions = []
 
-# Ignore asyncio deprecation warning about loop
-@pytest.mark.filterwarnings("ignore::DeprecationWarning")
-def test_network_info():
+    def handle(self):
+        """Respond to each address in a bulk query, then close the connection."""
+        lines = self.rfile.read().decode().split("\n")
+        assert lines[0] == "begin" and "end" in lines
+        targets = lines[1 : lines.index("end")]
+        self.sessions.append(targets)
+        response = [WHOIS_HEADER]
+        for target in targets:
+            if target in WHOIS_DATA:
+                response.append(WHOIS_DATA[target])
+            elif target.startswith("203.0.113."):
+                response.append(f"64496 | {target} | 203.0.113.0/24 | ZZ | TEST | - | {'x' * 500}")
+            else:
+                response.append(f"Error: no data for {target}")
+        self.wfile.write("\n".join(response).encode())
 
+
+@pytest.fixture
+def whois_server(monkeypatch, state):
+    """Serve the stand-in whois service & query it instead of bgp.tools."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), WhoisHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(bgptools, "WHOIS_HOST", "127.0.0.1")
+    monkeypatch.setattr(bgptools, "WHOIS_PORT", server.server_address[1])
+    WhoisHandler.sessions = []
+    yield WhoisHandler.sessions
+    server.shutdown()
+    server.server_close()
+
+
+def test_network_info(whois_server):
     checks = (
         ("192.0.2.1", {"asn": "None", "rir": "Private Address"}),
         ("127.0.0.1", {"asn": "None", "rir": "Loopback Address"}),
         ("fe80:dead:beef::1", {"asn": "None", "rir": "Link Local Address"}),
         ("2001:db8::1", {"asn": "None", "rir": "Private Address"}),
         ("1.1.1.1", {"asn": "13335", "rir": "ARIN"}),
+        ("2606:4700::1111", {"asn": "13335", "org": "Cloudflare, Inc."}),
+        ("9.9.9.9", {"asn": "", "rir": ""}),
     )
     for addr, fields in checks:
         info = asyncio.run(network_info(addr))
         assert addr in info
         for key, expected in fields.items():
             assert info[addr][key] == expected
+    # Only global addresses are queried.
+    assert whois_server == [["1.1.1.1"], ["2606:4700::1111"], ["9.9.9.9"]]
+
+
+def test_network_info_cached(whois_server):
+    async def run():
+        first = await network_info("1.1.1.1", "9.9.9.9")
+        cache = use_state("async_cache")
+        key = cache.key(bgptools._cache_key("1.1.1.1"))
+        assert 0 < await cache.instance.ttl(key) <= CACHE_TIMEOUT
+        # Targets without network info aren't cached, so they're queried again.
+        assert not await cache.instance.exists(cache.key(bgptools._cache_key("9.9.9.9")))
+        second = await network_info("1.1.1.1", "8.8.8.8", "9.9.9.9")
+        await cache.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["1.1.1.1"] == second["1.1.1.1"]
+    assert second["8.8.8.8"]["org"] == "Google LLC"
+    assert whois_server == [["1.1.1.1", "9.9.9.9"], ["8.8.8.8", "9.9.9.9"]]
+
+
+def test_cache_keys(whois_server):
+    cache = use_state("async_cache")
+    targets = ("10.0.0.1", "10.0.1.0", "10.0.1.1", "192.0.2.2", "1.1.1.1", "2001:db8::1")
+    keys = {cache.key(bgptools._cache_key(target)) for target in targets}
+    assert len(keys) == len(targets)
+
+    async def run():
+        first = await network_info("8.8.4.4")
+        # Shares all of its octets with the cached target, but isn't cached itself.
+        second = await network_info("8.4.8.8")
+        await cache.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["8.8.4.4"]["org"] == "Google LLC"
+    assert second["8.4.8.8"]["asn"] == ""
+    assert whois_server == [["8.8.4.4"], ["8.4.8.8"]]
+
+
+def test_network_info_batched(whois_server):
+    async def run():
+        return await asyncio.gather(
+            network_info("1.1.1.1"),
+            network_info("8.8.8.8", "1.1.1.1"),
+            network_info("2606:4700::1111", "8.8.8.8", "8.8.8.8"),
+        )
+
+    results = asyncio.run(run())
+    # Concurrent lookups share a single whois session, which queries each target once.
+    assert len(whois_server) == 1
+    assert sorted(whois_server[0]) == ["1.1.1.1", "2606:4700::1111", "8.8.8.8"]
+    assert [sorted(result) for result in results] == [
+        ["1.1.1.1"],
+        ["1.1.1.1", "8.8.8.8"],
+        ["2606:4700::1111", "8.8.8.8"],
+    ]
+    assert results[0]["1.1.1.1"] == results[1]["1.1.1.1"]
+
+
+def test_network_info_unavailable(whois_server, monkeypatch):
+    monkeypatch.setattr(bgptools, "WHOIS_PORT", 1)
+    info = asyncio.run(network_info("1.1.1.1"))
+    assert info["1.1.1.1"]["asn"] == ""
 
 
-# Ignore asyncio deprecation warning about loop
-@pytest.mark.filterwarnings("ignore::DeprecationWarning")
-def test_whois():
-    addr = "192.0.2.1"
-    response = asyncio.run(run_whois([addr]))
+def test_whois(whois_server):
+    # Large enough to need many reads.
+    targets = [f"203.0.113.{i % 256}" for i in range(1000)]
+    response = asyncio.run(run_whois(targets))
     assert isinstance(response, str)
-    assert response != ""
+    assert whois_server == [targets]
+    assert len(response.splitlines()) == len(targets) + 1
+    assert len(parse_whois(response, targets)) == 256
 
 
 def test_whois_parser():
     addr = "1.1.1.1"
-    result = parse_whois(WHOIS_OUTPUT, [addr])
+    result = parse_whois(WHOIS_OUTPUT + "\nError: no data for 192.0.2.1", [addr, "192.0.2.1"])
     assert isinstance(result, dict)
     assert addr in result, "Address missing"
+    assert "192.0.2.1" not in result
     assert result[addr]["asn"] == "13335"
     assert result[addr]["rir"] == "ARIN"
     assert result[addr]["org"] == "Cloudflare, Inc."
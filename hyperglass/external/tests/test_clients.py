@@ -0,0 +1,94 @@
+"""Test pooled HTTP clients."""
+
+# Standard Library
+import json
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.exceptions.private import ExternalError
+
+# Local
+from .._base import BaseExternal
+from .._clients import HTTPClientPool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Local HTTP/1.1 server, which keeps connections open between requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        """Respond with the requested path."""
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Silence request logging."""
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Use a fresh client pool."""
+    pool = HTTPClientPool()
+    monkeypatch.setattr("hyperglass.external._base.use_client_pool", lambda: pool)
+    return pool
+
+
+@pytest.fixture
+def base_url():
+    """Serve the keep-alive server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_reuse(pool, base_url):
+    async def run():
+        # Instances with the same base URL & TLS settings share a client & its connections.
+        first, second = BaseExternal(base_url), BaseExternal(base_url)
+        assert first._asession is second._asession
+        assert BaseExternal(base_url, verify_ssl=False)._asession is not first._asession
+        responses = [await client._aget("/test") for client in (first, second, first)]
+        await pool.close()
+        return responses
+
+    assert asyncio.run(run()) == [{"path": "/test"}] * 3
+    assert pool.stats() == {base_url: {"requests": 3, "connections": 1, "reuse_rate": 2 / 3}}
+
+
+def test_sync_reuse(pool, base_url):
+    with BaseExternal(base_url) as client:
+        client._get("/one")
+    with BaseExternal(base_url) as client:
+        assert client._get("/two") == {"path": "/two"}
+    assert pool.stats()[base_url]["connections"] == 1
+
+    asyncio.run(pool.close())
+    # Closed clients are replaced on next use.
+    assert BaseExternal(base_url)._get("/three") == {"path": "/three"}
+    asyncio.run(pool.close())
+    assert pool.stats()[base_url] == {"requests": 3, "connections": 2, "reuse_rate": 1 / 3}
+
+
+def test_connection_test(pool):
+    # The port isn't tested unless enabled, so nothing is opened before the first request.
+    with BaseExternal("https://invalid.invalid"):
+        pass
+    with pytest.raises(ExternalError):
+        with BaseExternal("https://invalid.invalid", test_connection=True):
+            pass
+    assert pool.stats() == {}
@@ -0,0 +1,173 @@
+"""Test local network info lookups."""
+
+# Standard Library
+import os
+import asyncio
+import threading
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.config.params import Params
+
+# Local
+from ..bgptools import network_info
+from ..network_db import Intervals, NetworkTable
+
+PFX2AS = """1.0.0.0\t24\t13335
+1.1.1.0\t24\t13335
+8.0.0.0\t9\t3356
+8.8.8.0\t24\t15169
+8.8.4.0\t24\t15169_3356
+2606:4700::\t32\t13335
+2001:4860::\t32\t15169
+"""
+
+DELEGATIONS = """2|arin|20240101|3|19700101|20240101|-0500
+arin|*|ipv4|*|2|summary
+arin|US|asn|13335|1|20100714|allocated
+arin|US|ipv4|8.0.0.0|16777216|19921201|allocated
+arin|US|ipv6|2606:4700::|32|20111101|allocated
+arin||ipv4|9.0.0.0|256||available
+"""
+
+APNIC = """apnic|AU|ipv4|1.1.1.0|256|20110811|assigned
+"""
+
+ASN_NAMES = """asn,name,class
+AS13335,"Cloudflare, Inc.",Content
+AS15169,Google LLC,Content
+"""
+
+CHECKS = (
+    (
+        "1.1.1.1",
+        {"asn": "13335", "prefix": "1.1.1.0/24", "country": "AU", "rir": "APNIC"},
+    ),
+    (
+        "8.8.8.8",
+        {"asn": "15169", "prefix": "8.8.8.0/24", "org": "Google LLC", "allocated": "1992-12-01"},
+    ),
+    # Multi-origin prefixes use the first origin.
+    ("8.8.4.4", {"asn": "15169", "prefix": "8.8.4.0/24"}),
+    # The enclosing prefix covers addresses outside of more specific prefixes.
+    ("8.8.9.1", {"asn": "3356", "prefix": "8.0.0.0/9", "org": ""}),
+    # Delegated, but not routed.
+    ("8.200.0.1", {"asn": "", "prefix": "", "country": "US", "rir": "ARIN"}),
+    (
+        "2606:4700::1111",
+        {"asn": "13335", "prefix": "2606:4700::/32", "org": "Cloudflare, Inc.", "country": "US"},
+    ),
+    ("2001:4860::8888", {"asn": "15169", "country": "", "rir": ""}),
+)
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    """Write each dataset to a file."""
+    paths = {}
+    for name, data in (
+        ("pfx2as", PFX2AS),
+        ("arin", DELEGATIONS),
+        ("apnic", APNIC),
+        ("asns.csv", ASN_NAMES),
+    ):
+        paths[name] = tmp_path / name
+        paths[name].write_text(data)
+    return paths
+
+
+def _table(paths, **kwargs):
+    return NetworkTable(
+        pfx2as=paths["pfx2as"],
+        delegations=(paths["arin"], paths["apnic"]),
+        asn_names=paths["asns.csv"],
+        **kwargs,
+    )
+
+
+def test_intervals():
+    intervals = Intervals(4, [(0, 99, 0), (10, 19, 1), (10, 14, 2), (50, 59, 3), (200, 209, 4)])
+    assert list(zip(intervals.starts, intervals.ends, intervals.values)) == [
+        (0, 9, 0),
+        (10, 14, 2),
+        (15, 19, 1),
+        (20, 49, 0),
+        (50, 59, 3),
+        (60, 99, 0),
+        (200, 209, 4),
+    ]
+    addresses = (0, 12, 17, 99, 100, 209, 210)
+    assert [intervals.find(i) for i in addresses] == [0, 2, 1, 0, None, 4, None]
+
+
+@pytest.mark.parametrize("target,fields", CHECKS)
+def test_lookup(datasets, target, fields):
+    table = _table(datasets)
+    assert table.memory > 0
+    detail = table.lookup(target)
+    assert detail["ip"] == target
+    for key, expected in fields.items():
+        assert detail[key] == expected, key
+
+
+def test_lookup_uncovered(datasets):
+    table = _table(datasets)
+    assert table.lookup("9.0.0.1") is None
+    assert table.lookup("2a00::1") is None
+
+
+def test_reload(datasets):
+    table = _table(datasets, check_interval=0)
+    assert table.lookup("9.9.9.9") is None
+
+    path = datasets["pfx2as"]
+    path.write_text(PFX2AS + "9.9.9.0\t24\t19281\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    # The reload runs in the background, so the previous datasets are used until it completes.
+    load, loading = table._load, threading.Event()
+    table._load = lambda: loading.wait() and load()
+    assert table.lookup("9.9.9.9") is None
+    loading.set()
+    table._reloading.join()
+    assert table.lookup("9.9.9.9")["asn"] == "19281"
+
+    # A missing file is ignored, and the previous datasets are kept.
+    path.unlink()
+    table.lookup("9.9.9.9")
+    assert table._reloading.is_alive() is False
+    assert table.lookup("9.9.9.9")["asn"] == "19281"
+
+
+@pytest.mark.parametrize("fallback", (True, False))
+def test_network_info(datasets, monkeypatch, fallback):
+    queried = []
+
+    async def lookup(self, targets):
+        queried.extend(targets)
+        return {}
+
+    monkeypatch.setattr("hyperglass.external.bgptools.WhoisBatcher.lookup", lookup)
+    state = use_state()
+    state.clear()
+    state.publish(
+        params=Params(
+            network_info={
+                "pfx2as_file": datasets["pfx2as"],
+                "delegation_files": [datasets["arin"], datasets["apnic"]],
+                "asn_names_file": datasets["asns.csv"],
+                "fallback": fallback,
+            }
+        )
+    )
+    try:
+        info = asyncio.run(network_info("1.1.1.1", "192.0.2.1", "9.0.0.1"))
+    finally:
+        state.clear()
+    assert info["1.1.1.1"]["org"] == "Cloudflare, Inc."
+    assert info["192.0.2.1"]["rir"] == "Private Address"
+    assert info["9.0.0.1"]["asn"] == ""
+    assert queried == (["9.0.0.1"] if fallback else [])
@@ -1,9 +1,22 @@
 """Test RPKI data fetching."""
+
+# Standard Library
+import re
+import json
+import asyncio
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
 # Third Party
 import pytest
 
+# Project
+from hyperglass.models.config.params import Params
+from hyperglass.models.data.bgp_route import BGPRouteTable
+
 # Local
-from ..rpki import RPKI_NAME_MAP, rpki_state
+from .. import rpki
+from ..rpki import RPKI_NAME_MAP, rpki_state, rpki_states
 
 TEST_STATES = (
     ("103.21.244.0/24", 13335, 0),
@@ -11,6 +24,145 @@ TEST_STATES = (
     ("192.0.2.0/24", 65000, 2),
 )
 
+VALIDATION_PATTERN = re.compile(r'(r\d+): validation\(prefix: "([^"]+)", asn: (\d+)\)')
+
+# Validations of this prefix make the stand-in API fail the whole query.
+FAILING_PREFIX = "198.51.100.0/24"
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    """Local stand-in for Cloudflare's RPKI GraphQL API."""
+
+    queries = []
+
+    def do_POST(self):  # noqa: N802
+        """Respond to each aliased validation in a GraphQL query."""
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        validations = VALIDATION_PATTERN.findall(body["query"])
+        self.queries.append(validations)
+        if any(prefix == FAILING_PREFIX for _, prefix, _ in validations):
+            self.send_response(500)
+            self.end_headers()
+            return
+        data = {
+            alias: {"state": "Valid" if int(asn) == 13335 else "NotFound"}
+            for alias, _, asn in validations
+        }
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        """Silence request logging."""
+        pass
+
+
+@pytest.fixture
+def graphql_api(monkeypatch, state):
+    """Serve the stand-in API & validate RPKI states against it."""
+    server = HTTPServer(("127.0.0.1", 0), GraphQLHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(rpki, "RPKI_URL", "http://127.0.0.1:{}".format(server.server_port))
+    monkeypatch.setattr(rpki, "BATCH_SIZE", 2)
+    GraphQLHandler.queries = []
+    yield GraphQLHandler.queries
+    server.shutdown()
+    server.server_close()
+
+
+def test_rpki_states(graphql_api):
+    targets = [
+        ("1.1.1.0/24", 13335),
+        ("192.0.2.0/24", 65000),
+        ("1.1.1.0/24", "13335"),
+        ("1.0.0.0/24", 13335),
+        ("1.0.0.0/24", 65000),
+        (FAILING_PREFIX, 65000),
+    ]
+    states = asyncio.run(rpki_states(targets))
+    assert states == {
+        ("1.1.1.0/24", 13335): 1,
+        ("192.0.2.0/24", 65000): 2,
+        ("1.0.0.0/24", 13335): 1,
+        ("1.0.0.0/24", 65000): 2,
+        (FAILING_PREFIX, 65000): 3,
+    }
+    # Each unique pair is validated once, in batches.
+    assert sorted(len(validations) for validations in graphql_api) == [1, 2, 2]
+
+    graphql_api.clear()
+    assert asyncio.run(rpki_states(targets)) == states
+    # Only the state that couldn't be validated isn't cached.
+    assert graphql_api == [[("r0", FAILING_PREFIX, "65000")]]
+
+
+def test_rpki_state_in_loop(graphql_api):
+    async def run():
+        # The synchronous lookup works from within a running event loop.
+        state = rpki_state("1.1.1.0/24", 13335)
+        assert rpki_state("1.1.1.0/24", "13335") == state
+        assert rpki_state(FAILING_PREFIX, 65000) == 3
+        return state, await rpki_states((("1.1.1.0/24", 13335),))
+
+    assert asyncio.run(run()) == (1, {("1.1.1.0/24", 13335): 1})
+    # Synchronous & asynchronous lookups share cached states; failed lookups aren't cached.
+    assert graphql_api == [[("r0", "1.1.1.0/24", "13335")], [("r0", FAILING_PREFIX, "65000")]]
+    assert rpki_state(FAILING_PREFIX, 65000) == 3
+    assert len(graphql_api) == 3
+
+
+def test_rpki_state_codec(graphql_api, state):
+    state.publish(params=Params(cache={"codec": "json"}))
+    assert asyncio.run(rpki_states((("1.1.1.0/24", 13335),))) == {("1.1.1.0/24", 13335): 1}
+    # States cached by either lookup are read with the configured codec.
+    assert rpki_state("1.1.1.0/24", 13335) == 1
+    assert rpki_state("1.0.0.0/24", 65000) == 2
+    assert asyncio.run(rpki_states((("1.0.0.0/24", 65000),))) == {("1.0.0.0/24", 65000): 2}
+    assert len(graphql_api) == 2
+    # States that can't be decoded are replaced with the default state.
+    state.redis.instance.hset(state.redis.key(rpki.CACHE_KEY), "192.0.2.0/24@65000", b"\x80")
+    assert rpki_state("192.0.2.0/24", 65000) == 3
+
+
+def _route(prefix, as_path, rpki_state):
+    return {
+        "prefix": prefix,
+        "active": True,
+        "age": 0,
+        "weight": 0,
+        "med": 0,
+        "local_preference": 100,
+        "as_path": as_path,
+        "communities": [],
+        "next_hop": "192.0.2.1",
+        "source_as": as_path[-1] if as_path else 65000,
+        "source_rid": "192.0.2.1",
+        "peer_rid": "192.0.2.1",
+        "rpki_state": rpki_state,
+    }
+
+
+def test_route_table_rpki(graphql_api, state):
+    state.publish(params=Params(structured={"rpki": {"mode": "external"}}))
+    table = BGPRouteTable(
+        vrf="default",
+        routes=[
+            _route("1.1.1.0/24", [1299, 13335], 0),
+            _route("1.1.1.0/24", [174, 13335], 0),
+            _route("1.0.0.0/24", [65000], 0),
+            _route("1.0.0.0/24", [], 0),
+            _route("192.168.0.0/24", [65000], 0),
+        ],
+        winning_weight="low",
+    )
+    asyncio.run(table.validate_rpki())
+    assert [route.rpki_state for route in table.routes] == [2, 3, 1, 1, 0]
+    assert len(graphql_api) == 1
+
 
 @pytest.mark.dependency()
 def test_rpki():
@@ -0,0 +1,100 @@
+"""Test local RPKI validation against VRP exports."""
+
+# Standard Library
+import os
+import json
+import asyncio
+import threading
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.config.params import Params
+
+# Local
+from ..vrp import VRPTable
+from ..rpki import rpki_state, rpki_states
+
+ROAS = [
+    {"asn": "AS13335", "prefix": "1.1.1.0/24", "maxLength": 24, "ta": "apnic"},
+    {"asn": 13335, "prefix": "104.16.0.0/12", "maxLength": 20, "ta": "arin"},
+    {"asn": "AS209242", "prefix": "104.16.0.0/12", "maxLength": 24, "ta": "arin"},
+    {"asn": "AS0", "prefix": "192.0.2.0/24", "maxLength": 32, "ta": "arin"},
+    {"asn": "AS13335", "prefix": "2606:4700::/32", "maxLength": 48, "ta": "arin"},
+]
+
+CSV = """ASN,IP Prefix,Max Length,Trust Anchor
+AS13335,1.1.1.0/24,24,apnic
+AS13335,104.16.0.0/12,20,arin
+AS209242,104.16.0.0/12,24,arin
+AS0,192.0.2.0/24,32,arin
+AS13335,2606:4700::/32,48,arin
+"""
+
+CHECKS = (
+    ("1.1.1.0/24", 13335, 1),
+    ("1.1.1.0/24", 65000, 0),
+    # More specific than the VRP's maximum length.
+    ("1.1.1.128/25", 13335, 0),
+    ("104.16.0.0/20", 13335, 1),
+    ("104.16.0.0/22", 13335, 0),
+    ("104.16.0.0/22", 209242, 1),
+    # AS0 VRPs cover prefixes, but never validate them.
+    ("192.0.2.0/24", 0, 0),
+    ("192.0.2.0/24", 65000, 0),
+    ("2606:4700:10::/44", 13335, 1),
+    ("2606:4700:10::/56", 13335, 0),
+    ("8.8.8.0/24", 15169, 2),
+    ("2001:db8::/32", 65000, 2),
+)
+
+
+@pytest.mark.parametrize("export", ("json", "csv"))
+def test_validate(tmp_path, export):
+    path = tmp_path / f"vrps.{export}"
+    path.write_text(json.dumps({"roas": ROAS}) if export == "json" else CSV)
+    table = VRPTable(path)
+    assert table.count == len(ROAS)
+    assert table.memory > 0
+    for prefix, asn, expected in CHECKS:
+        assert table.validate(prefix, asn) == expected, (prefix, asn)
+
+
+def test_reload(tmp_path):
+    path = tmp_path / "vrps.json"
+    path.write_text(json.dumps({"roas": ROAS[:1]}))
+    table = VRPTable(path, check_interval=0)
+    assert table.validate("104.16.0.0/20", 13335) == 2
+
+    path.write_text(json.dumps({"roas": ROAS}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    # The reload runs in the background, so the previous VRPs are used until it completes.
+    load, loading = table._load, threading.Event()
+    table._load = lambda: loading.wait() and load()
+    assert table.validate("104.16.0.0/20", 13335) == 2
+    loading.set()
+    table._reloading.join()
+    assert table.validate("104.16.0.0/20", 13335) == 1
+    assert table.count == len(ROAS)
+
+    # A broken export is ignored, and the previous VRPs are kept.
+    path.write_text("{")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    table.validate("104.16.0.0/20", 13335)
+    table._reloading.join()
+    assert table.validate("104.16.0.0/20", 13335) == 1
+
+
+def test_local_mode(tmp_path, state):
+    path = tmp_path / "vrps.csv"
+    path.write_text(CSV)
+    state.publish(params=Params(structured={"rpki": {"mode": "local", "vrp_file": path}}))
+    assert rpki_state("1.1.1.0/24", 13335) == 1
+    assert asyncio.run(rpki_states((("1.1.1.0/24", "65000"),))) == {("1.1.1.0/24", 65000): 0}
+
+
+def test_local_mode_requires_file():
+    with pytest.raises(ValueError):
+        Params(structured={"rpki": {"mode": "local"}})
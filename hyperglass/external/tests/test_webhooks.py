@@ -0,0 +1,140 @@
+"""Test background webhook delivery."""
+
+# Standard Library
+import json
+import asyncio
+import threading
+from datetime import datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.webhook import Webhook, WebhookDigest
+from hyperglass.models.config.logging import Http
+
+# Local
+from .. import webhooks
+from ..webhooks import WebhookDispatcher
+
+
+class HookHandler(BaseHTTPRequestHandler):
+    """Local stand-in for a generic webhook endpoint."""
+
+    received = []
+    # Number of requests to fail before succeeding.
+    failures = 0
+
+    def do_POST(self):  # noqa: N802
+        """Record each delivery."""
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if HookHandler.failures > 0:
+            HookHandler.failures -= 1
+            self.send_response(500)
+            self.end_headers()
+            return
+        self.received.append(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        """Silence request logging."""
+        pass
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    """Serve the stand-in endpoint, & skip network info lookups."""
+    server = HTTPServer(("127.0.0.1", 0), HookHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    HookHandler.received = []
+    HookHandler.failures = 0
+
+    async def network_info(*targets):
+        return {target: {"asn": "13335", "org": "Cloudflare, Inc."} for target in targets}
+
+    monkeypatch.setattr(webhooks, "network_info", network_info)
+    monkeypatch.setattr(webhooks, "RETRY_BACKOFF", 0.01)
+    yield "http://127.0.0.1:{}/hook".format(server.server_port)
+    server.shutdown()
+    server.server_close()
+
+
+def _query(i: int):
+    return {
+        "query_location": "router01",
+        "query_type": "bgp_route",
+        "query_target": f"192.0.2.{i}",
+        "headers": {"user-agent": "test"},
+        "source": "1.1.1.1",
+        "timestamp": datetime(2024, 1, 1, 0, 0, i),
+    }
+
+
+def _deliver(config: Http, count: int) -> WebhookDispatcher:
+    async def run():
+        dispatcher = WebhookDispatcher()
+        for i in range(count):
+            dispatcher.submit(config, _query(i))
+        await dispatcher.close()
+        return dispatcher
+
+    return asyncio.run(run())
+
+
+def test_single(endpoint):
+    dispatcher = _deliver(Http(host=endpoint), 1)
+    assert dispatcher.sent == 1
+    (body,) = HookHandler.received
+    assert body["query_target"] == "192.0.2.0"
+    assert body["network"]["asn"] == "13335"
+
+
+def test_digest(endpoint):
+    # Webhooks queued while a delivery is in progress are sent together.
+    dispatcher = _deliver(Http(host=endpoint, batch_size=4), 10)
+    assert dispatcher.sent == 10
+    assert [body["count"] for body in HookHandler.received] == [4, 4, 2]
+    targets = [query["query_target"] for body in HookHandler.received for query in body["queries"]]
+    assert targets == [f"192.0.2.{i}" for i in range(10)]
+
+
+def test_overload(endpoint):
+    dispatcher = _deliver(Http(host=endpoint, queue_size=3), 5)
+    assert (dispatcher.sent, dispatcher.dropped) == (3, 2)
+    assert HookHandler.received[0]["count"] == 3
+
+
+def test_retry(endpoint):
+    HookHandler.failures = 2
+    dispatcher = _deliver(Http(host=endpoint, retries=2), 1)
+    assert (dispatcher.sent, dispatcher.failed) == (1, 0)
+    assert len(HookHandler.received) == 1
+
+
+def test_retries_exhausted(endpoint):
+    HookHandler.failures = 3
+    dispatcher = _deliver(Http(host=endpoint, retries=2), 1)
+    assert (dispatcher.sent, dispatcher.failed) == (0, 1)
+    assert HookHandler.received == []
+
+
+def test_digest_formats():
+    digest = WebhookDigest(
+        webhooks=[Webhook(network={"asn": "13335"}, **_query(i)) for i in range(25)]
+    )
+    slack = digest.slack()
+    assert slack["text"] == "hyperglass received 25 valid queries"
+    # A title, a divider, & a section for every 10 queries.
+    assert len(slack["blocks"]) == 5
+    assert "`192.0.2.24`" in slack["blocks"][-1]["text"]["text"]
+    msteams = digest.msteams()
+    assert msteams["sections"][0]["activitySubtitle"] == (
+        "2024 01 01 00:00:00 - 2024 01 01 00:00:24 UTC"
+    )
+    assert msteams["sections"][1]["text"].count("AS13335") == 25
@@ -0,0 +1,181 @@
+"""Validate RPKI state locally, against a Validated ROA Payload (VRP) export.
+
+VRP exports from rpki-client & Routinator, in either their JSON or CSV formats, are supported.
+VRPs are indexed per address family & prefix length, by the integer value of their network
+address. Validating a route takes one dictionary lookup per distinct VRP prefix length covering
+it, following the origin validation procedure of RFC 6811.
+"""
+
+# Standard Library
+import io
+import csv
+import sys
+import time
+import typing as t
+import threading
+from pathlib import Path
+from ipaddress import ip_address, ip_network
+
+# Third Party
+import msgspec
+
+# Project
+from hyperglass.log import log
+
+# Local
+from ._reload import ReloadingIndex
+
+__all__ = ("VRPTable", "use_vrp_table")
+
+# Packed VRPs: the origin ASN, shifted left by 8 bits, OR'd with the maximum prefix length.
+PackedVRPs = t.Union[int, t.Tuple[int, ...]]
+# Per prefix length, a mapping of network addresses (shifted right to the prefix length) to VRPs.
+VRPIndex = t.List[t.Tuple[int, t.Dict[int, PackedVRPs]]]
+
+
+class _ROA(msgspec.Struct):
+    """VRP, as exported by rpki-client or Routinator."""
+
+    asn: t.Union[int, str]
+    prefix: str
+    maxLength: int  # noqa: N815
+
+
+class _Export(msgspec.Struct):
+    """JSON VRP export."""
+
+    roas: t.List[_ROA]
+
+
+def _parse_asn(value: t.Union[int, str]) -> int:
+    """Parse an ASN formatted as an integer or as 'AS<number>'."""
+    if isinstance(value, str):
+        value = value.strip().upper().removeprefix("AS")
+    return int(value)
+
+
+def _read(data: bytes) -> t.Iterator[t.Tuple[int, str, int]]:
+    """Read (ASN, prefix, max length) from a JSON or CSV VRP export."""
+    if data.lstrip()[:1] == b"{":
+        for roa in msgspec.json.decode(data, type=_Export).roas:
+            yield _parse_asn(roa.asn), roa.prefix, roa.maxLength
+        return
+
+    for row in csv.reader(io.StringIO(data.decode())):
+        if len(row) < 3:
+            continue
+        try:
+            yield _parse_asn(row[0]), row[1], int(row[2])
+        except ValueError:
+            # Skip the header row.
+            continue
+
+
+def _build(data: bytes) -> t.Tuple[t.Dict[int, VRPIndex], int]:
+    """Build per address family indexes of VRPs, and count them."""
+    tables: t.Dict[int, t.Dict[int, t.Dict[int, PackedVRPs]]] = {4: {}, 6: {}}
+    count = 0
+    for asn, prefix, max_length in _read(data):
+        network = ip_network(prefix)
+        length = network.prefixlen
+        key = int(network.network_address) >> (network.max_prefixlen - length)
+        packed = asn << 8 | max_length
+        index = tables[network.version].setdefault(length, {})
+        existing = index.get(key)
+        if existing is None:
+            index[key] = packed
+        elif isinstance(existing, int):
+            index[key] = (existing, packed)
+        else:
+            index[key] = (*existing, packed)
+        count += 1
+    return {version: sorted(table.items()) for version, table in tables.items()}, count
+
+
+def _memory(indexes: t.Dict[int, VRPIndex]) -> int:
+    """Estimate the memory used by VRP indexes, in bytes."""
+    size = 0
+    for index in indexes.values():
+        size += sys.getsizeof(index)
+        for _, table in index:
+            size += sys.getsizeof(table)
+            for key, value in table.items():
+                size += sys.getsizeof(key) + sys.getsizeof(value)
+                if isinstance(value, tuple):
+                    size += sum(sys.getsizeof(packed) for packed in value)
+    return size
+
+
+class VRPTable(ReloadingIndex):
+    """In-memory index of a VRP export, reloaded when the file changes.
+
+    The file's modification time is checked at most once per `check_interval` seconds. When it
+    changes, the file is reloaded in a background thread, while the previous VRPs keep being used.
+    """
+
+    name = "VRPs"
+    path: Path
+    count: int
+    memory: int
+
+    def __init__(self, path: Path, *, check_interval: float = 5.0) -> None:
+        """Load the VRP export."""
+        self.path = path
+        super().__init__(path, check_interval=check_interval)
+
+    def __repr__(self) -> str:
+        """Represent VRP table by file & size."""
+        return "VRPTable(path={!r}, count={!r}, memory={!r})".format(
+            str(self.path), self.count, self.memory
+        )
+
+    def _load(self) -> None:
+        """Read & index the VRP export, then replace the current indexes."""
+        started = time.perf_counter()
+        indexes, count = _build(self.path.read_bytes())
+        memory = _memory(indexes)
+        # Replace all indexes at once, so lookups never see a partial set.
+        self._indexes, self.count, self.memory = indexes, count, memory
+        log.bind(
+            path=str(self.path),
+            vrps=count,
+            memory=f"{memory / 1024 / 1024:.1f} MB",
+            duration=f"{time.perf_counter() - started:.2f}s",
+        ).info("Loaded VRPs")
+
+    def validate(self, prefix: str, asn: int) -> int:
+        """Get the RPKI state of a route: 0 (Invalid), 1 (Valid) or 2 (NotFound)."""
+        self._check()
+        # Parsing the address alone is much faster than parsing a network. Host bits don't need
+        # to be masked, since they're shifted out when looking up each VRP prefix length.
+        address, _, prefixlen = str(prefix).partition("/")
+        ip = ip_address(address)
+        bits = ip.max_prefixlen
+        length = int(prefixlen) if prefixlen else bits
+        address = int(ip)
+        covered = False
+        for vrp_length, table in self._indexes[ip.version]:
+            if vrp_length > length:
+                break
+            vrps = table.get(address >> (bits - vrp_length))
+            if vrps is None:
+                continue
+            covered = True
+            for packed in (vrps,) if isinstance(vrps, int) else vrps:
+                # VRPs for AS0 never validate a route.
+                if packed >> 8 == asn and asn != 0 and length <= packed & 0xFF:
+                    return 1
+        return 0 if covered else 2
+
+
+_tables: t.Dict[Path, VRPTable] = {}
+_tables_lock = threading.Lock()
+
+
+def use_vrp_table(path: Path) -> VRPTable:
+    """Get this process's VRP table for a VRP export, loading it on first use."""
+    with _tables_lock:
+        table = _tables.get(path)
+        if table is None:
+            table = _tables[path] = VRPTable(path)
+        return table
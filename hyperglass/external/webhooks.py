@@ -1,21 +1,30 @@
-"""Convenience functions for webhooks."""
+"""Convenience functions for webhooks, & background webhook delivery."""
 
 # Standard Library
 import typing as t
+import asyncio
+import weakref
 
 # Project
-from hyperglass.exceptions.private import UnsupportedError
+from hyperglass.log import log
+from hyperglass.exceptions.private import ExternalError, UnsupportedError
 
 # Local
 from ._base import BaseExternal
 from .slack import SlackHook
 from .generic import GenericHook
 from .msteams import MSTeams
+from .bgptools import network_info
 
 if t.TYPE_CHECKING:
     # Project
     from hyperglass.models.config.logging import Http
 
+# Seconds to wait before retrying a failed delivery; doubled after each attempt.
+RETRY_BACKOFF = 1.0
+# Seconds to wait for queued webhooks to be delivered on shutdown.
+CLOSE_TIMEOUT = 5.0
+
 PROVIDER_MAP = {
     "generic": GenericHook,
     "msteams": MSTeams,
@@ -36,3 +45,130 @@ class Webhook(BaseExternal):
                 message="{p} is not yet supported as a webhook target.",
                 p=config.provider.title(),
             ) from err
+
+
+class WebhookDispatcher:
+    """Deliver webhooks in the background, from a bounded queue.
+
+    Each worker process keeps one webhook handler for the configured provider, which sends over
+    the pooled HTTP client. Webhooks are sent as they're queued; those queued while a delivery is
+    in progress are combined into a single digest message, so a burst of queries results in a few
+    messages, rather than one each. Failed deliveries are retried with exponential backoff. When
+    the queue is full, webhooks are dropped & counted, rather than buffered without bound.
+    """
+
+    sent: int
+    dropped: int
+    failed: int
+
+    def __init__(self) -> None:
+        """Start with an empty queue; the queue & its consumer are created on first use."""
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._unreported = 0
+        self._queue: t.Optional["asyncio.Queue[t.Dict[str, t.Any]]"] = None
+        self._consumer: t.Optional[asyncio.Task] = None
+        self._config: t.Optional["Http"] = None
+        self._hook: t.Optional[BaseExternal] = None
+
+    def submit(self, config: "Http", query: t.Dict[str, t.Any]) -> bool:
+        """Queue a webhook for delivery, returning `False` if it was dropped."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=config.queue_size)
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.ensure_future(self._consume())
+        # Deliveries use the most recently submitted configuration.
+        self._config = config
+        try:
+            self._queue.put_nowait(query)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._unreported += 1
+            return False
+        return True
+
+    async def _consume(self) -> None:
+        """Deliver queued webhooks until cancelled."""
+        while True:
+            queries = [await self._queue.get()]
+            config = self._config
+            while len(queries) < config.batch_size and not self._queue.empty():
+                queries.append(self._queue.get_nowait())
+            try:
+                await self._deliver(config, queries)
+            except Exception as err:
+                self.failed += len(queries)
+                log.bind(destination=config.provider, error=str(err)).error(
+                    "Failed to send webhook"
+                )
+            finally:
+                for _ in queries:
+                    self._queue.task_done()
+            if self._unreported > 0:
+                log.bind(
+                    destination=config.provider, dropped=self._unreported, total=self.dropped
+                ).warning("Dropped webhooks, delivery queue is full")
+                self._unreported = 0
+
+    def _client(self, config: "Http") -> BaseExternal:
+        """Get the provider's client, replacing it if the configuration has changed."""
+        if self._hook is None or self._hook.config != config:
+            self._hook = Webhook(config)
+        return self._hook
+
+    async def _deliver(self, config: "Http", queries: t.List[t.Dict[str, t.Any]]) -> None:
+        """Add source network info to webhooks, then send them, retrying failed attempts."""
+        # Network info for every source is looked up at once.
+        sources = {query["source"] for query in queries}
+        network = await network_info(*sources)
+        queries = [{**query, "network": network.get(query["source"], {})} for query in queries]
+
+        hook = self._client(config)
+        for attempt in range(config.retries + 1):
+            try:
+                await hook.send_many(queries)
+            except ExternalError as err:
+                if attempt == config.retries:
+                    raise
+                delay = RETRY_BACKOFF * 2**attempt
+                log.bind(destination=config.provider, error=str(err), retry_in=delay).warning(
+                    "Failed to send webhook"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.sent += len(queries)
+                return
+
+    async def close(self) -> None:
+        """Deliver queued webhooks, waiting at most `CLOSE_TIMEOUT` seconds, then stop."""
+        if self._queue is not None and self._consumer is not None and not self._consumer.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), CLOSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                log.bind(pending=self._queue.qsize()).warning("Stopped delivering webhooks")
+        if self._consumer is not None:
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+            self._consumer = None
+        self._hook = None
+        self._queue = None
+
+
+# Queues & tasks are bound to the event loop they were created in, so each event loop gets its
+# own dispatcher.
+_dispatchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WebhookDispatcher]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def use_webhook_dispatcher() -> WebhookDispatcher:
+    """Get the webhook dispatcher for the running event loop."""
+    loop = asyncio.get_running_loop()
+    dispatcher = _dispatchers.get(loop)
+    if dispatcher is None:
+        dispatcher = _dispatchers[loop] = WebhookDispatcher()
+    return dispatcher
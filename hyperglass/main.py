@@ -90,8 +90,6 @@ def unregister_all_plugins() -> None:
 def start(*, log_level: t.Union[str, int], workers: int) -> None:
     """Start hyperglass via ASGI server."""
 
-    register_all_plugins()
-
     if not Settings.disable_ui:
         asyncio.run(build_ui())
 
@@ -135,9 +133,13 @@ def run(workers: int = None):
         log.debug(repr(Settings))
 
         state = use_state()
-        state.clear()
 
-        init_user_config()
+        # Replace configuration & plugins from any previous run in a single transaction. Cached
+        # query output is kept, and is invalidated per query if its configuration has changed.
+        with state.transaction():
+            unregister_all_plugins()
+            init_user_config()
+            register_all_plugins()
 
         enable_file_logging(
             directory=state.params.logging.directory,
@@ -177,7 +179,7 @@ def run(workers: int = None):
         # Handle app exceptions.
         if not Settings.dev_mode:
             state = use_state()
-            state.clear()
+            state.clear_config()
             log.debug("Cleared hyperglass state")
         unregister_all_plugins()
         raise error
@@ -56,12 +56,16 @@ class Query(BaseModel):
         state = use_state()
         self._state = state
 
-        query_directives = self.device.directives.matching(self.query_type)
+        directive = self.device.directives.get(self.query_type)
+        if directive is None:
+            query_directives = self.device.directives.matching(self.query_type)
 
-        if len(query_directives) < 1:
-            raise QueryTypeNotFound(query_type=self.query_type)
+            if len(query_directives) < 1:
+                raise QueryTypeNotFound(query_type=self.query_type)
 
-        self.directive = query_directives[0]
+            directive = query_directives[0]
+
+        self.directive = directive
 
         self._input_plugin_manager = InputPluginManager()
 
@@ -89,8 +93,14 @@ class Query(BaseModel):
         return repr(self)
 
     def digest(self) -> str:
-        """Create SHA256 hash digest of model representation."""
-        return hashlib.sha256(repr(self).encode()).hexdigest()
+        """Create SHA256 hash digest of model representation & the configuration it depends on.
+
+        Output cached for a query is therefore not reused once the configuration of its device,
+        directives, or structured output changes.
+        """
+        structured = self._state.params.structured.config_digest
+        config = f"{self.device.config_digest}{structured}"
+        return hashlib.sha256(f"{self!r}{config}".encode()).hexdigest()
 
     def random(self) -> str:
         """Create a random string to prevent client or proxy caching."""
@@ -101,7 +111,7 @@ class Query(BaseModel):
     def validate_query_target(self) -> None:
         """Validate a query target after all fields/relationships have been initialized."""
         # Run config/rule-based validations.
-        self.directive.validate_target(self.query_target)
+        self.rule = self.directive.validate_target(self.query_target)
         # Run plugin-based validations.
         self._input_plugin_manager.validate(query=self)
         log.bind(query=self.summary()).debug("Validation passed")
@@ -134,7 +144,7 @@ class Query(BaseModel):
     def validate_query_type(cls, value: t.Any):
         """Ensure a requested query type exists."""
         devices = use_state("devices")
-        if any((device.has_directives(value) for device in devices)):
+        if devices.has_directives(value):
             return value
 
         raise QueryTypeNotFound(query_type=value)
@@ -42,12 +42,35 @@ schema_query_cached = {
     "description": "`true` if the response is from a previously cached query.",
 }
 
+schema_query_cache_tier = {
+    "title": "Cache Tier",
+    "description": "Cache tier that served the response: `local` if from the worker's in-memory cache, `redis` if from Redis, or `null` if the query was run.",
+    "example": "redis",
+}
+
+schema_query_stale = {
+    "title": "Stale",
+    "description": "`true` if the cached response has expired and is being refreshed in the background.",
+}
+
 schema_query_runtime = {
     "title": "Runtime",
     "description": "Time it took to run the query in seconds.",
     "example": 6,
 }
 
+schema_query_queue_depth = {
+    "title": "Queue Depth",
+    "description": "Number of queries to the same device that were waiting ahead of this query.",
+    "example": 0,
+}
+
+schema_query_queue_time = {
+    "title": "Queue Time",
+    "description": "Time the query waited for the device to be available, in seconds.",
+    "example": 0.0,
+}
+
 schema_query_keywords = {
     "title": "Keywords",
     "description": "Relevant keyword values contained in the `output` field, which can be used for formatting.",
@@ -145,7 +168,13 @@ class QueryResponse(BaseModel):
     level: ResponseLevel = Field("success", json_schema_extra=schema_query_level)
     random: str = Field(json_schema_extra=schema_query_random)
     cached: bool = Field(json_schema_extra=schema_query_cached)
+    cache_tier: t.Optional[t.Literal["local", "redis"]] = Field(
+        None, json_schema_extra=schema_query_cache_tier
+    )
+    stale: bool = Field(False, json_schema_extra=schema_query_stale)
     runtime: int = Field(json_schema_extra=schema_query_runtime)
+    queue_depth: int = Field(0, json_schema_extra=schema_query_queue_depth)
+    queue_time: float = Field(0.0, json_schema_extra=schema_query_queue_time)
     keywords: t.List[str] = Field([], json_schema_extra=schema_query_keywords)
     timestamp: str = Field(json_schema_extra=schema_query_timestamp)
     format: ResponseFormat = Field("text/plain", json_schema_extra=schema_query_format)
@@ -1,12 +1,85 @@
 """Validation model for cache config."""
 
+# Standard Library
+import typing as t
+
+# Third Party
+from pydantic import Field, field_validator
+
+# Project
+from hyperglass.state.codecs import Codec, CodecName, CompressionName, get_codec
 
 # Local
 from ..main import HyperglassModel
 
 
+class LocalCache(HyperglassModel):
+    """Control the in-process query response cache."""
+
+    enable: bool = Field(
+        False,
+        title="Enable Local Cache",
+        description="If enabled, each hyperglass worker process keeps recently served query responses in memory, in front of Redis.",
+    )
+    max_entries: int = Field(
+        1000,
+        ge=1,
+        title="Maximum Entries",
+        description="Maximum number of query responses kept in memory, per hyperglass worker process.",
+    )
+    max_size: int = Field(
+        64,
+        ge=1,
+        title="Maximum Size",
+        description="Approximate maximum total size, in megabytes, of query responses kept in memory, per hyperglass worker process.",
+    )
+
+
 class Cache(HyperglassModel):
     """Public cache parameters."""
 
     timeout: int = 120
     show_text: bool = True
+    stale_while_revalidate: int = Field(
+        0,
+        ge=0,
+        title="Stale While Revalidate",
+        description="Number of seconds after a cached response expires during which it is still served, flagged as stale, while the query is re-run in the background. Set to 0 to disable.",
+    )
+    codec: CodecName = Field(
+        "pickle",
+        title="Codec",
+        description="Format in which cached query responses are stored in Redis. `json` and `msgpack` can't execute code when decoded, so they're safer than `pickle` if the Redis instance is shared.",
+    )
+    compression: t.Optional[CompressionName] = Field(
+        None,
+        title="Compression",
+        description="Algorithm used to compress large cached query responses. `zstd` requires the `zstandard` package.",
+    )
+    compression_threshold: int = Field(
+        16384,
+        ge=0,
+        title="Compression Threshold",
+        description="Minimum size, in bytes, of an encoded query response before it is compressed.",
+    )
+    local: LocalCache = LocalCache()
+
+    @field_validator("compression")
+    def validate_compression(
+        cls: "Cache", value: t.Optional[CompressionName]
+    ) -> t.Optional[CompressionName]:
+        """Ensure the library required by the compression algorithm is installed."""
+        if value == "zstd":
+            try:
+                # Third Party
+                import zstandard  # noqa: F401
+            except ImportError as err:
+                raise ValueError("'zstd' compression requires the 'zstandard' package") from err
+        return value
+
+    @property
+    def query_codec(self) -> Codec:
+        """Get the codec used to store cached query responses."""
+        return get_codec(
+            self.codec, compression=self.compression, threshold=self.compression_threshold
+        )
@@ -3,11 +3,13 @@
 # Standard Library
 import re
 import typing as t
+import hashlib
 from pathlib import Path
+from functools import cached_property
 from ipaddress import IPv4Address, IPv6Address
 
 # Third Party
-from pydantic import FilePath, ValidationInfo, field_validator
+from pydantic import Field, FilePath, PrivateAttr, ValidationInfo, field_validator
 from netmiko.ssh_dispatcher import CLASS_MAPPER  # type: ignore
 
 # Project
@@ -49,6 +51,23 @@ class DirectiveOptions(HyperglassModel, extra="ignore"):
     builtins: t.Union[bool, t.List[str]] = True
 
 
+class DeviceConcurrency(HyperglassModel):
+    """Per-device query concurrency limits."""
+
+    limit: int = Field(
+        4,
+        ge=1,
+        title="Concurrent Query Limit",
+        description="Maximum number of queries run against the device at once, across all hyperglass worker processes.",
+    )
+    queue: int = Field(
+        16,
+        ge=0,
+        title="Queue Depth",
+        description="Maximum number of queries waiting for the device once `limit` is reached, per hyperglass worker process. Queries beyond this depth are rejected immediately.",
+    )
+
+
 class Device(HyperglassModelWithId, extra="allow"):
     """Validation model for per-router config in devices.yaml."""
 
@@ -69,6 +88,7 @@ class Device(HyperglassModelWithId, extra="allow"):
     driver: t.Optional[SupportedDriver] = None
     driver_config: t.Dict[str, t.Any] = {}
     attrs: t.Dict[str, str] = {}
+    concurrency: DeviceConcurrency = DeviceConcurrency()
 
     def __init__(self, **kw) -> None:
         """Check legacy fields and ensure an `id` is set."""
@@ -108,6 +128,11 @@ class Device(HyperglassModelWithId, extra="allow"):
             "group": self.group,
         }
 
+    @cached_property
+    def config_digest(self) -> str:
+        """Create SHA256 hash digest of the device's configuration, including its directives."""
+        return hashlib.sha256(self.model_dump_json().encode()).hexdigest()
+
     @property
     def directive_commands(self) -> t.List[str]:
         """Get all commands associated with the device."""
@@ -130,10 +155,7 @@ class Device(HyperglassModelWithId, extra="allow"):
 
     def has_directives(self, *directive_ids: str) -> bool:
         """Determine if a directive is used on this device."""
-        for directive_id in directive_ids:
-            if directive_id in self.directive_ids:
-                return True
-        return False
+        return any(self.directives.get(directive_id) is not None for directive_id in directive_ids)
 
     def get_device_type(self) -> str:
         """Get the `device_type` field for use by Netmiko.
@@ -309,21 +331,36 @@ class Device(HyperglassModelWithId, extra="allow"):
 class Devices(MultiModel, model=Device, unique_by="id"):
     """Container for all devices."""
 
+    _directive_devices: t.Dict[str, t.List[Device]] = PrivateAttr()
+
     def __init__(self: "Devices", *items: t.Dict[str, t.Any]) -> None:
         """Generate IDs prior to validation."""
         with_id = (Device._with_id(item) for item in items)
         super().__init__(*with_id)
 
+    def _reindex(self: "Devices") -> None:
+        """Index devices by ID, name & the IDs of their directives."""
+        super()._reindex()
+        self._directive_devices = {}
+        for device in self:
+            for directive in device.directives:
+                self._directive_devices.setdefault(directive.id, []).append(device)
+
     def export_api(self: "Devices") -> t.List[APIDevice]:
         """Export API-facing device fields."""
         return [d.export_api() for d in self]
 
     def valid_id_or_name(self: "Devices", value: str) -> bool:
         """Determine if a value is a valid device name or ID."""
-        for device in self:
-            if value == device.id or value == device.name:
-                return True
-        return False
+        return self.get(value) is not None or self.get_by_name(value) is not None
+
+    def with_directive(self: "Devices", directive_id: str) -> t.List[Device]:
+        """Get all devices using a directive."""
+        return list(self._directive_devices.get(directive_id, ()))
+
+    def has_directives(self: "Devices", *directive_ids: str) -> bool:
+        """Determine if a directive is used on any device."""
+        return any(directive_id in self._directive_devices for directive_id in directive_ids)
 
     def directive_plugins(self: "Devices") -> t.Dict[Path, t.Tuple[str]]:
         """Get a mapping of plugin paths to associated directive IDs."""
@@ -0,0 +1,47 @@
+"""Validation model for query execution config."""
+
+# Third Party
+from pydantic import Field
+
+# Local
+from ..main import HyperglassModel
+
+
+class SessionPool(HyperglassModel):
+    """Control reuse of authenticated device sessions."""
+
+    enable: bool = Field(
+        False,
+        title="Enable Session Pool",
+        description="If enabled, authenticated SSH sessions are kept open and reused by subsequent queries to the same device. Sessions to devices behind an SSH proxy are never pooled.",
+    )
+    max_sessions: int = Field(
+        2,
+        ge=1,
+        title="Maximum Sessions",
+        description="Maximum number of open sessions, per device and per hyperglass worker process. Queries beyond this limit wait for a session to be released.",
+    )
+    idle_timeout: int = Field(
+        300,
+        ge=1,
+        title="Idle Timeout",
+        description="Number of seconds after which an unused session is closed.",
+    )
+
+
+class Execution(HyperglassModel):
+    """Control how queries are executed against devices."""
+
+    max_workers: int = Field(
+        32,
+        ge=1,
+        title="Maximum Workers",
+        description="Maximum number of threads, per hyperglass worker process, used to run blocking device I/O such as SSH sessions. Queries beyond this limit wait for a free thread.",
+    )
+    batch_size: int = Field(
+        200,
+        ge=1,
+        title="Maximum Batch Size",
+        description="Maximum number of queries in a single request to the batch query API.",
+    )
+    session_pool: SessionPool = SessionPool()
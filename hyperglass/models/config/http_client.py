@@ -2,12 +2,14 @@
 
 # Standard Library
 import typing as t
+from importlib.util import find_spec
 
 # Third Party
 import httpx
-from pydantic import FilePath, SecretStr, PrivateAttr, IPvAnyAddress
+from pydantic import Field, FilePath, SecretStr, PrivateAttr, IPvAnyAddress
 
 # Project
+from hyperglass.util import get_fmt_keys
 from hyperglass.models import HyperglassModel
 from hyperglass.constants import __version__
 
@@ -55,6 +57,8 @@ class HttpConfiguration(HyperglassModel):
     """HTTP client configuration."""
 
     _attribute_map: AttributeMap = PrivateAttr()
+    # Each query parameter's template, & the query field formatted into each template key.
+    _query_templates: t.Dict[str, t.Tuple[str, t.Dict[str, str]]] = PrivateAttr()
     path: str = "/"
     method: HttpMethod = "GET"
     scheme: Scheme = "https"
@@ -70,12 +74,17 @@ class HttpConfiguration(HyperglassModel):
     attribute_map: AttributeMapConfig = AttributeMapConfig()
     body_format: BodyFormat = "json"
     retries: int = 0
+    http2: bool = True
+    max_connections: int = Field(10, ge=1)
+    max_keepalive: int = Field(5, ge=0)
+    keepalive_expiry: IntFloat = Field(60, ge=0)
 
     def __init__(self, **data: t.Any) -> None:
         """Create HTTP Client Configuration Definition."""
 
         super().__init__(**data)
         self._attribute_map = self._create_attribute_map()
+        self._query_templates = self._create_query_templates()
 
     def _create_attribute_map(self) -> AttributeMap:
         """Create AttributeMap instance with defined overrides."""
@@ -86,6 +95,19 @@ class HttpConfiguration(HyperglassModel):
             query_target=self.attribute_map.query_target or "query_target",
         )
 
+    def _create_query_templates(self) -> t.Dict[str, t.Tuple[str, t.Dict[str, str]]]:
+        """Map each templated query parameter's format keys to query fields."""
+        if not isinstance(self.query, t.Dict):
+            return {}
+        templates = {}
+        for key, value in self.query.items():
+            fmt_keys = get_fmt_keys(value)
+            fields = {
+                str(v): k for k, v in self.attribute_map.model_dump().items() if v in fmt_keys
+            }
+            templates[key] = (value, fields)
+        return templates
+
     def create_client(self, *, device: "Device") -> httpx.AsyncClient:
         """Create a pre-configured http client."""
 
@@ -94,7 +116,22 @@ class HttpConfiguration(HyperglassModel):
         if self.ssl_ca is not None:
             verify = httpx.create_ssl_context(verify=str(self.ssl_ca))
 
-        transport_constructor = {"retries": self.retries}
+        # TLS & connection pool options only apply to the transport, since one is specified.
+        transport_constructor = {
+            "verify": verify,
+            "retries": self.retries,
+            # HTTP/2 is negotiated when the optional `h2` package is installed.
+            "http2": self.http2 and find_spec("h2") is not None,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        }
+
+        # Use client certificate authentication, if defined.
+        if self.ssl_client is not None:
+            transport_constructor["cert"] = str(self.ssl_client)
 
         # Use `source` IP address as httpx transport's `local_address`, if defined.
         if self.source is not None:
@@ -108,18 +145,13 @@ class HttpConfiguration(HyperglassModel):
             base_url += f":{device.port!s}"
 
         parameters = {
-            "verify": verify,
             "transport": transport,
             "timeout": self.timeout,
             "follow_redirects": self.follow_redirects,
-            "base_url": f"{self.scheme}://{device.address!s}".strip("/"),
+            "base_url": base_url,
             "headers": {"user-agent": f"hyperglass/{__version__}", **self.headers},
         }
 
-        # Use client certificate authentication, if defined.
-        if self.ssl_client is not None:
-            parameters["cert"] = str(self.ssl_client)
-
         # Use basic authentication, if defined.
         if self.basic_auth is not None:
             parameters["auth"] = httpx.BasicAuth(
@@ -5,7 +5,7 @@ import typing as t
 from pathlib import Path
 
 # Third Party
-from pydantic import ByteSize, SecretStr, AnyHttpUrl, DirectoryPath, field_validator
+from pydantic import Field, ByteSize, SecretStr, AnyHttpUrl, DirectoryPath, field_validator
 
 # Project
 from hyperglass.constants import __version__
@@ -51,6 +51,9 @@ class Http(HyperglassModel, extra="allow"):
     params: t.Dict[str, t.Union[str, int, bool, None]] = {}
     verify_ssl: bool = True
     timeout: t.Union[float, int] = 5.0
+    queue_size: int = Field(1000, ge=1)
+    batch_size: int = Field(20, ge=1, le=400)
+    retries: int = Field(3, ge=0)
 
     @field_validator("headers", "params")
     def stringify_headers_params(cls, value):
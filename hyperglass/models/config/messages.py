@@ -75,6 +75,11 @@ class Messages(HyperglassModel):
         title="No Response",
         description="Displayed when hyperglass can connect to a device, but no output able to be read. Seeing this error may indicate a bug in hyperglas or one of its dependencies. If you see this in the wild, try enabling [debug mode](/fixme) and review the logs to pinpoint the source of the error.",
     )
+    device_busy: str = Field(
+        "{device} is busy. Please try again later.",
+        title="Device Busy",
+        description="Displayed when too many queries are already running or waiting for a device. `{device}` may be used to display the device in question.",
+    )
     no_output: str = Field(
         "The query completed, but no matching results were found.",
         title="No Output",
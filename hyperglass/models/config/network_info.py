@@ -0,0 +1,40 @@
+"""Validate network info configuration."""
+
+# Standard Library
+import typing as t
+
+# Third Party
+from pydantic import Field, FilePath
+
+# Local
+from ..main import HyperglassModel
+
+
+class NetworkInfo(HyperglassModel):
+    """Sources of the network info (ASN, prefix, country, registry) sent with webhooks."""
+
+    pfx2as_file: t.Optional[FilePath] = Field(
+        None,
+        title="Prefix to AS File",
+        description="Path to a prefix-to-AS dataset in CAIDA's RouteViews pfx2as format, used to look up the origin ASN & prefix of IP addresses locally. The file is reloaded when it changes.",
+    )
+    delegation_files: t.List[FilePath] = Field(
+        [],
+        title="RIR Delegation Files",
+        description="Paths to RIR extended delegation statistics, used to look up the country, registry & allocation date of IP addresses locally. The files are reloaded when they change.",
+    )
+    asn_names_file: t.Optional[FilePath] = Field(
+        None,
+        title="ASN Names File",
+        description="Path to bgp.tools' asns.csv, or a file of '<asn> <name>' lines, used to look up the organization of origin ASNs locally. The file is reloaded when it changes.",
+    )
+    fallback: bool = Field(
+        True,
+        title="Fall Back to bgp.tools",
+        description="Look up IP addresses none of the local datasets cover with bgp.tools. If no local datasets are set, bgp.tools is always used.",
+    )
+
+    @property
+    def local(self) -> bool:
+        """Determine if network info is looked up locally."""
+        return self.pfx2as_file is not None or len(self.delegation_files) > 0
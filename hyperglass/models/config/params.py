@@ -19,7 +19,9 @@ from ..main import HyperglassModel
 from .cache import Cache
 from .logging import Logging
 from .messages import Messages
+from .execution import Execution
 from .structured import Structured
+from .network_info import NetworkInfo
 
 Localhost = t.Literal["localhost"]
 
@@ -85,8 +87,10 @@ class Params(ParamsPublic, HyperglassModel):
     # Sub Level Params
     cache: Cache = Cache()
     docs: Docs = Docs()
+    execution: Execution = Execution()
     logging: Logging = Logging()
     messages: Messages = Messages()
+    network_info: NetworkInfo = NetworkInfo()
     structured: Structured = Structured()
     web: Web = Web()
 
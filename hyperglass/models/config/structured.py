@@ -1,26 +1,135 @@
 """Structured data configuration variables."""
 
 # Standard Library
+import re
 import typing as t
+import hashlib
+from functools import cached_property
+from itertools import chain
+
+# Third Party
+from pydantic import Field, FilePath, PrivateAttr, field_validator, model_validator
 
 # Local
 from ..main import HyperglassModel
 
 StructuredCommunityMode = t.Literal["permit", "deny"]
-StructuredRPKIMode = t.Literal["router", "external"]
+StructuredRPKIMode = t.Literal["router", "external", "local"]
+
+# Group references are renumbered when patterns are combined, and group names may only be defined
+# once per expression, so patterns using either can't be combined.
+GROUP_REFERENCE = re.compile(r"\\\d|\(\?\(\d|\(\?P")
+
+
+class CommunityPolicy:
+    """Compiled community filtering policy.
+
+    Communities are matched against each pattern the same way `re.match` would. Literal patterns,
+    optionally anchored with `^` and `$`, are matched with set lookups. Other patterns are combined
+    into a single regular expression.
+    """
+
+    __slots__ = ("mode", "exact", "prefixes", "expressions")
+
+    mode: StructuredCommunityMode
+    exact: t.FrozenSet[str]
+    prefixes: t.Tuple[t.Tuple[int, t.FrozenSet[str]], ...]
+    expressions: t.Tuple[re.Pattern, ...]
+
+    def __init__(self, mode: StructuredCommunityMode, patterns: t.Sequence[str]) -> None:
+        """Compile patterns."""
+        self.mode = mode
+        exact, prefixes, combinable, expressions = set(), {}, [], []
+        for pattern in patterns:
+            body = pattern.removeprefix("^")
+            anchored = body.endswith("$")
+            body = body.removesuffix("$")
+            if re.escape(body) == body:
+                # `re.match` only anchors at the start, so an unanchored literal matches any
+                # community beginning with it.
+                if anchored:
+                    exact.add(body)
+                else:
+                    prefixes.setdefault(len(body), set()).add(body)
+                continue
+            compiled = re.compile(pattern)
+            if compiled.flags & ~re.UNICODE or GROUP_REFERENCE.search(pattern):
+                # Inline flags would apply to every combined pattern.
+                expressions.append(compiled)
+            else:
+                combinable.append(pattern)
+        if combinable:
+            expressions.append(re.compile("|".join(f"(?:{p})" for p in combinable)))
+        self.exact = frozenset(exact)
+        self.prefixes = tuple((length, frozenset(items)) for length, items in prefixes.items())
+        self.expressions = tuple(expressions)
+
+    def matches(self, community: str) -> bool:
+        """Determine if a community matches any pattern."""
+        if community in self.exact:
+            return True
+        for length, items in self.prefixes:
+            if community[:length] in items:
+                return True
+        return any(expression.match(community) for expression in self.expressions)
+
+    def permits(self, community: str) -> bool:
+        """Determine if a community is permitted by the policy."""
+        return self.matches(community) is (self.mode == "permit")
+
+    def apply(self, communities: t.Sequence[t.List[str]]) -> t.List[t.List[str]]:
+        """Filter lists of communities, e.g. of every route in a table.
+
+        Each distinct community is only matched once.
+        """
+        permitted = {c for c in set(chain.from_iterable(communities)) if self.permits(c)}
+        return [[c for c in items if c in permitted] for items in communities]
 
 
 class StructuredCommunities(HyperglassModel):
     """Control structured data response for BGP communities."""
 
+    _policy: CommunityPolicy = PrivateAttr()
     mode: StructuredCommunityMode = "deny"
     items: t.List[str] = []
 
+    def __init__(self, **data: t.Any) -> None:
+        """Compile the community filtering policy."""
+        super().__init__(**data)
+        self._policy = CommunityPolicy(self.mode, self.items)
+
+    @field_validator("items")
+    def validate_items(cls, value: t.List[str]) -> t.List[str]:
+        """Ensure each item is a valid regular expression."""
+        for pattern in value:
+            try:
+                re.compile(pattern)
+            except re.error as err:
+                raise ValueError(f"Invalid community pattern {pattern!r}: {err}") from err
+        return value
+
+    @property
+    def policy(self) -> CommunityPolicy:
+        """Get the compiled community filtering policy."""
+        return self._policy
+
 
 class StructuredRpki(HyperglassModel):
     """Control structured data response for RPKI state."""
 
     mode: StructuredRPKIMode = "router"
+    vrp_file: t.Optional[FilePath] = Field(
+        None,
+        title="VRP File",
+        description="Path to a JSON or CSV VRP export from rpki-client or Routinator, used to validate RPKI states when `mode` is `local`. The file is reloaded when it changes.",
+    )
+
+    @model_validator(mode="after")
+    def validate_vrp_file(cls, data: "StructuredRpki") -> "StructuredRpki":
+        """Ensure a VRP file is set when validating RPKI states locally."""
+        if data.mode == "local" and data.vrp_file is None:
+            raise ValueError("'vrp_file' must be set when RPKI 'mode' is 'local'")
+        return data
 
 
 class Structured(HyperglassModel):
@@ -28,3 +137,8 @@ class Structured(HyperglassModel):
 
     communities: StructuredCommunities = StructuredCommunities()
     rpki: StructuredRpki = StructuredRpki()
+
+    @cached_property
+    def config_digest(self) -> str:
+        """Create SHA256 hash digest of the structured data configuration."""
+        return hashlib.sha256(self.model_dump_json().encode()).hexdigest()
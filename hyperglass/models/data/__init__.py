@@ -4,11 +4,12 @@
 from typing import Union
 
 # Local
-from .bgp_route import BGPRouteTable
+from .bgp_route import BGPRouteTable, BGPRouteTableBuilder
 
 OutputDataModel = Union[BGPRouteTable]
 
 __all__ = (
     "BGPRouteTable",
+    "BGPRouteTableBuilder",
     "OutputDataModel",
 )
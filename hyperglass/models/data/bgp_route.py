@@ -1,22 +1,40 @@
 """Device-Agnostic Parsed Response Data Model."""
 
 # Standard Library
-import re
+import heapq
 import typing as t
-from ipaddress import ip_network
-
-# Third Party
-from pydantic import field_validator
+from operator import attrgetter
+from functools import cached_property
+from ipaddress import ip_address, ip_network
 
 # Project
 from hyperglass.state import use_state
-from hyperglass.external.rpki import rpki_state
+from hyperglass.external.rpki import rpki_states
 
 # Local
 from ..main import HyperglassModel
 
 WinningWeight = t.Literal["low", "high"]
 
+# IP version, network address & prefix length.
+RouteKey = t.Tuple[int, int, int]
+
+
+def route_key(prefix: str) -> RouteKey:
+    """Get a numeric sort key for a prefix, ordering IPv4 before IPv6 & networks by address.
+
+    Prefixes that aren't valid IP networks are sorted after all others.
+    """
+    address, _, length = prefix.partition("/")
+    try:
+        ip = ip_address(address)
+        bits = ip.max_prefixlen
+        prefixlen = int(length) if length else bits
+        host_bits = bits - prefixlen
+        return ip.version, int(ip) >> host_bits << host_bits, prefixlen
+    except ValueError:
+        return 255, 0, 0
+
 
 class BGPRoute(HyperglassModel):
     """Post-parsed BGP route."""
@@ -35,72 +53,10 @@ class BGPRoute(HyperglassModel):
     peer_rid: str
     rpki_state: int
 
-    @field_validator("communities")
-    def validate_communities(cls, value):
-        """Filter returned communities against configured policy.
-
-        Actions:
-            permit: only permit matches
-            deny: only deny matches
-        """
-
-        (structured := use_state("params").structured)
-
-        def _permit(comm):
-            """Only allow matching patterns."""
-            valid = False
-            for pattern in structured.communities.items:
-                if re.match(pattern, comm):
-                    valid = True
-                    break
-            return valid
-
-        def _deny(comm):
-            """Allow any except matching patterns."""
-            valid = True
-            for pattern in structured.communities.items:
-                if re.match(pattern, comm):
-                    valid = False
-                    break
-            return valid
-
-        func_map = {"permit": _permit, "deny": _deny}
-        func = func_map[structured.communities.mode]
-
-        return [c for c in value if func(c)]
-
-    @field_validator("rpki_state")
-    def validate_rpki_state(cls, value, values):
-        """If external RPKI validation is enabled, get validation state."""
-
-        (structured := use_state("params").structured)
-
-        if structured.rpki.mode == "router":
-            # If router validation is enabled, return the value as-is.
-            return value
-
-        if structured.rpki.mode == "external":
-            # If external validation is enabled, validate the prefix
-            # & asn with Cloudflare's RPKI API.
-            as_path = values["as_path"]
-
-            if len(as_path) == 0:
-                # If the AS_PATH length is 0, i.e. for an internal route,
-                # return RPKI Unknown state.
-                return 3
-            # Get last ASN in path
-            asn = as_path[-1]
-
-        try:
-            net = ip_network(values["prefix"])
-        except ValueError:
-            return 3
-
-        # Only do external RPKI lookups for global prefixes.
-        if net.is_global:
-            return rpki_state(prefix=values["prefix"], asn=asn)
-
-        return value
+    @cached_property
+    def sort_key(self) -> RouteKey:
+        """Get the numeric key by which routes are ordered."""
+        return route_key(self.prefix)
 
 
 class BGPRouteTable(HyperglassModel):
@@ -112,13 +68,96 @@ class BGPRouteTable(HyperglassModel):
     winning_weight: WinningWeight
 
     def __init__(self, **kwargs):
-        """Sort routes by prefix after validation."""
+        """Sort routes by prefix & filter their communities after validation."""
         super().__init__(**kwargs)
-        self.routes = sorted(self.routes, key=lambda r: r.prefix)
+        self.routes = sorted(self.routes, key=attrgetter("sort_key"))
+        self.filter_communities()
 
     def __add__(self: "BGPRouteTable", other: "BGPRouteTable") -> "BGPRouteTable":
         """Merge another BGP table instance with this instance."""
         if isinstance(other, BGPRouteTable):
-            self.routes = sorted([*self.routes, *other.routes], key=lambda r: r.prefix)
-            self.count = len(self.routes)
+            self.routes = list(heapq.merge(self.routes, other.routes, key=attrgetter("sort_key")))
+            self.count += other.count
         return self
+
+    def filter_communities(self: "BGPRouteTable") -> None:
+        """Filter every route's communities against the configured policy.
+
+        Actions:
+            permit: only permit matches
+            deny: only deny matches
+        """
+
+        (policy := use_state("params").structured.communities.policy)
+
+        filtered = policy.apply([route.communities for route in self.routes])
+        for route, communities in zip(self.routes, filtered):
+            if len(communities) != len(route.communities):
+                route.communities = communities
+
+    async def validate_rpki(self: "BGPRouteTable") -> None:
+        """If external or local RPKI validation is enabled, get every route's validation state."""
+
+        (structured := use_state("params").structured)
+
+        if structured.rpki.mode == "router":
+            # If router validation is enabled, keep the router's validation states.
+            return
+
+        pending = []
+        for route in self.routes:
+            if len(route.as_path) == 0:
+                # If the AS_PATH length is 0, i.e. for an internal route,
+                # use RPKI Unknown state.
+                route.rpki_state = 3
+                continue
+
+            try:
+                net = ip_network(route.prefix)
+            except ValueError:
+                route.rpki_state = 3
+                continue
+
+            # Only do external RPKI lookups for global prefixes, using
+            # the last ASN in the path.
+            if net.is_global:
+                pending.append((route, (route.prefix, route.as_path[-1])))
+
+        states = await rpki_states(target for _, target in pending)
+        for route, target in pending:
+            route.rpki_state = states[target]
+
+
+class BGPRouteTableBuilder:
+    """Accumulate BGP route tables from multiple responses into a single table.
+
+    Each table's routes are already sorted, so they're combined once, in a single k-way merge,
+    when the table is built.
+    """
+
+    tables: t.List[BGPRouteTable]
+    count: int
+
+    def __init__(self) -> None:
+        """Start with no tables."""
+        self.tables = []
+        self.count = 0
+
+    def add(self, table: BGPRouteTable) -> None:
+        """Add a table's routes."""
+        self.tables.append(table)
+        self.count += table.count
+
+    def build(self) -> t.Optional[BGPRouteTable]:
+        """Merge all added tables, or get `None` if none were added."""
+        if len(self.tables) < 2:
+            return next(iter(self.tables), None)
+        first = self.tables[0]
+        routes = heapq.merge(*(table.routes for table in self.tables), key=attrgetter("sort_key"))
+        # Routes were validated & filtered when each table was created.
+        return BGPRouteTable.model_construct(
+            vrf=first.vrf,
+            count=self.count,
+            routes=list(routes),
+            winning_weight=first.winning_weight,
+        )
@@ -0,0 +1,341 @@
+"""Compact, columnar representation of a parsed BGP route table.
+
+Each route attribute is stored in its own array, rather than as one object per route. Strings,
+such as prefixes, next hops & communities, are stored once and referenced by index. AS paths &
+communities are stored as a flat array of values, and an array of offsets at which each route's
+values end.
+"""
+
+# Standard Library
+import sys
+import typing as t
+from array import array
+
+# Third Party
+import msgspec
+
+if t.TYPE_CHECKING:
+    # Local
+    from .bgp_route import BGPRoute, BGPRouteTable
+
+__all__ = ("COLUMNS_FORMAT", "RouteColumns")
+
+# Identifies the builtin representation of a route table, e.g. when cached.
+COLUMNS_FORMAT = "columns"
+
+# Route attributes stored as indexes into the table's strings.
+STRING_FIELDS = ("prefix", "next_hop", "source_rid", "peer_rid")
+# Route attributes stored as integers, with their array type codes.
+INTEGER_FIELDS = (
+    ("active", "B"),
+    ("age", "q"),
+    ("weight", "q"),
+    ("med", "q"),
+    ("local_preference", "q"),
+    ("source_as", "I"),
+    ("rpki_state", "B"),
+)
+# Route attributes stored as a list of values per route.
+LIST_FIELDS = ("as_path", "communities")
+
+# Array type code of each column.
+COLUMN_TYPES = {
+    **{field: "I" for field in STRING_FIELDS},
+    **dict(INTEGER_FIELDS),
+    **{field: "I" for field in LIST_FIELDS},
+    **{f"{field}_offsets": "I" for field in LIST_FIELDS},
+}
+
+# Route attributes, in the same order as `BGPRoute` fields.
+ROUTE_FIELDS = (
+    "prefix",
+    "active",
+    "age",
+    "weight",
+    "med",
+    "local_preference",
+    "as_path",
+    "communities",
+    "next_hop",
+    "source_as",
+    "source_rid",
+    "peer_rid",
+    "rpki_state",
+)
+
+# Names of array type codes' value types. Type code `I` is 32 bits wide on supported platforms.
+TYPE_NAMES = {"B": "uint8", "I": "uint32", "q": "int64"}
+
+
+class RouteColumns:
+    """BGP route table stored as one array per route attribute."""
+
+    __slots__ = ("vrf", "count", "winning_weight", "strings", "columns")
+
+    vrf: str
+    count: int
+    winning_weight: str
+    strings: t.List[str]
+    columns: t.Dict[str, array]
+
+    def __init__(
+        self,
+        *,
+        vrf: str,
+        count: int,
+        winning_weight: str,
+        strings: t.List[str],
+        columns: t.Dict[str, array],
+    ) -> None:
+        """Create a table from existing columns."""
+        self.vrf = vrf
+        self.count = count
+        self.winning_weight = winning_weight
+        self.strings = strings
+        self.columns = columns
+
+    def __repr__(self) -> str:
+        """Represent table by VRF & size."""
+        return "RouteColumns(vrf={!r}, routes={!r}, nbytes={!r})".format(
+            self.vrf, len(self), self.nbytes
+        )
+
+    def __len__(self) -> int:
+        """Get the number of routes."""
+        return len(self.columns["prefix"])
+
+    def __bool__(self) -> bool:
+        """Consider a table with no routes to be a value, like a parsed `BGPRouteTable`."""
+        return True
+
+    def __eq__(self, other: t.Any) -> bool:
+        """Compare tables by value."""
+        if not isinstance(other, RouteColumns):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    @classmethod
+    def from_routes(
+        cls,
+        routes: t.Iterable["BGPRoute"],
+        *,
+        vrf: str,
+        count: int,
+        winning_weight: str,
+    ) -> "RouteColumns":
+        """Store routes in columns."""
+        index: t.Dict[str, int] = {}
+
+        def intern(value: str) -> int:
+            """Get a string's index, adding it to the table's strings if it's new."""
+            idx = index.get(value)
+            if idx is None:
+                idx = index[value] = len(index)
+            return idx
+
+        columns = {name: array(code) for name, code in COLUMN_TYPES.items()}
+        for field in LIST_FIELDS:
+            columns[f"{field}_offsets"].append(0)
+
+        for route in routes:
+            for field in STRING_FIELDS:
+                columns[field].append(intern(getattr(route, field)))
+            for field, _ in INTEGER_FIELDS:
+                columns[field].append(getattr(route, field))
+            columns["as_path"].extend(route.as_path)
+            columns["as_path_offsets"].append(len(columns["as_path"]))
+            columns["communities"].extend(intern(c) for c in route.communities)
+            columns["communities_offsets"].append(len(columns["communities"]))
+
+        return cls(
+            vrf=vrf,
+            count=count,
+            winning_weight=winning_weight,
+            strings=list(index),
+            columns=columns,
+        )
+
+    @classmethod
+    def from_table(cls, table: "BGPRouteTable") -> "RouteColumns":
+        """Store a parsed BGP route table in columns."""
+        return cls.from_routes(
+            table.routes, vrf=table.vrf, count=table.count, winning_weight=table.winning_weight
+        )
+
+    @classmethod
+    def from_builtins(cls, data: t.Dict[str, t.Any]) -> "RouteColumns":
+        """Load a table from its builtin representation, e.g. when decoded from JSON."""
+        return cls(
+            vrf=data["vrf"],
+            count=data["count"],
+            winning_weight=data["winning_weight"],
+            strings=data["strings"],
+            columns={
+                name: array(code, data["columns"][name]) for name, code in COLUMN_TYPES.items()
+            },
+        )
+
+    @classmethod
+    def coerce(cls, value: t.Any) -> t.Any:
+        """Load a table from its builtin representation, leaving any other value unchanged."""
+        if isinstance(value, dict) and value.get("format") == COLUMNS_FORMAT:
+            return cls.from_builtins(value)
+        return value
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate the memory used by the table's data, in bytes."""
+        return sum(len(s) for s in self.strings) + sum(
+            len(column) * column.itemsize for column in self.columns.values()
+        )
+
+    def to_builtins(self) -> t.Dict[str, t.Any]:
+        """Get a JSON-compatible representation of the table's columns."""
+        return self._builtins(array.tolist)
+
+    def _builtins(self, column: t.Callable[[array], t.Any]) -> t.Dict[str, t.Any]:
+        """Get a representation of the table, with each column converted by `column`."""
+        return {
+            "format": COLUMNS_FORMAT,
+            "vrf": self.vrf,
+            "count": self.count,
+            "winning_weight": self.winning_weight,
+            "strings": self.strings,
+            "columns": {name: column(values) for name, values in self.columns.items()},
+        }
+
+    def rows(self) -> t.Iterator[t.Dict[str, t.Any]]:
+        """Get each route as a dictionary, as `BGPRoute.export_dict()` would."""
+        strings = self.strings
+        columns = self.columns
+        as_path, as_path_offsets = columns["as_path"], columns["as_path_offsets"]
+        communities, communities_offsets = columns["communities"], columns["communities_offsets"]
+        for idx in range(len(self)):
+            route = {
+                "as_path": as_path[as_path_offsets[idx] : as_path_offsets[idx + 1]].tolist(),
+                "communities": [
+                    strings[c]
+                    for c in communities[communities_offsets[idx] : communities_offsets[idx + 1]]
+                ],
+            }
+            for field in STRING_FIELDS:
+                route[field] = strings[columns[field][idx]]
+            for field, _ in INTEGER_FIELDS:
+                route[field] = columns[field][idx]
+            route["active"] = bool(route["active"])
+            yield {field: route[field] for field in ROUTE_FIELDS}
+
+    def export_dict(self) -> t.Dict[str, t.Any]:
+        """Get the table as a dictionary, as `BGPRouteTable.export_dict()` would."""
+        return {
+            "vrf": self.vrf,
+            "count": self.count,
+            "routes": list(self.rows()),
+            "winning_weight": self.winning_weight,
+        }
+
+    def to_json(self, **envelope: t.Any) -> bytes:
+        """Serialize the table as JSON, in the same structure as `export_dict()`.
+
+        If `envelope` fields are given, the table is serialized as the `output` field of an object
+        with those fields. Each route is encoded directly into the output, without first building
+        a list of every route.
+        """
+        encoder = msgspec.json.Encoder()
+        table = {
+            "vrf": self.vrf,
+            "count": self.count,
+            "routes": msgspec.Raw(b"[]"),
+            "winning_weight": self.winning_weight,
+        }
+        document = {"output": table, **envelope} if envelope else table
+        # The table is encoded before any envelope field, so the first match is its routes.
+        head, tail = encoder.encode(document).split(b'"routes":[]', 1)
+
+        data = bytearray(head)
+        data += b'"routes":['
+        for idx, route in enumerate(self.rows()):
+            if idx != 0:
+                data += b","
+            encoder.encode_into(route, data, -1)
+        data += b"]"
+        data += tail
+        return bytes(data)
+
+    def to_msgpack(self, **envelope: t.Any) -> bytes:
+        """Serialize the table's columns as MessagePack, with `envelope` fields added.
+
+        Columns are encoded as binary values of little-endian integers, rather than as arrays of
+        integers, which would take up to 9 bytes per value.
+        """
+        output = self._builtins(
+            lambda column: {"type": TYPE_NAMES[column.typecode], "data": _little_endian(column)}
+        )
+        return msgspec.msgpack.encode({"output": output, **envelope})
+
+    def to_arrow(self, **metadata: t.Any) -> bytes:
+        """Serialize the table as an Arrow IPC stream, with `metadata` added to its schema.
+
+        Requires the `pyarrow` package.
+        """
+        # Third Party
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        columns = self.columns
+        strings = pa.array(self.strings, type=pa.string())
+
+        def _array(name: str, type_: "pa.DataType") -> "pa.Array":
+            """Create an Arrow array sharing a column's memory."""
+            column = columns[name]
+            return pa.Array.from_buffers(type_, len(column), [None, pa.py_buffer(column)])
+
+        def _strings(name: str) -> "pa.Array":
+            """Create a dictionary-encoded Arrow array of only the strings a column uses."""
+            indexes = _array(name, pa.uint32())
+            used = pc.unique(indexes)
+            return pa.DictionaryArray.from_arrays(
+                pc.index_in(indexes, value_set=used), strings.take(used)
+            )
+
+        arrays = {
+            "prefix": _strings("prefix"),
+            "active": _array("active", pa.uint8()).cast(pa.bool_()),
+            "age": _array("age", pa.int64()),
+            "weight": _array("weight", pa.int64()),
+            "med": _array("med", pa.int64()),
+            "local_preference": _array("local_preference", pa.int64()),
+            "as_path": pa.ListArray.from_arrays(
+                _array("as_path_offsets", pa.uint32()).cast(pa.int32()),
+                _array("as_path", pa.uint32()),
+            ),
+            "communities": pa.ListArray.from_arrays(
+                _array("communities_offsets", pa.uint32()).cast(pa.int32()),
+                _strings("communities"),
+            ),
+            "next_hop": _strings("next_hop"),
+            "source_as": _array("source_as", pa.uint32()),
+            "source_rid": _strings("source_rid"),
+            "peer_rid": _strings("peer_rid"),
+            "rpki_state": _array("rpki_state", pa.uint8()),
+        }
+        schema_metadata = {
+            "vrf": self.vrf,
+            "count": str(self.count),
+            "winning_weight": self.winning_weight,
+            **{key: msgspec.json.encode(value).decode() for key, value in metadata.items()},
+        }
+        batch = pa.RecordBatch.from_pydict(arrays, metadata=schema_metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return sink.getvalue().to_pybytes()
+
+
+def _little_endian(column: array) -> bytes:
+    """Get the raw bytes of an array, in little-endian byte order."""
+    if sys.byteorder == "little":
+        return column.tobytes()
+    swapped = array(column.typecode, column)
+    swapped.byteswap()
+    return swapped.tobytes()
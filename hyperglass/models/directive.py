@@ -2,14 +2,17 @@
 
 # Standard Library
 import re
+import heapq
 import typing as t
 from ipaddress import IPv4Network, IPv6Network, ip_network
+from itertools import groupby
 
 # Third Party
 from pydantic import Field, FilePath, PrivateAttr, IPvAnyNetwork, field_validator
 
 # Project
 from hyperglass.log import log
+from hyperglass.util import get_fmt_keys
 from hyperglass.types import Series
 from hyperglass.settings import Settings
 from hyperglass.exceptions.private import InputValidationError
@@ -21,11 +24,62 @@ from .fields import Action
 StringOrArray = t.Union[str, t.List[str]]
 Condition = t.Union[IPvAnyNetwork, str]
 RuleValidation = t.Union[t.Literal["ipv4", "ipv6", "pattern"], None]
-PassedValidation = t.Union[bool, None]
 IPFamily = t.Literal["ipv4", "ipv6"]
 RuleTypeAttr = t.Literal["ipv4", "ipv6", "pattern", "none"]
 
 
+def _skip_set(chars: t.Iterator[str]) -> None:
+    """Consume a character set, after its opening `[`. A leading `]` is literal."""
+    char = next(chars, "")
+    if char == "^":
+        char = next(chars, "")
+    if char == "]":
+        char = next(chars, "")
+    while char and char != "]":
+        if char == "\\":
+            next(chars, None)
+        char = next(chars, "")
+
+
+def has_alternation(pattern: str) -> bool:
+    """Determine if a pattern has an alternation outside of any group."""
+    depth = 0
+    chars = iter(pattern)
+    for char in chars:
+        if char == "\\":
+            next(chars, None)
+        elif char == "[":
+            _skip_set(chars)
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+    return False
+
+
+def literal_prefix(pattern: str) -> str:
+    """Get the lower-cased literal text any string matching a case-insensitive pattern begins with.
+
+    Only ASCII characters that match nothing but themselves, in either case, are included.
+    """
+    body = pattern.removeprefix("^")
+    if has_alternation(body):
+        return ""
+
+    prefix = []
+    for char in body:
+        if not char.isascii() or re.escape(char) != char or char.lower() in "iks":
+            # `i`, `k` & `s` also case-insensitively match non-ASCII characters.
+            break
+        prefix.append(char)
+    # A quantifier may make the character before it optional.
+    if body[len(prefix) : len(prefix) + 1] in ("?", "*", "{") and prefix:
+        prefix.pop()
+    return "".join(prefix).lower()
+
+
 class Input(HyperglassModel):
     """Base input field."""
 
@@ -69,11 +123,23 @@ class Rule(HyperglassModel):
     """Base rule."""
 
     _type: RuleTypeAttr = "none"
-    _passed: PassedValidation = PrivateAttr(None)
+    _templates: t.Tuple[t.Tuple[str, t.Tuple[str, ...]], ...] = PrivateAttr(())
     condition: Condition
     action: Action = "permit"
     commands: t.List[str] = Field([], alias="command")
 
+    def __init__(self, **data: t.Any) -> None:
+        """Parse command templates."""
+        super().__init__(**data)
+        self._templates = tuple(
+            (command, tuple(get_fmt_keys(command))) for command in self.commands
+        )
+
+    @property
+    def templates(self) -> t.Tuple[t.Tuple[str, t.Tuple[str, ...]], ...]:
+        """Get each command, with the keys it must be formatted with."""
+        return self._templates
+
     @field_validator("commands", mode="before")
     def validate_commands(cls, value: t.Union[str, t.List[str]]) -> t.List[str]:
         """Ensure commands is a list."""
@@ -132,7 +198,6 @@ class RuleWithIP(Rule):
 
         if isinstance(target, t.List):
             if len(target) > 1:
-                self._passed = False
                 raise InputValidationError(error="Target must be a single value", target=target)
             target = target[0]
 
@@ -153,11 +218,9 @@ class RuleWithIP(Rule):
         in_range = self.in_range(valid_target)
 
         if all((is_member, in_range, self.action == "permit")):
-            self._passed = True
             return True
 
         if is_member and not in_range:
-            self._passed = False
             raise InputValidationError(
                 error="Prefix-length is not within range {ge}-{le}",
                 target=target,
@@ -166,7 +229,6 @@ class RuleWithIP(Rule):
             )
 
         if is_member and self.action == "deny":
-            self._passed = False
             raise InputValidationError(
                 error="Member of denied network '{network}'",
                 target=target,
@@ -198,17 +260,31 @@ class RuleWithPattern(Rule):
     """A rule validated by a regular expression pattern."""
 
     _type: RuleTypeAttr = "pattern"
+    _pattern: t.Pattern = PrivateAttr()
     condition: str
 
-    def validate_target(self, target: str, *, multiple: bool) -> str:  # noqa: C901
+    def __init__(self, **data: t.Any) -> None:
+        """Compile the rule's pattern."""
+        super().__init__(**data)
+        self._pattern = re.compile(self.source, re.IGNORECASE)
+
+    @property
+    def source(self) -> str:
+        """Get the regular expression matched against targets."""
+        if self.condition == "*":
+            return ".+"
+        return self.condition
+
+    @property
+    def pattern(self) -> t.Pattern:
+        """Get the compiled pattern matched against targets."""
+        return self._pattern
+
+    def validate_target(self, target: str, *, multiple: bool) -> bool:
         """Validate a string target against configured regex patterns."""
 
         def validate_single_value(value: str) -> t.Union[bool, BaseException]:
-            if self.condition == "*":
-                pattern = re.compile(".+", re.IGNORECASE)
-            else:
-                pattern = re.compile(self.condition, re.IGNORECASE)
-            is_match = pattern.match(value)
+            is_match = self._pattern.match(value)
 
             if is_match and self.action == "permit":
                 return True
@@ -219,12 +295,9 @@ class RuleWithPattern(Rule):
         if isinstance(target, t.List) and multiple:
             for result in (validate_single_value(v) for v in target):
                 if isinstance(result, BaseException):
-                    self._passed = False
                     raise result
                 if result is False:
-                    self._passed = False
                     return result
-            self._passed = True
             return True
 
         if isinstance(target, t.List) and not multiple:
@@ -233,9 +306,7 @@ class RuleWithPattern(Rule):
         result = validate_single_value(target)
 
         if isinstance(result, BaseException):
-            self._passed = False
             raise result
-        self._passed = result
         return result
 
 
@@ -247,10 +318,192 @@ class RuleWithoutValidation(Rule):
 
     def validate_target(self, target: str, *, multiple: bool) -> t.Literal[True]:
         """Don't validate a target. Always returns `True`."""
-        self._passed = True
         return True
 
 
+class IPRuleStage:
+    """Consecutive IP rules, indexed by network & prefix length.
+
+    For each prefix length used by a rule's condition, conditions' network addresses, shifted
+    right by the number of host bits, map to the first rule with that condition. A target's
+    matching rules are found with one lookup per prefix length, rather than one comparison per
+    rule.
+    """
+
+    __slots__ = ("rules", "index")
+
+    rules: t.Tuple[RuleWithIP, ...]
+    index: t.Dict[int, t.Tuple[t.Tuple[int, int, t.Dict[int, int]], ...]]
+
+    def __init__(self, rules: t.Sequence[RuleWithIP]) -> None:
+        """Index rules' conditions."""
+        self.rules = tuple(rules)
+        tables: t.Dict[int, t.Dict[int, t.Dict[int, int]]] = {4: {}, 6: {}}
+        for idx, rule in enumerate(self.rules):
+            condition = rule.condition
+            host_bits = condition.max_prefixlen - condition.prefixlen
+            table = tables[condition.version].setdefault(condition.prefixlen, {})
+            table.setdefault(int(condition.network_address) >> host_bits, idx)
+        self.index = {
+            version: tuple(
+                (prefixlen, max_prefixlen - prefixlen, by_prefixlen[prefixlen])
+                for prefixlen in sorted(by_prefixlen)
+            )
+            for (version, by_prefixlen), max_prefixlen in zip(tables.items(), (32, 128))
+        }
+
+    def match(self, target: StringOrArray, *, multiple: bool) -> t.Optional[RuleWithIP]:
+        """Get the first rule whose condition contains the target."""
+        if isinstance(target, t.List):
+            if len(target) > 1:
+                raise InputValidationError(error="Target must be a single value", target=target)
+            target = target[0]
+
+        try:
+            valid_target = ip_network(target)
+        except ValueError as err:
+            raise InputValidationError(error=str(err), target=target) from err
+
+        address = int(valid_target.network_address)
+        first = None
+        for prefixlen, host_bits, table in self.index[valid_target.version]:
+            if prefixlen > valid_target.prefixlen:
+                break
+            idx = table.get(address >> host_bits)
+            if idx is not None and (first is None or idx < first):
+                first = idx
+
+        if first is None:
+            return None
+
+        rule = self.rules[first]
+        if not rule.in_range(valid_target):
+            raise InputValidationError(
+                error="Prefix-length is not within range {ge}-{le}",
+                target=target,
+                ge=rule.ge,
+                le=rule.le,
+            )
+        if rule.action == "deny":
+            raise InputValidationError(
+                error="Member of denied network '{network}'",
+                target=target,
+                network=str(rule.condition),
+            )
+        return rule
+
+
+class PatternRuleStage:
+    """Consecutive pattern rules, indexed by the literal text their patterns begin with.
+
+    A target is only matched against patterns whose literal prefix it begins with, and against
+    patterns without one.
+    """
+
+    __slots__ = ("rules", "prefixes", "unprefixed")
+
+    rules: t.Tuple[RuleWithPattern, ...]
+    prefixes: t.Tuple[t.Tuple[int, t.Dict[str, t.List[int]]], ...]
+    unprefixed: t.Tuple[int, ...]
+
+    def __init__(self, rules: t.Sequence[RuleWithPattern]) -> None:
+        """Index rules' patterns."""
+        self.rules = tuple(rules)
+        prefixes: t.Dict[int, t.Dict[str, t.List[int]]] = {}
+        unprefixed = []
+        for idx, rule in enumerate(self.rules):
+            prefix = literal_prefix(rule.source)
+            if prefix:
+                prefixes.setdefault(len(prefix), {}).setdefault(prefix, []).append(idx)
+            else:
+                unprefixed.append(idx)
+        self.prefixes = tuple(sorted(prefixes.items()))
+        self.unprefixed = tuple(unprefixed)
+
+    def candidates(self, target: str) -> t.Iterator[int]:
+        """Get the indexes of rules whose pattern may match the target, in order."""
+        matching = (table.get(target[:length].lower()) for length, table in self.prefixes)
+        return heapq.merge(self.unprefixed, *(idxs for idxs in matching if idxs is not None))
+
+    def match(self, target: StringOrArray, *, multiple: bool) -> t.Optional[RuleWithPattern]:
+        """Get the first rule whose pattern matches the target."""
+        if isinstance(target, t.List):
+            for rule in self.rules:
+                if rule.validate_target(target, multiple=multiple):
+                    return rule
+            return None
+
+        for idx in self.candidates(target):
+            rule = self.rules[idx]
+            if rule.pattern.match(target):
+                if rule.action == "deny":
+                    raise InputValidationError(target=target, error="Denied")
+                return rule
+        return None
+
+
+class RuleStage:
+    """A single rule, evaluated on its own."""
+
+    __slots__ = ("rule",)
+
+    rule: Rule
+
+    def __init__(self, rule: Rule) -> None:
+        """Store the rule."""
+        self.rule = rule
+
+    def match(self, target: StringOrArray, *, multiple: bool) -> t.Optional[Rule]:
+        """Get the rule if it matches the target."""
+        if self.rule.validate_target(target, multiple=multiple):
+            return self.rule
+        return None
+
+
+Stage = t.Union[IPRuleStage, PatternRuleStage, RuleStage]
+
+
+class RuleEngine:
+    """A directive's rules, compiled for validating query targets.
+
+    Consecutive rules of the same kind are evaluated together, so the first matching rule, in
+    configured order, determines whether a target is valid.
+    """
+
+    __slots__ = ("stages",)
+
+    stages: t.Tuple[Stage, ...]
+
+    def __init__(self, rules: t.Sequence[Rule]) -> None:
+        """Group consecutive rules into stages."""
+        stages: t.List[Stage] = []
+        for kind, group in groupby(rules, key=self.kind):
+            if kind == "ip":
+                stages.append(IPRuleStage(list(group)))
+            elif kind == "pattern":
+                stages.append(PatternRuleStage(list(group)))
+            else:
+                stages.extend(RuleStage(rule) for rule in group)
+        self.stages = tuple(stages)
+
+    @staticmethod
+    def kind(rule: Rule) -> t.Optional[str]:
+        """Get the kind of stage a rule can be evaluated in with other rules."""
+        if isinstance(rule, RuleWithIP):
+            return "ip"
+        if isinstance(rule, RuleWithPattern):
+            return "pattern"
+        return None
+
+    def match(self, target: StringOrArray, *, multiple: bool) -> t.Optional[Rule]:
+        """Get the first rule matching the target."""
+        for stage in self.stages:
+            rule = stage.match(target, multiple=multiple)
+            if rule is not None:
+                return rule
+        return None
+
+
 RuleType = t.Union[
     RuleWithIPv4,
     RuleWithIPv6,
@@ -263,6 +516,7 @@ class Directive(HyperglassUniqueModel, unique_by=("id", "table_output")):
     """A directive contains commands that can be run on a device, as long as defined rules are met."""
 
     _hyperglass_builtin: bool = PrivateAttr(False)
+    _engine: RuleEngine = PrivateAttr()
 
     id: str
     name: str
@@ -275,6 +529,11 @@ class Directive(HyperglassUniqueModel, unique_by=("id", "table_output")):
     multiple: bool = False
     multiple_separator: str = " "
 
+    def __init__(self, **data: t.Any) -> None:
+        """Compile rules."""
+        super().__init__(**data)
+        self._engine = RuleEngine(self.rules)
+
     @field_validator("rules", mode="before")
     @classmethod
     def validate_rules(cls, rules: t.List[t.Dict[str, t.Any]]):
@@ -297,14 +556,12 @@ class Directive(HyperglassUniqueModel, unique_by=("id", "table_output")):
                 out_rules.append(rule)
         return out_rules
 
-    def validate_target(self, target: str) -> bool:
-        """Validate a target against all configured rules."""
-        for rule in self.rules:
-            valid = rule.validate_target(target, multiple=self.multiple)
-            if valid is True:
-                return True
-            continue
-        raise InputValidationError(error="No matched validation rules", target=target)
+    def validate_target(self, target: StringOrArray) -> RuleType:
+        """Validate a target against all configured rules & get the rule it matched."""
+        rule = self._engine.match(target, multiple=self.multiple)
+        if rule is None:
+            raise InputValidationError(error="No matched validation rules", target=target)
+        return rule
 
     @property
     def field_type(self) -> t.Literal["text", "select", None]:
@@ -194,6 +194,8 @@ class MultiModel(RootModel[MultiModelT]):
 
     root: t.List[MultiModelT] = []
     _count: int = PrivateAttr()
+    _index: t.Dict[t.Any, MultiModelT] = PrivateAttr()
+    _names: t.Dict[str, MultiModelT] = PrivateAttr()
 
     def __init__(self, *items: t.Union[MultiModelT, t.Dict[str, t.Any]]) -> None:
         """Validate items."""
@@ -202,7 +204,7 @@ class MultiModel(RootModel[MultiModelT]):
                 raise AttributeError(f"MultiModel is missing class variable '{cls_var}'")
         valid = self._valid_items(*items)
         super().__init__(root=valid)
-        self._count = len(self.root)
+        self._reindex()
 
     def __init_subclass__(cls, **kw: t.Any) -> None:
         """Add class variables from keyword arguments."""
@@ -231,9 +233,9 @@ class MultiModel(RootModel[MultiModelT]):
         if isinstance(value, int):
             return self.root[value]
 
-        for item in self:
-            if hasattr(item, self.unique_by) and getattr(item, self.unique_by) == value:
-                return item
+        item = self._index.get(value)
+        if item is not None:
+            return item
         raise IndexError(
             "No match found for {!s}.{!s}={!r}".format(
                 self.model.__class__.__name__, self.unique_by, value
@@ -278,6 +280,14 @@ class MultiModel(RootModel[MultiModelT]):
         """Access item count."""
         return self._count
 
+    def get(self, value: t.Any, default: t.Any = None) -> t.Optional[MultiModelT]:
+        """Get an item by its `unique_by` property, or `default` if there is no such item."""
+        return self._index.get(value, default)
+
+    def get_by_name(self, name: str, default: t.Any = None) -> t.Optional[MultiModelT]:
+        """Get an item by its `name` property, or `default` if there is no such item."""
+        return self._names.get(name, default)
+
     @classmethod
     def create(cls, name: str, *, model: MultiModelT, unique_by: str) -> "MultiModel":
         """Create a MultiModel."""
@@ -287,6 +297,18 @@ class MultiModel(RootModel[MultiModelT]):
         new._model_name = getattr(model, "__name__", "MultiModel")
         return new
 
+    def _reindex(self) -> None:
+        """Index items by `unique_by` property & name, keeping the first item with each value."""
+        self._count = len(self.root)
+        self._index = {}
+        self._names = {}
+        for item in self.root:
+            if hasattr(item, self.unique_by):
+                self._index.setdefault(getattr(item, self.unique_by), item)
+            name = getattr(item, "name", None)
+            if isinstance(name, str):
+                self._names.setdefault(name, item)
+
     def _valid_items(
         self, *to_validate: t.List[t.Union[MultiModelT, t.Dict[str, t.Any]]]
     ) -> t.List[MultiModelT]:
@@ -322,8 +344,9 @@ class MultiModel(RootModel[MultiModelT]):
 
     def filter(self, *properties: str) -> MultiModelT:
         """Get only items with `unique_by` properties matching values in `properties`."""
+        wanted = set(properties)
         return self.__class__(
-            *(item for item in self if getattr(item, self.unique_by, None) in properties)
+            *(item for item in self if getattr(item, self.unique_by, None) in wanted)
         )
 
     def matching(self, *unique: str) -> MultiModelT:
@@ -347,7 +370,7 @@ class MultiModel(RootModel[MultiModelT]):
         """Add an item to the model."""
         new = self._merge_with(*items, unique_by=unique_by)
         self.root = new
-        self._count = len(self.root)
+        self._reindex()
         for item in new:
             log.debug(
                 "Added {} '{!s}' to {}".format(
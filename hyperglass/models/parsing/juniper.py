@@ -1,4 +1,9 @@
-"""Data Models for Parsing Juniper XML Response."""
+"""Data Models for Parsing Juniper XML Response.
+
+The `bgp_route_juniper` output plugin parses responses incrementally, without these models. They
+are kept only as the reference implementation its output is tested against, in
+`hyperglass.plugins.tests._fixtures.reference_juniper`; `RPKI_STATE_MAP` is shared by both.
+"""
 
 # Standard Library
 import typing as t
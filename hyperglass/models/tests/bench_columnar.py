@@ -0,0 +1,145 @@
+"""Benchmark serving a large structured query response, from rows & from columns.
+
+Each path converts a parsed route table for the cache, pickles & unpickles it as the default cache
+codec does, then encodes the API response. Peak memory is the peak of Python allocations made
+while serving the table, plus, for Arrow, the peak of pyarrow's memory pool. Requires a running
+Redis instance. Run with:
+
+    python3 -m hyperglass.models.tests.bench_columnar
+"""
+
+# Standard Library
+import gc
+import time
+import pickle
+import random
+import typing as t
+import tracemalloc
+from importlib.util import find_spec
+
+# Third Party
+import msgspec
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.config.params import Params
+
+# Local
+from ..data.columnar import RouteColumns
+from ..data.bgp_route import BGPRouteTable
+
+ROUTE_COUNT = 50_000
+PEER_COUNT = 40
+COMMUNITY_POOL = 500
+COMMUNITIES_PER_ROUTE = 8
+
+ENVELOPE = {"id": "hyperglass.query.0", "cached": False, "runtime": 3, "level": "success"}
+
+
+def _table(count: int) -> BGPRouteTable:
+    rand = random.Random(0)
+    peers = [f"192.0.2.{i}" for i in range(PEER_COUNT)]
+    pool = [f"{rand.randint(64512, 65534)}:{rand.randint(0, 9999)}" for _ in range(COMMUNITY_POOL)]
+    routes = []
+    for i in range(count):
+        peer = rand.choice(peers)
+        routes.append(
+            {
+                "prefix": f"10.{i // 256 % 256}.{i % 256}.0/24",
+                "active": i % 3 == 0,
+                "age": rand.randint(0, 10_000_000),
+                "weight": 170,
+                "med": rand.choice((0, 10, 100)),
+                "local_preference": 100,
+                "as_path": [rand.randint(1, 400_000) for _ in range(rand.randint(1, 6))],
+                "communities": rand.sample(pool, COMMUNITIES_PER_ROUTE),
+                "next_hop": peer,
+                "source_as": rand.randint(1, 400_000),
+                "source_rid": peer,
+                "peer_rid": peer,
+                "rpki_state": rand.randint(0, 3),
+            }
+        )
+    return BGPRouteTable(vrf="default", count=count, routes=routes, winning_weight="low")
+
+
+def rows_json(table: BGPRouteTable) -> t.Tuple[int, int]:
+    """Serve a table as dictionaries, as before columnar tables."""
+    stored = pickle.dumps(table.export_dict())
+    output = pickle.loads(stored)  # noqa: S301
+    return len(stored), len(msgspec.json.encode({"output": output, **ENVELOPE}))
+
+
+def _columns(table: BGPRouteTable) -> t.Tuple[bytes, RouteColumns]:
+    stored = pickle.dumps(RouteColumns.from_table(table))
+    return stored, pickle.loads(stored)  # noqa: S301
+
+
+def columns_json(table: BGPRouteTable) -> t.Tuple[int, int]:
+    """Serve a table from columns, as JSON."""
+    stored, output = _columns(table)
+    return len(stored), len(output.to_json(**ENVELOPE))
+
+
+def columns_msgpack(table: BGPRouteTable) -> t.Tuple[int, int]:
+    """Serve a table from columns, as MessagePack."""
+    stored, output = _columns(table)
+    return len(stored), len(output.to_msgpack(**ENVELOPE))
+
+
+def columns_arrow(table: BGPRouteTable) -> t.Tuple[int, int]:
+    """Serve a table from columns, as an Arrow IPC stream."""
+    stored, output = _columns(table)
+    return len(stored), len(output.to_arrow(**ENVELOPE))
+
+
+def _measure(func: t.Callable, table: BGPRouteTable) -> t.Tuple[float, float, int, int]:
+    """Serve a table & report duration, peak memory in MiB, cached size & response size."""
+    gc.collect()
+    start = time.perf_counter()
+    func(table)
+    duration = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stored, response = func(table)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return duration, peak / 1024 / 1024, stored, response
+
+
+def main() -> None:
+    """Compare serving a large route table from rows & from columns."""
+    state = use_state()
+    state.publish(params=Params())
+    try:
+        table = _table(ROUTE_COUNT)
+    finally:
+        state.clear()
+
+    paths = [
+        ("rows, json", rows_json),
+        ("columns, json", columns_json),
+        ("columns, msgpack", columns_msgpack),
+    ]
+    if find_spec("pyarrow") is not None:
+        paths.append(("columns, arrow", columns_arrow))
+
+    print(f"routes: {ROUTE_COUNT}")
+    for name, func in paths:
+        duration, peak, stored, response = _measure(func, table)
+        if func is columns_arrow:
+            # Third Party
+            import pyarrow as pa
+
+            peak += pa.default_memory_pool().max_memory() / 1024 / 1024
+        print(
+            f"  {name:<17} {duration:>6.2f} s  peak {peak:>6.1f} MiB  "
+            f"cached {stored / 1024 / 1024:>5.1f} MiB  response {response / 1024 / 1024:>5.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
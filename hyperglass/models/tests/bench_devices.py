@@ -0,0 +1,94 @@
+"""Benchmark the device & directive lookups made when validating a query.
+
+Compares scanning every device & directive, as before collections were indexed, with indexed
+lookups. Requires a running Redis instance. Run with:
+
+    python3 -m hyperglass.models.tests.bench_devices
+"""
+
+# Standard Library
+import time
+import typing as t
+
+# Project
+from hyperglass.log import log
+from hyperglass.state import use_state
+from hyperglass.models.directive import Directive, Directives
+from hyperglass.models.config.params import Params
+from hyperglass.models.config.devices import Device, Devices
+
+DEVICE_COUNT = 1_000
+DIRECTIVE_COUNT = 20
+ITERATIONS = 1_000
+
+
+def _scan(devices: Devices, location: str, query_type: str) -> Directive:
+    """Validate a query's location & type by scanning devices, as before."""
+    if not any(location in (device.id, device.name) for device in devices):
+        raise LookupError(location)
+    if not any(query_type in [d.id for d in device.directives] for device in devices):
+        raise LookupError(query_type)
+    device: Device = next(device for device in devices if device.id == location)
+    return device.directives.matching(query_type)[0]
+
+
+def _indexed(devices: Devices, location: str, query_type: str) -> Directive:
+    """Validate a query's location & type with indexed lookups."""
+    if not devices.valid_id_or_name(location):
+        raise LookupError(location)
+    if not devices.has_directives(query_type):
+        raise LookupError(query_type)
+    return devices[location].directives.get(query_type)
+
+
+def _run(func: t.Callable[[Devices, str, str], Directive], devices: Devices) -> float:
+    # The last device, using the last directive, is the worst case for scanning.
+    location = devices[-1].id
+    query_type = f"directive_{DIRECTIVE_COUNT - 1}"
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        assert func(devices, location, query_type).id == query_type
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main() -> None:
+    """Compare scanning devices & directives with indexed lookups."""
+    log.remove()
+    state = use_state()
+    directive_ids = [f"directive_{i}" for i in range(DIRECTIVE_COUNT)]
+    with state.cache.pipeline() as pipeline:
+        pipeline.set("params", Params())
+        pipeline.set(
+            "directives",
+            Directives.new(
+                {
+                    directive_id: {"name": directive_id, "field": {"description": directive_id}}
+                    for directive_id in directive_ids
+                }
+            ),
+        )
+    try:
+        devices = Devices(
+            *(
+                {
+                    "name": f"Router {i}",
+                    "address": "127.0.0.1",
+                    "credential": {"username": "", "password": ""},
+                    "platform": "juniper",
+                    "directives": directive_ids[: i % DIRECTIVE_COUNT + 1],
+                }
+                for i in range(DEVICE_COUNT)
+            )
+        )
+    finally:
+        state.clear()
+
+    scan = _run(_scan, devices)
+    indexed = _run(_indexed, devices)
+    print(f"devices: {DEVICE_COUNT}, directives: {DIRECTIVE_COUNT}")
+    print(f"  scan    {scan * 1e6:>9.1f} µs/query")
+    print(f"  indexed {indexed * 1e6:>9.1f} µs/query")
+
+
+if __name__ == "__main__":
+    main()
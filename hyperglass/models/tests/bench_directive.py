@@ -0,0 +1,124 @@
+"""Benchmark validating query targets against directives with many rules.
+
+Compares evaluating each rule in turn, as before rules were compiled, with a directive's compiled
+rules. Run with:
+
+    python3 -m hyperglass.models.tests.bench_directive
+"""
+
+# Standard Library
+import re
+import time
+import random
+import typing as t
+from ipaddress import ip_network
+
+# Project
+from hyperglass.log import log
+from hyperglass.exceptions.private import InputValidationError
+
+# Local
+from ..directive import Rule, Directive, RuleWithIP
+
+RULE_COUNT = 10_000
+TARGET_COUNT = 200
+
+
+def _ip_rules(rand: random.Random) -> t.List[t.Dict[str, t.Any]]:
+    rules = []
+    for i in range(RULE_COUNT):
+        network = ip_network((rand.getrandbits(32), rand.randint(8, 24)), strict=False)
+        rules.append(
+            {
+                "condition": str(network),
+                "action": "deny" if i % 10 == 0 else "permit",
+                "le": 32,
+                "command": "show route {target}",
+            }
+        )
+    return rules
+
+
+def _pattern_rules(asns: t.List[int]) -> t.List[t.Dict[str, t.Any]]:
+    return [
+        {
+            "condition": rf"^{asn}:{i}(:\d+)?$",
+            "action": "deny" if i % 10 == 0 else "permit",
+            "command": "show route community {target}",
+        }
+        for i, asn in enumerate(asns)
+    ]
+
+
+def _linear(directive: Directive, target: str) -> Rule:
+    """Validate a target by evaluating each rule, as before rules were compiled."""
+    for rule in directive.rules:
+        if isinstance(rule, RuleWithIP):
+            matched = rule.validate_target(target, multiple=directive.multiple)
+        else:
+            # Patterns were compiled, or fetched from `re`'s cache, on every evaluation.
+            is_match = re.match(rule.source, target, re.IGNORECASE)
+            if is_match and rule.action == "deny":
+                raise InputValidationError(target=target, error="Denied")
+            matched = bool(is_match)
+        if matched:
+            return rule
+    raise InputValidationError(error="No matched validation rules", target=target)
+
+
+def _compiled(directive: Directive, target: str) -> Rule:
+    return directive.validate_target(target)
+
+
+def _run(func: t.Callable[[Directive, str], Rule], directive: Directive, targets: t.List[str]):
+    results = []
+    start = time.perf_counter()
+    for target in targets:
+        try:
+            results.append(func(directive, target))
+        except InputValidationError as err:
+            results.append(str(err))
+    return time.perf_counter() - start, results
+
+
+def main() -> None:
+    """Compare evaluating rules in turn with compiled rules."""
+    # Rules log each evaluation at debug level.
+    log.remove()
+    rand = random.Random(0)
+    asns = [rand.randint(1, 400_000) for _ in range(RULE_COUNT)]
+    # Half of the community targets match a rule.
+    communities = [rand.randrange(RULE_COUNT * 2) for _ in range(TARGET_COUNT)]
+    cases = (
+        (
+            "ip",
+            _ip_rules(rand),
+            [
+                str(ip_network((rand.getrandbits(32), 24), strict=False))
+                for _ in range(TARGET_COUNT)
+            ],
+        ),
+        (
+            "pattern",
+            _pattern_rules(asns),
+            [f"{asns[i % RULE_COUNT]}:{i}" for i in communities],
+        ),
+    )
+    print(f"rules: {RULE_COUNT}, targets: {TARGET_COUNT}")
+    for name, rules, targets in cases:
+        start = time.perf_counter()
+        directive = Directive(id=name, name=name, field={"description": name}, rules=rules)
+        load = time.perf_counter() - start
+
+        linear, expected = _run(_linear, directive, targets)
+        compiled, results = _run(_compiled, directive, targets)
+        assert results == expected
+        print(
+            f"  {name:<8} load {load:>6.2f} s  "
+            f"linear {linear * 1e6 / TARGET_COUNT:>9.1f} µs/target  "
+            f"compiled {compiled * 1e6 / TARGET_COUNT:>7.1f} µs/target"
+        )
+
+
+if __name__ == "__main__":
+    main()
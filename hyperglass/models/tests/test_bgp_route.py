@@ -0,0 +1,84 @@
+"""Test BGP route table ordering & merging."""
+
+# Local
+from ..data.bgp_route import BGPRouteTable, BGPRouteTableBuilder, route_key
+
+ROUTE = {
+    "active": True,
+    "age": 0,
+    "weight": 0,
+    "med": 0,
+    "local_preference": 100,
+    "as_path": [65000],
+    "communities": [],
+    "source_as": 65000,
+    "source_rid": "192.0.2.1",
+    "peer_rid": "192.0.2.1",
+    "rpki_state": 3,
+}
+
+
+def _table(*prefixes: str, count: int = None) -> BGPRouteTable:
+    routes = [{**ROUTE, "prefix": p, "next_hop": f"192.0.2.{i}"} for i, p in enumerate(prefixes)]
+    return BGPRouteTable(
+        vrf="default",
+        count=len(routes) if count is None else count,
+        routes=routes,
+        winning_weight="low",
+    )
+
+
+def test_route_key():
+    assert route_key("10.0.0.0/8") == (4, 10 << 24, 8)
+    assert route_key("10.1.2.3/8") == (4, 10 << 24, 8)
+    assert route_key("2001:db8::/32") == (6, 0x20010DB8 << 96, 32)
+    assert route_key("192.0.2.1") == (4, 0xC0000201, 32)
+    assert route_key("invalid") > route_key("ffff::/16")
+
+
+def test_table_order(state):
+    table = _table("2001:db8::/32", "10.0.0.0/8", "1.0.0.0/24", "9.0.0.0/8", "10.0.0.0/16")
+    assert [r.prefix for r in table.routes] == [
+        "1.0.0.0/24",
+        "9.0.0.0/8",
+        "10.0.0.0/8",
+        "10.0.0.0/16",
+        "2001:db8::/32",
+    ]
+
+
+def test_table_paths_keep_order(state):
+    table = _table("10.0.0.0/8", "1.0.0.0/24", "10.0.0.0/8")
+    assert [r.next_hop for r in table.routes] == ["192.0.2.1", "192.0.2.0", "192.0.2.2"]
+
+
+def test_builder(state):
+    builder = BGPRouteTableBuilder()
+    assert builder.build() is None
+
+    first = _table("10.0.0.0/8", "192.0.2.0/24")
+    builder.add(first)
+    assert builder.build() is first
+
+    builder.add(_table("2001:db8::/32", "9.0.0.0/8", count=3))
+    last = _table("10.0.0.0/8", "100.64.0.0/10")
+    builder.add(last)
+    table = builder.build()
+    assert table.count == 7
+    assert [r.prefix for r in table.routes] == [
+        "9.0.0.0/8",
+        "10.0.0.0/8",
+        "10.0.0.0/8",
+        "100.64.0.0/10",
+        "192.0.2.0/24",
+        "2001:db8::/32",
+    ]
+    # Paths to the same prefix keep the order of the responses they came from.
+    assert table.routes[1] is first.routes[0]
+    assert table.routes[2] is last.routes[0]
+
+
+def test_add(state):
+    table = _table("10.0.0.0/8", "192.0.2.0/24") + _table("9.0.0.0/8", count=2)
+    assert table.count == 4
+    assert [r.prefix for r in table.routes] == ["9.0.0.0/8", "10.0.0.0/8", "192.0.2.0/24"]
@@ -0,0 +1,113 @@
+"""Test columnar route table representation & serialization."""
+
+# Standard Library
+import json
+
+# Third Party
+import pytest
+import msgspec
+
+# Project
+from hyperglass.state.codecs import get_codec
+
+# Local
+from ..data.columnar import RouteColumns
+from ..data.bgp_route import BGPRouteTable
+
+ROUTE = {
+    "active": True,
+    "age": 1025337,
+    "weight": 170,
+    "med": 0,
+    "local_preference": 175,
+    "source_rid": "141.101.72.1",
+    "peer_rid": "2.255.254.43",
+    "rpki_state": 1,
+}
+
+
+@pytest.fixture
+def table(state):
+    return BGPRouteTable(
+        vrf="default",
+        count=3,
+        winning_weight="high",
+        routes=[
+            {
+                **ROUTE,
+                "prefix": "1.1.1.0/24",
+                "as_path": [1299, 13335],
+                "communities": ["1299:35000", "14525:0"],
+                "next_hop": "62.115.189.136",
+                "source_as": 13335,
+            },
+            {
+                **ROUTE,
+                "prefix": "1.1.1.0/24",
+                "active": False,
+                "as_path": [174, 4294967295],
+                "communities": [],
+                "next_hop": "192.0.2.1",
+                "source_as": 4294967295,
+            },
+            {
+                **ROUTE,
+                "prefix": "2001:db8::/32",
+                "as_path": [],
+                "communities": ["14525:0"],
+                "next_hop": "62.115.189.136",
+                "source_as": 0,
+                "rpki_state": 3,
+            },
+        ],
+    )
+
+
+def test_export_dict(table):
+    columns = RouteColumns.from_table(table)
+    assert len(columns) == 3
+    assert columns.export_dict() == table.export_dict()
+    # Each distinct string is stored once.
+    assert columns.strings.count("14525:0") == 1
+    assert columns.strings.count("62.115.189.136") == 1
+
+
+def test_to_json(table):
+    columns = RouteColumns.from_table(table)
+    assert json.loads(columns.to_json()) == json.loads(table.export_json())
+
+
+def test_empty_table():
+    columns = RouteColumns.from_routes((), vrf="default", count=0, winning_weight="low")
+    assert bool(columns) is True
+    assert json.loads(columns.to_json()) == {
+        "vrf": "default",
+        "count": 0,
+        "routes": [],
+        "winning_weight": "low",
+    }
+
+
+@pytest.mark.parametrize("codec", ("pickle", "json", "msgpack"))
+def test_codec_round_trip(table, codec):
+    columns = RouteColumns.from_table(table)
+    decoded = get_codec(codec).decode(get_codec(codec).encode(columns))
+    assert RouteColumns.coerce(decoded) == columns
+
+
+def test_to_msgpack(table):
+    columns = RouteColumns.from_table(table)
+    data = msgspec.msgpack.decode(columns.to_msgpack(cached=False))
+    assert data["cached"] is False
+    source_as = data["output"]["columns"]["source_as"]
+    assert source_as["type"] == "uint32"
+    assert int.from_bytes(source_as["data"][4:8], "little") == 4294967295
+
+
+def test_to_arrow(table):
+    pa = pytest.importorskip("pyarrow")
+    columns = RouteColumns.from_table(table)
+    result = pa.ipc.open_stream(columns.to_arrow(cached=False)).read_all()
+    assert result.schema.metadata[b"cached"] == b"false"
+    assert result.schema.metadata[b"vrf"] == b"default"
+    assert result.to_pylist() == table.export_dict()["routes"]
@@ -0,0 +1,135 @@
+"""Test structured community filtering policy."""
+
+# Standard Library
+import re
+import pickle
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.config.params import Params
+from hyperglass.models.data.bgp_route import BGPRouteTable
+
+# Local
+from ..config.structured import Structured, CommunityPolicy, StructuredCommunities
+
+PATTERNS = (
+    "65000:1",
+    "^65000:2$",
+    "65000:3$",
+    "^65001:",
+    r"65002:\d+$",
+    r"(\d+):\1",
+    "(?i)rt:65003",
+    "65004:(100|200)",
+    "",
+)
+
+COMMUNITIES = (
+    "65000:1",
+    "65000:10",
+    "65000:2",
+    "65000:20",
+    "65000:3",
+    "65000:30",
+    "65001:1",
+    "65002:1",
+    "65002:1:2",
+    "65005:65005",
+    "65005:65006",
+    "RT:65003:1",
+    "65004:100",
+    "65004:300",
+    "65000:1:1",
+)
+
+
+def _reference(mode, patterns, community):
+    """Filter a community the way it was filtered before policies were compiled."""
+    matched = any(re.match(pattern, community) for pattern in patterns)
+    return matched if mode == "permit" else not matched
+
+
+@pytest.mark.parametrize("mode", ("permit", "deny"))
+@pytest.mark.parametrize(
+    "patterns", (PATTERNS, PATTERNS[:-1], PATTERNS[:5], PATTERNS[5:8], ()), ids=str
+)
+def test_policy_matches_reference(mode, patterns):
+    policy = CommunityPolicy(mode, patterns)
+    for community in COMMUNITIES:
+        assert policy.permits(community) is _reference(mode, patterns, community), community
+
+
+def test_policy_group_names():
+    # Group names may only be defined once per expression, so these aren't combined.
+    patterns = (r"(?P<asn>65000):\d+$", r"(?P<asn>65001):\d+$", r"(?P<a>\d+):(?P=a)$")
+    communities = StructuredCommunities(mode="permit", items=list(patterns))
+    for community in COMMUNITIES:
+        expected = _reference("permit", patterns, community)
+        assert communities.policy.permits(community) is expected, community
+
+
+def test_policy_apply():
+    policy = CommunityPolicy("deny", ("65000:1", "^65001:"))
+    assert policy.apply([["65000:1", "65000:2"], [], ["65001:1", "65000:10", "65002:1"]]) == [
+        ["65000:2"],
+        [],
+        ["65002:1"],
+    ]
+
+
+def test_policy_pickle():
+    communities = StructuredCommunities(mode="permit", items=list(PATTERNS))
+    loaded = pickle.loads(pickle.dumps(communities))  # noqa: S301
+    for community in COMMUNITIES:
+        assert loaded.policy.permits(community) is communities.policy.permits(community)
+
+
+def test_invalid_pattern():
+    with pytest.raises(ValueError):
+        StructuredCommunities(items=["65000:("])
+
+
+def test_table_filter():
+    state = use_state()
+    state.publish(
+        params=Params(structured={"communities": {"mode": "permit", "items": ["65000:"]}})
+    )
+    try:
+        route = {
+            "active": True,
+            "age": 0,
+            "weight": 0,
+            "med": 0,
+            "local_preference": 100,
+            "as_path": [65000],
+            "next_hop": "192.0.2.1",
+            "source_as": 65000,
+            "source_rid": "192.0.2.1",
+            "peer_rid": "192.0.2.1",
+            "rpki_state": 3,
+        }
+        table = BGPRouteTable(
+            vrf="default",
+            count=2,
+            winning_weight="low",
+            routes=[
+                {**route, "prefix": "198.51.100.0/24", "communities": ["65000:1", "65001:1"]},
+                {**route, "prefix": "192.0.2.0/24", "communities": ["65000:2"]},
+            ],
+        )
+    finally:
+        state.clear()
+
+    assert [r.communities for r in table.routes] == [["65000:2"], ["65000:1"]]
+
+
+def test_structured_digest():
+    structured = Structured(communities={"mode": "permit", "items": ["65000:1"]})
+    digest = structured.config_digest
+    loaded = pickle.loads(pickle.dumps(structured))  # noqa: S301
+    assert loaded.config_digest == digest
+    assert Structured(communities={"mode": "permit", "items": ["65000:1"]}).config_digest == digest
+    assert Structured(communities={"mode": "deny", "items": ["65000:1"]}).config_digest != digest
@@ -0,0 +1,62 @@
+"""Test device collection lookups."""
+
+# Standard Library
+import typing as t
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.directive import Directives
+from hyperglass.models.config.params import Params
+from hyperglass.models.config.devices import Devices
+
+DIRECTIVES = {
+    "juniper_bgp_route": {"name": "BGP Route", "field": {"description": "test"}},
+    "custom_ping": {"name": "Ping", "field": {"description": "test"}},
+}
+
+
+def _device(name: str, *directives: str) -> t.Dict[str, t.Any]:
+    return {
+        "name": name,
+        "address": "127.0.0.1",
+        "credential": {"username": "", "password": ""},
+        "platform": "juniper",
+        "directives": list(directives),
+    }
+
+
+@pytest.fixture
+def state():
+    _state = use_state()
+    with _state.cache.pipeline() as pipeline:
+        pipeline.set("params", Params())
+        pipeline.set("directives", Directives.new(DIRECTIVES))
+    yield _state
+    _state.clear()
+
+
+def test_devices_index(state):
+    devices = Devices(
+        _device("Router One", "juniper_bgp_route"),
+        _device("Router Two", "juniper_bgp_route", "custom_ping"),
+    )
+    one, two = devices
+    assert devices[one.id] is one
+    assert devices.get_by_name("Router Two") is two
+    assert devices.valid_id_or_name(one.id)
+    assert devices.valid_id_or_name("Router Two")
+    assert not devices.valid_id_or_name("Router Three")
+
+    assert devices.with_directive("juniper_bgp_route") == [one, two]
+    assert devices.with_directive("custom_ping") == [two]
+    assert devices.with_directive("missing") == []
+    assert devices.has_directives("missing", "custom_ping")
+    assert not devices.has_directives("missing")
+    assert two.has_directives("custom_ping")
+    assert not one.has_directives("custom_ping")
+
+    devices.add(*Devices(_device("Router Three", "custom_ping")))
+    assert [d.name for d in devices.with_directive("custom_ping")] == ["Router Two", "Router Three"]
@@ -0,0 +1,159 @@
+"""Test compiled directive rule evaluation."""
+
+# Standard Library
+import typing as t
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.exceptions.private import InputValidationError
+
+# Local
+from ..directive import Rule, Directive, IPRuleStage, PatternRuleStage, literal_prefix
+
+RULES = [
+    {"condition": "192.0.2.128/25", "action": "deny"},
+    {"condition": "192.0.2.0/24", "ge": 24, "le": 28, "command": "v4 narrow"},
+    {"condition": "10.0.0.0/8", "ge": 16, "le": 24, "command": "v4 private"},
+    {"condition": "2001:db8:1::/48", "action": "deny"},
+    {"condition": "2001:db8::/32", "le": 64, "command": "v6"},
+    {"condition": "^65000:", "action": "deny"},
+    {"condition": r"^\d+:\d+$", "command": "community"},
+    {"condition": "(?s)^large:.+", "command": "flags"},
+    {"condition": r"^(\w+)-\1$", "command": "reference"},
+    {"condition": "^[a-z]+$", "command": "word"},
+    {"condition": "Test-o", "command": "prefix"},
+    {"condition": "0.0.0.0/0", "le": 24, "command": "v4 default"},
+    {"condition": "::/0", "command": "v6 default"},
+    {"condition": "*", "command": "anything"},
+]
+
+TARGETS = (
+    "192.0.2.0/24",
+    "192.0.2.0/26",
+    "192.0.2.128/26",
+    "192.0.2.0/30",
+    "10.0.0.0/8",
+    "10.1.0.0/16",
+    "10.1.1.0/24",
+    "10.1.1.1",
+    "198.51.100.0/24",
+    "198.51.100.1",
+    "2001:db8:1::/64",
+    "2001:db8::/48",
+    "2001:db8::1",
+    "2001:db9::/32",
+    "65000:100",
+    "65001:100",
+    "large:1:2",
+    "LARGE:1:2",
+    "test-test",
+    "test-other",
+    "word",
+    "Word",
+    "192.0.2.1/24",
+    "",
+)
+
+
+def _reference(directive: Directive, target: t.Union[str, t.List[str]]) -> Rule:
+    """Validate a target the way it was validated before rules were compiled."""
+    for rule in directive.rules:
+        if rule.validate_target(target, multiple=directive.multiple) is True:
+            return rule
+    raise InputValidationError(error="No matched validation rules", target=target)
+
+
+def _outcome(func: t.Callable[[], t.Any]) -> t.Any:
+    try:
+        return func()
+    except InputValidationError as err:
+        return (str(err), err.kwargs)
+
+
+@pytest.mark.parametrize("rules", (RULES, RULES[5:] + RULES[:5], RULES[:-1]), ids=str)
+@pytest.mark.parametrize("target", TARGETS)
+def test_matches_reference(rules, target):
+    directive = Directive(id="test", name="Test", field={"description": "test"}, rules=rules)
+    expected = _outcome(lambda: _reference(directive, target))
+    assert _outcome(lambda: directive.validate_target(target)) == expected
+
+
+@pytest.mark.parametrize("multiple", (True, False))
+@pytest.mark.parametrize(
+    "target", (["65001:1", "65001:2"], ["65001:1", "65000:1"], ["65001:1", "word"], ["10.1.0.0/16"])
+)
+def test_list_matches_reference(multiple, target):
+    directive = Directive(
+        id="test", name="Test", field={"description": "test"}, rules=RULES, multiple=multiple
+    )
+    expected = _outcome(lambda: _reference(directive, target))
+    assert _outcome(lambda: directive.validate_target(target)) == expected
+
+
+def test_stages():
+    directive = Directive(id="test", name="Test", field={"description": "test"}, rules=RULES)
+    stages = directive._engine.stages
+    assert [type(stage).__name__ for stage in stages] == [
+        "IPRuleStage",
+        "PatternRuleStage",
+        "IPRuleStage",
+        "PatternRuleStage",
+    ]
+    assert stages[1].unprefixed == (1, 2, 3, 4)
+
+
+def test_ip_first_match():
+    rules = Directive.validate_rules(
+        [
+            {"condition": "10.0.0.0/8", "command": "first"},
+            {"condition": "10.1.0.0/16", "action": "deny"},
+        ]
+    )
+    stage = IPRuleStage(rules)
+    assert stage.match("10.1.0.0/24", multiple=False) is rules[0]
+    assert stage.match("11.0.0.0/8", multiple=False) is None
+    assert stage.match("2001:db8::/32", multiple=False) is None
+
+
+@pytest.mark.parametrize(
+    "pattern,prefix",
+    (
+        ("^65000:", "65000:"),
+        (r"^65000:\d+$", "65000:"),
+        ("65000:(1|2)", "65000:"),
+        ("65000:1|65001:1", ""),
+        ("65000:[|]", "65000:"),
+        (r"65000:\|1|2", ""),
+        ("65000:?", "65000"),
+        ("65000:{2}", "65000"),
+        ("65000:+", "65000:"),
+        ("Large:1", "large:1"),
+        ("Community", "commun"),
+        ("(?x) 65000", ""),
+        (".+", ""),
+    ),
+)
+def test_literal_prefix(pattern, prefix):
+    assert literal_prefix(pattern) == prefix
+
+
+def test_pattern_candidates():
+    rules = Directive.validate_rules(
+        [{"condition": "65000:1"}, {"condition": ".+"}, {"condition": "65000:"}, {"condition": "6"}]
+    )
+    stage = PatternRuleStage(rules)
+    assert list(stage.candidates("65000:100")) == [0, 1, 2, 3]
+    assert list(stage.candidates("65001:100")) == [1, 3]
+    assert list(stage.candidates("LARGE")) == [1]
+
+
+def test_templates():
+    (rule,) = Directive.validate_rules(
+        [{"condition": "*", "command": ["show route {target}", "ping {target} source {source4}"]}]
+    )
+    assert rule.templates == (
+        ("show route {target}", ("target",)),
+        ("ping {target} source {source4}", ("target", "source4")),
+    )
@@ -1,6 +1,7 @@
 """Test HyperglassMultiModel."""
 
 # Third Party
+import pytest
 from pydantic import BaseModel
 
 # Local
@@ -46,3 +47,17 @@ def test_multi_model():
     model.add(*ITEMS_3, unique_by="id")
     assert model.count == 6
     assert model["item1"].name == "Item New One"
+
+
+def test_multi_model_index():
+    model = Items(*ITEMS_1)
+    assert model.get("item2").name == "Item Two"
+    assert model.get("missing") is None
+    assert model.get_by_name("Item Three").id == "item3"
+    with pytest.raises(IndexError):
+        model["missing"]
+
+    model.add(*ITEMS_3, unique_by="id")
+    assert model.get("item6").name == "Item Six"
+    assert model.get_by_name("Item New One") is model["item1"]
+    assert model.get_by_name("Item One") is None
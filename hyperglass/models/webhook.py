@@ -58,12 +58,21 @@ class Webhook(HyperglassModel):
     timestamp: datetime
 
     @model_validator(mode="before")
-    def validate_webhook(cls, model: "Webhook") -> "Webhook":
+    def validate_webhook(cls, model: t.Dict[str, t.Any]) -> t.Dict[str, t.Any]:
         """Reset network attributes if the source is localhost."""
-        if model.source in ("127.0.0.1", "::1"):
-            model.network = {}
+        if model.get("source") in ("127.0.0.1", "::1"):
+            model = {**model, "network": {}}
         return model
 
+    def summary(self, code: t.Callable[[t.Any], str] = str) -> str:
+        """Summarize the query & its source on one line, for digests."""
+        time_fmt = self.timestamp.strftime("%H:%M:%S")
+        return (
+            f"{time_fmt} {self.query_type} {code(self.query_target)} at {self.query_location}, "
+            f"from {code(self.source)} (AS{self.network.asn} {self.network.org}, "
+            f"{self.network.country})"
+        )
+
     def msteams(self) -> t.Dict[str, t.Any]:
         """Format the webhook data as a Microsoft Teams card."""
 
@@ -160,3 +169,74 @@ class Webhook(HyperglassModel):
         }
         log.bind(type="Slack", payload=str(payload)).debug("Created webhook")
         return payload
+
+
+class WebhookDigest(HyperglassModel):
+    """Several webhooks, combined into a single message."""
+
+    webhooks: t.List[Webhook]
+
+    def _title(self) -> str:
+        return f"hyperglass received {len(self.webhooks)} valid queries"
+
+    def _period(self) -> str:
+        timestamps = [webhook.timestamp for webhook in self.webhooks]
+        time_fmt = "%Y %m %d %H:%M:%S"
+        return f"{min(timestamps).strftime(time_fmt)} - {max(timestamps).strftime(time_fmt)} UTC"
+
+    def export_dict(self, *args, **kwargs) -> t.Dict[str, t.Any]:
+        """Format the digest for a generic HTTP endpoint."""
+        webhooks = [webhook.export_dict(*args, **kwargs) for webhook in self.webhooks]
+        return {"count": len(webhooks), "queries": webhooks}
+
+    def msteams(self) -> t.Dict[str, t.Any]:
+        """Format the digest as a Microsoft Teams card."""
+
+        def code(value: t.Any) -> str:
+            return f"`{str(value)}`"
+
+        payload = {
+            "@type": "MessageCard",
+            "@context": "http://schema.org/extensions",
+            "themeColor": "118ab2",
+            "summary": self._title(),
+            "sections": [
+                {
+                    "activityTitle": self._title(),
+                    "activitySubtitle": self._period(),
+                    "activityImage": _ICON_URL,
+                },
+                {
+                    "markdown": True,
+                    "text": "\n\n".join(webhook.summary(code) for webhook in self.webhooks),
+                },
+            ],
+        }
+        log.bind(type="MS Teams", payload=str(payload)).debug("Created webhook digest")
+        return payload
+
+    def slack(self) -> t.Dict[str, t.Any]:
+        """Format the digest as a Slack message."""
+
+        def code(value: t.Any) -> str:
+            return f"`{value}`"
+
+        lines = [webhook.summary(code) for webhook in self.webhooks]
+        # Slack limits the length of each section's text, so every 10 queries get a section.
+        sections = [
+            {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines[i : i + 10])}}
+            for i in range(0, len(lines), 10)
+        ]
+        payload = {
+            "text": self._title(),
+            "blocks": [
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": f"*{self._title()}*\n{self._period()}"},
+                },
+                {"type": "divider"},
+                *sections,
+            ],
+        }
+        log.bind(type="Slack", payload=str(payload)).debug("Created webhook digest")
+        return payload
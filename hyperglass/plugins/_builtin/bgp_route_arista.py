@@ -10,6 +10,7 @@ from pydantic import PrivateAttr, ValidationError
 # Project
 from hyperglass.log import log
 from hyperglass.exceptions.private import ParsingError
+from hyperglass.models.data.bgp_route import BGPRouteTableBuilder
 from hyperglass.models.parsing.arista_eos import AristaBGPTable
 
 # Local
@@ -26,7 +27,7 @@ if t.TYPE_CHECKING:
 
 def parse_arista(output: t.Sequence[str]) -> "OutputDataModel":
     """Parse a Arista BGP JSON response."""
-    result = None
+    builder = BGPRouteTableBuilder()
 
     _log = log.bind(plugin=BGPRoutePluginArista.__name__)
 
@@ -40,12 +41,7 @@ def parse_arista(output: t.Sequence[str]) -> "OutputDataModel":
             routes = parsed["vrfs"][vrf]
 
             validated = AristaBGPTable(**routes)
-            bgp_table = validated.bgp_table()
-
-            if result is None:
-                result = bgp_table
-            else:
-                result += bgp_table
+            builder.add(validated.bgp_table())
 
         except json.JSONDecodeError as err:
             _log.bind(error=str(err)).critical("Failed to decode JSON")
@@ -63,7 +59,7 @@ def parse_arista(output: t.Sequence[str]) -> "OutputDataModel":
             _log.critical(err)
             raise ParsingError(err.errors()) from err
 
-    return result
+    return builder.build()
 
 
 class BGPRoutePluginArista(OutputPlugin):
@@ -2,24 +2,23 @@
 
 # Standard Library
 import re
-from typing import TYPE_CHECKING, List, Sequence, Generator
+from typing import TYPE_CHECKING, List, Tuple, Iterator, Optional, Sequence
+from functools import lru_cache
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
 
 # Third Party
-import xmltodict  # type: ignore
 from pydantic import PrivateAttr, ValidationError
 
 # Project
 from hyperglass.log import log
 from hyperglass.exceptions.private import ParsingError
-from hyperglass.models.parsing.juniper import JuniperBGPTable
+from hyperglass.models.data.bgp_route import BGPRoute, BGPRouteTable, BGPRouteTableBuilder
+from hyperglass.models.parsing.juniper import RPKI_STATE_MAP
 
 # Local
 from .._output import OutputPlugin
 
 if TYPE_CHECKING:
-    # Standard Library
-    from collections import OrderedDict
-
     # Project
     from hyperglass.models.data import OutputDataModel
     from hyperglass.models.api.query import Query
@@ -28,94 +27,183 @@ if TYPE_CHECKING:
     from .._output import OutputType
 
 
-REMOVE_PATTERNS = (
-    # The XML response can a CLI banner appended to the end of the XML
-    # string. For example:
-    # ```
-    # <rpc-reply>
-    # ...
-    # <cli>
-    #   <banner>{master}</banner>
-    # </cli>
-    # </rpc-reply>
-    #
-    # {master} noqa: E800
-    # ```
-    #
-    # This pattern will remove anything inside braces, including the braces.
-    r"\{.+\}",
-)
-
-
-def clean_xml_output(output: str) -> str:
-    """Remove Juniper-specific patterns from output."""
-
-    def scrub(lines: List[str]) -> Generator[str, None, None]:
-        """Clean & remove each pattern from each line."""
-        for pattern in REMOVE_PATTERNS:
-            for line in lines:
-                # Remove the pattern & strip extra newlines
-                scrubbed = re.sub(pattern, "", line.strip())
-                # Only return non-empty and non-newline lines
-                if scrubbed and scrubbed != "\n":
-                    yield scrubbed
-
-    lines = scrub(output.splitlines())
-
-    return "\n".join(lines)
-
-
-def parse_juniper(output: Sequence[str]) -> "OutputDataModel":  # noqa: C901
+# The XML response can have a CLI banner, such as `{master}`, appended to the end of the XML
+# string. This pattern removes anything inside braces, including the braces.
+REMOVE_PATTERN = re.compile(r"\{.+\}")
+
+# Number of characters of a response fed to the XML parser at once.
+CHUNK_SIZE = 65536
+
+# Elements handled as soon as they complete.
+HANDLED_TAGS = ("rt", "table-name", "route-table", "error")
+
+# Origin flags at the end of the AS_PATH.
+AS_PATH_FLAGS = ("E", "I", "?")
+
+
+def _local_name(name: str) -> str:
+    """Remove the namespace from an element or attribute name."""
+    return name[name.rfind("}") + 1 :]
+
+
+@lru_cache(maxsize=None)
+def _path(namespace: str, path: str) -> str:
+    """Prefix each element name in an element path with a `{uri}` namespace."""
+    return "/".join(namespace + name for name in path.split("/"))
+
+
+def _text(element: Optional[Element]) -> Optional[str]:
+    """Get an element's stripped text, or `None` if it's missing or empty."""
+    if element is None or element.text is None:
+        return None
+    text = element.text
+    if "{" in text:
+        text = REMOVE_PATTERN.sub("", text)
+    return text.strip() or None
+
+
+def _int(element: Optional[Element], default: Optional[int] = None) -> int:
+    """Get an element's text as an integer."""
+    text = _text(element)
+    if text is None:
+        if default is None:
+            raise ValueError("Missing required value")
+        return default
+    return int(text)
+
+
+def _next_hop(entry: Element, ns: str) -> str:
+    """Get the selected next hop, or the first next hop with an address."""
+    # Indirect next hops take precedence over router next hops.
+    for hop in entry.findall(_path(ns, "protocol-nh")) or entry.findall(_path(ns, "nh")):
+        if hop.find(_path(ns, "selected-next-hop")) is not None:
+            return _text(hop.find(_path(ns, "to"))) or ""
+        to = _text(hop.find(_path(ns, "to")))
+        if to is not None:
+            return to
+    return ""
+
+
+def _route(prefix: str, entry: Element, ns: str) -> BGPRoute:
+    """Convert an `<rt-entry>` element to a standard BGP route."""
+    age = entry.find(_path(ns, "age"))
+    if age is not None and age.attrib:
+        seconds = (v for k, v in age.attrib.items() if _local_name(k) == "seconds")
+        age_seconds = int(next(seconds, 0))
+    else:
+        age_seconds = _int(age)
+
+    as_path = entry.find(_path(ns, "bgp-path-attributes/attr-as-path-effective/attr-value"))
+    aggregator = entry.find(_path(ns, "bgp-path-attributes/attr-aggregator/attr-value"))
+    if aggregator is None:
+        source_as, source_rid = 0, ""
+    else:
+        source_as = _int(aggregator.find(_path(ns, "aggr-as-number")), 0)
+        source_rid = _text(aggregator.find(_path(ns, "aggr-router-id"))) or ""
+
+    return BGPRoute(
+        prefix=prefix,
+        active=_text(entry.find(_path(ns, "active-tag"))) == "*",
+        age=age_seconds,
+        weight=_int(entry.find(_path(ns, "preference"))),
+        med=_int(entry.find(_path(ns, "metric")), 0),
+        local_preference=_int(entry.find(_path(ns, "local-preference"))),
+        as_path=[int(asn) for asn in (_text(as_path) or "").split() if asn not in AS_PATH_FLAGS],
+        communities=[_text(c) for c in entry.findall(_path(ns, "communities/community"))],
+        next_hop=_next_hop(entry, ns),
+        source_as=source_as,
+        source_rid=source_rid,
+        peer_rid=_text(entry.find(_path(ns, "peer-id"))) or "",
+        rpki_state=RPKI_STATE_MAP.get(_text(entry.find(_path(ns, "validation-state"))), 3),
+    )
+
+
+def _routes(rt: Element) -> Tuple[int, List[BGPRoute]]:
+    """Convert an `<rt>` element to its entry count & standard BGP routes."""
+    # Child elements are in the same namespace as the `<rt>` element.
+    ns = rt.tag[: rt.tag.rfind("}") + 1]
+    destination = _text(rt.find(_path(ns, "rt-destination")))
+    prefix = "{}/{}".format(destination, _int(rt.find(_path(ns, "rt-prefix-length"))))
+    count = _int(rt.find(_path(ns, "rt-entry-count")))
+    return count, [_route(prefix, entry, ns) for entry in rt.findall(_path(ns, "rt-entry"))]
+
+
+def _vrf(table_name: str) -> str:
+    """Get the VRF name from a table name, e.g. `inet.0` or `customer.inet.0`."""
+    parts = table_name.split(".")
+    if len(parts) == 2:
+        return "default"
+    return parts[0]
+
+
+def iter_tables(response: str) -> Iterator[BGPRouteTable]:  # noqa: C901
+    """Parse each route table in a Juniper XML response, incrementally.
+
+    Routes are converted as each `<rt>` element completes, after which the element is discarded,
+    so the parsed XML tree never holds more than one destination's routes.
+    """
+    # Skip anything before or after the XML document, such as a CLI banner.
+    start, end = response.find("<"), response.rfind(">") + 1
+    parser = XMLPullParser(events=("start", "end"))
+    parents: List[Element] = []
+    table_name, count, routes = "", 0, []
+
+    for offset in range(max(start, 0), end, CHUNK_SIZE):
+        parser.feed(response[offset : min(offset + CHUNK_SIZE, end)])
+        for event, element in parser.read_events():
+            if event == "start":
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if not element.tag.endswith(HANDLED_TAGS):
+                continue
+            tag = _local_name(element.tag)
+            if tag == "rt":
+                rt_count, rt_routes = _routes(element)
+                count += rt_count
+                routes.extend(rt_routes)
+                parents[-1].remove(element)
+            elif tag == "table-name":
+                table_name = _text(element) or ""
+            elif tag == "route-table":
+                if routes:
+                    yield BGPRouteTable(
+                        vrf=_vrf(table_name), count=count, routes=routes, winning_weight="low"
+                    )
+                table_name, count, routes = "", 0, []
+                parents[-1].remove(element)
+            elif tag == "error" and len(parents) == 1:
+                message = _text(element.find("{*}message"))
+                if message is not None:
+                    raise ParsingError('Error from device: "{error}"', error=message)
+    parser.close()
+
+
+def parse_juniper(output: Sequence[str]) -> "OutputDataModel":
     """Parse a Juniper BGP XML response."""
-    result = None
+    builder = BGPRouteTableBuilder()
 
     _log = log.bind(plugin=BGPRoutePluginJuniper.__name__)
     for response in output:
-        cleaned = clean_xml_output(response)
-
         try:
-            parsed: "OrderedDict" = xmltodict.parse(
-                cleaned, force_list=("rt", "rt-entry", "community")
-            )
-            _log.debug("Pre-parsed data", data=parsed)
-
-            if "rpc-reply" in parsed.keys():
-                if "xnm:error" in parsed["rpc-reply"]:
-                    if "message" in parsed["rpc-reply"]["xnm:error"]:
-                        err = parsed["rpc-reply"]["xnm:error"]["message"]
-                        raise ParsingError('Error from device: "{}"', err)
+            for bgp_table in iter_tables(response):
+                builder.add(bgp_table)
 
-                parsed_base = parsed["rpc-reply"]["route-information"]
-            elif "route-information" in parsed.keys():
-                parsed_base = parsed["route-information"]
-
-            if "route-table" not in parsed_base:
-                return result
-
-            if "rt" not in parsed_base["route-table"]:
-                return result
-
-            parsed = parsed_base["route-table"]
-            validated = JuniperBGPTable(**parsed)
-            bgp_table = validated.bgp_table()
-
-            if result is None:
-                result = bgp_table
-            else:
-                result += bgp_table
-
-        except xmltodict.expat.ExpatError as err:
+        except ParseError as err:
             _log.bind(error=str(err)).critical("Failed to decode XML")
             raise ParsingError("Error parsing response data") from err
 
-        except KeyError as err:
-            _log.bind(key=str(err)).critical("Missing required key in response")
-            raise ParsingError("{key} was not found in the response", key=str(err)) from err
-
-        except ValidationError as err:
-            _log.critical(err)
-            raise ParsingError(err) from err
+        except (TypeError, ValueError) as err:
+            if isinstance(err, ValidationError):
+                _log.critical(err)
+                raise ParsingError(err) from err
+            _log.bind(error=str(err)).critical("Invalid value in response")
+            raise ParsingError("Error parsing response data") from err
 
+    result = builder.build()
+    if result is not None:
+        log.bind(platform="juniper", routes=len(result.routes)).debug("Serialized response")
     return result
 
 
@@ -20,6 +20,48 @@ if t.TYPE_CHECKING:
     from hyperglass.models.api.query import Query
 
 PluginT = t.TypeVar("PluginT", bound=HyperglassPlugin)
+RouteKey = t.Tuple[t.Any, ...]
+
+
+class PluginPipeline(t.Generic[PluginT]):
+    """Immutable, ordered plugins of a single type.
+
+    Built once per state generation. Per-query plugin selections are memoized by route key
+    (e.g. platform & directive ID), so selecting plugins on the request path is a dict lookup.
+    """
+
+    generation: int
+    plugins: t.Tuple[PluginT, ...]
+
+    def __init__(self, plugins: t.Sequence[PluginT], *, generation: int) -> None:
+        """Sort plugins by name, with built-in plugins last."""
+        self.generation = generation
+        # Sort plugins by their name attribute, which is the name of the class by default.
+        sorted_by_name = sorted(plugins, key=lambda p: str(p))
+        # Sort with built-in plugins last.
+        self.plugins = tuple(
+            sorted(sorted_by_name, key=lambda p: -1 if p._hyperglass_builtin else 1, reverse=True)
+        )
+        self._routes: t.Dict[RouteKey, t.Tuple[PluginT, ...]] = {}
+
+    def __repr__(self) -> str:
+        """Represent pipeline by generation & plugin names."""
+        return "PluginPipeline(generation={!r}, plugins={!r})".format(
+            self.generation, tuple(str(p) for p in self.plugins)
+        )
+
+    def route(
+        self,
+        key: RouteKey,
+        select: t.Callable[[t.Tuple[PluginT, ...]], t.Iterable[PluginT]],
+    ) -> t.Tuple[PluginT, ...]:
+        """Get plugins applicable to `key`, selecting them with `select` on first use."""
+        try:
+            return self._routes[key]
+        except KeyError:
+            selected = tuple(select(self.plugins))
+            self._routes[key] = selected
+            return selected
 
 
 class PluginManager(t.Generic[PluginT]):
@@ -27,8 +69,8 @@ class PluginManager(t.Generic[PluginT]):
 
     _type: PluginType
     _state: "HyperglassState"
-    _index: int = 0
     _cache_key: str
+    _pipelines: t.ClassVar[t.Dict[PluginType, PluginPipeline]] = {}
 
     def __init__(self: "PluginManager") -> None:
         """Initialize plugin manager."""
@@ -43,35 +85,26 @@ class PluginManager(t.Generic[PluginT]):
         cls._type = _type
         return super().__init_subclass__()
 
-    def __iter__(self: "PluginManager") -> "PluginManager":
+    def __iter__(self: "PluginManager") -> t.Iterator[PluginT]:
         """Plugin manager iterator."""
-        return self
-
-    def __next__(self: "PluginManager") -> PluginT:
-        """Plugin manager iteration."""
-        if self._index <= len(self.plugins()):
-            result = self.plugins()[self._index - 1]
-            self._index += 1
-            return result
-        self._index = 0
-        raise StopIteration
+        return iter(self.pipeline().plugins)
+
+    def pipeline(self: "PluginManager") -> PluginPipeline[PluginT]:
+        """Get the plugin pipeline for this manager's type, rebuilding it if state has changed."""
+        generation = self._state.snapshot.generation
+        pipeline = self._pipelines.get(self._type)
+        if pipeline is None or pipeline.generation != generation:
+            pipeline = PluginPipeline(self._state.plugins(self._type), generation=generation)
+            self._pipelines[self._type] = pipeline
+            log.bind(type=self._type, generation=generation).debug("Built plugin pipeline")
+        return pipeline
 
     def plugins(self: "PluginManager", *, builtins: bool = True) -> t.List[PluginT]:
         """Get all plugins, with built-in plugins last."""
-        plugins = self._state.plugins(self._type)
-
+        plugins = self.pipeline().plugins
         if builtins is False:
-            plugins = [p for p in plugins if p._hyperglass_builtin is False]
-
-        # Sort plugins by their name attribute, which is the name of the class by default.
-        sorted_by_name = sorted(plugins, key=lambda p: str(p))
-
-        # Sort with built-in plugins last.
-        return sorted(
-            sorted_by_name,
-            key=lambda p: -1 if p._hyperglass_builtin else 1,
-            reverse=True,
-        )
+            return [p for p in plugins if p._hyperglass_builtin is False]
+        return list(plugins)
 
     @property
     def name(self: PluginT) -> str:
@@ -92,7 +125,6 @@ class PluginManager(t.Generic[PluginT]):
 
     def reset(self: "PluginManager") -> None:
         """Remove all plugins."""
-        self._index = 0
         self._state.reset_plugins(self._type)
 
     def unregister(self: "PluginManager", plugin: PluginT) -> None:
@@ -129,16 +161,20 @@ class PluginManager(t.Generic[PluginT]):
 class InputPluginManager(PluginManager[InputPlugin], type="input"):
     """Manage Input Validation Plugins."""
 
-    def _gather_plugins(
-        self: "InputPluginManager", query: "Query"
-    ) -> t.Generator[InputPlugin, None, None]:
-        for plugin in self.plugins(builtins=True):
-            if plugin.directives and query.directive.id in plugin.directives:
-                yield plugin
-            if plugin.ref in query.directive.plugins:
-                yield plugin
-            if plugin.common is True:
-                yield plugin
+    def _gather_plugins(self: "InputPluginManager", query: "Query") -> t.Tuple[InputPlugin, ...]:
+        directive = query.directive
+
+        def select(plugins: t.Tuple[InputPlugin, ...]) -> t.Generator[InputPlugin, None, None]:
+            for plugin in plugins:
+                if plugin.directives and directive.id in plugin.directives:
+                    yield plugin
+                if plugin.ref in directive.plugins:
+                    yield plugin
+                if plugin.common is True:
+                    yield plugin
+
+        key = (query.device.platform, directive.id, tuple(directive.plugins))
+        return self.pipeline().route(key, select)
 
     def validate(self: "InputPluginManager", query: "Query") -> InputPluginValidationReturn:
         """Execute all input validation plugins.
@@ -176,13 +212,19 @@ class OutputPluginManager(PluginManager[OutputPlugin], type="output"):
         The result of each plugin is passed to the next plugin.
         """
         result = output
-        directives = (
-            plugin
-            for plugin in self.plugins()
-            if query.directive.id in plugin.directives and query.device.platform in plugin.platforms
-        )
-        common = (plugin for plugin in self.plugins() if plugin.common is True)
-        for plugin in (*directives, *common):
+        platform = query.device.platform
+        directive_id = query.directive.id
+
+        def select(plugins: t.Tuple[OutputPlugin, ...]) -> t.Tuple[OutputPlugin, ...]:
+            directives = (
+                plugin
+                for plugin in plugins
+                if directive_id in plugin.directives and platform in plugin.platforms
+            )
+            common = (plugin for plugin in plugins if plugin.common is True)
+            return (*directives, *common)
+
+        for plugin in self.pipeline().route((platform, directive_id), select):
             log.bind(plugin=plugin.name, value=result).debug("Output Plugin Starting Value")
             result = plugin.process(output=result, query=query)
             log.bind(plugin=plugin.name, value=result).debug("Output Plugin Ending Value")
@@ -1,7 +1,26 @@
+# Standard Library
+import re
+
+# Third Party
+import xmltodict
+
 # Project
+from hyperglass.models.data import BGPRouteTable
 from hyperglass.models.config.devices import Device
+from hyperglass.models.parsing.juniper import JuniperBGPTable
 
 
 class MockDevice(Device):
     def has_directives(self, *_: str) -> bool:
         return True
+
+
+def reference_juniper(sample: str) -> BGPRouteTable:
+    """Parse a Juniper XML response the way it was parsed before parsing was incremental."""
+    cleaned = "\n".join(
+        line
+        for line in (re.sub(r"\{.+\}", "", line.strip()) for line in sample.splitlines())
+        if line
+    )
+    parsed = xmltodict.parse(cleaned, force_list=("rt", "rt-entry", "community"))
+    return JuniperBGPTable(**parsed["rpc-reply"]["route-information"]["route-table"]).bgp_table()
@@ -0,0 +1,91 @@
+"""Benchmark time & peak memory of parsing large Juniper XML route tables.
+
+Compares incremental parsing with the previous approach of building the full tree with
+xmltodict & validating it through the Juniper parsing models. Requires a running Redis
+instance. Run with:
+
+    python3 -m hyperglass.plugins.tests.bench_juniper
+"""
+
+# Standard Library
+import re
+import time
+import typing as t
+import resource
+import multiprocessing
+from pathlib import Path
+
+# Third Party
+import psutil
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.models.config.params import Params
+
+# Local
+from ._fixtures import reference_juniper
+from .._builtin.bgp_route_juniper import parse_juniper
+
+ROUTE_COUNTS = (1_000, 10_000, 100_000)
+
+SAMPLE = Path(__file__).parent.parent.parent.parent / ".samples" / "juniper_route_direct.xml"
+
+
+def _response(count: int) -> str:
+    """Build a response with `count` routes, by repeating the sample's routes."""
+    sample = SAMPLE.read_text()
+    start, end = sample.index("<rt "), sample.rindex("</rt>") + len("</rt>")
+    rt = sample[start:end]
+    entries = rt.count("<rt-entry>")
+    routes = []
+    for i in range(count // entries):
+        destination = f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+        routes.append(re.sub(r"1\.1\.1\.0", destination, rt, count=1))
+    return sample[:start] + "".join(routes) + sample[end:] + "\n{master}\n"
+
+
+def _run(func: t.Callable[[str], t.Any], response: str, results: "multiprocessing.Queue") -> None:
+    """Parse a response & report the duration in seconds & peak memory growth in MiB."""
+    baseline = psutil.Process().memory_info().rss
+    start = time.perf_counter()
+    func(response)
+    duration = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    results.put((duration, (peak - baseline) / 1024 / 1024))
+
+
+def _measure(func: t.Callable[[str], t.Any], response: str) -> t.Tuple[float, float]:
+    """Parse a response in a new process, so that each measures its own peak memory."""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_run, args=(func, response, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def _parse(response: str) -> t.Any:
+    return parse_juniper((response,))
+
+
+def main() -> None:
+    """Compare incremental & full-tree parsing on route tables of increasing size."""
+    state = use_state()
+    state.publish(params=Params())
+    try:
+        for count in ROUTE_COUNTS:
+            response = _response(count)
+            print(f"routes: {count} ({len(response) / 1024 / 1024:.1f} MiB of XML)")
+            for name, func in (
+                ("xmltodict", reference_juniper),
+                ("incremental", _parse),
+            ):
+                duration, peak = _measure(func, response)
+                print(f"  {name:<12} {duration:>8.2f} s  peak {peak:>8.1f} MiB")
+    finally:
+        state.clear()
+
+
+if __name__ == "__main__":
+    main()
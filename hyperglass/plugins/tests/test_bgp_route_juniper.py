@@ -8,11 +8,12 @@ from pathlib import Path
 import pytest
 
 # Project
+from hyperglass.exceptions.private import ParsingError
 from hyperglass.models.data.bgp_route import BGPRouteTable
 
 # Local
-from ._fixtures import MockDevice
-from .._builtin.bgp_route_juniper import BGPRoutePluginJuniper
+from ._fixtures import MockDevice, reference_juniper
+from .._builtin.bgp_route_juniper import BGPRoutePluginJuniper, parse_juniper
 
 DEPENDS_KWARGS = {
     "depends": [
@@ -68,3 +69,32 @@ def test_juniper_bgp_route_aspath():
     with AS_PATH.open("r") as file:
         sample = file.read()
     return _tester(sample)
+
+
+@pytest.mark.parametrize("sample", (DIRECT, INDIRECT, AS_PATH), ids=lambda p: p.stem)
+def test_juniper_matches_reference(state, sample):
+    text = sample.read_text()
+    assert parse_juniper((text,)).export_dict() == reference_juniper(text).export_dict()
+
+
+def test_juniper_multiple_responses(state):
+    direct, indirect = DIRECT.read_text(), INDIRECT.read_text()
+    result = parse_juniper((direct, indirect))
+    expected = reference_juniper(direct) + reference_juniper(indirect)
+    assert result.export_dict() == expected.export_dict()
+
+
+def test_juniper_device_error(state):
+    sample = """<rpc-reply xmlns:junos="http://xml.juniper.net/junos/18.2R3/junos">
+<xnm:error xmlns="http://xml.juniper.net/xnm/1.1/xnm" xmlns:xnm="http://xml.juniper.net/xnm/1.1/xnm">
+<message>syntax error</message>
+</xnm:error>
+</rpc-reply>
+{master}"""
+    with pytest.raises(ParsingError, match="syntax error"):
+        parse_juniper((sample,))
+
+
+def test_juniper_invalid_xml(state):
+    with pytest.raises(ParsingError):
+        parse_juniper(("<rpc-reply><route-information>",))
@@ -0,0 +1,110 @@
+"""Test plugin manager dispatch."""
+
+# Standard Library
+import typing as t
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.state import use_state
+
+# Local
+from .._output import OutputPlugin
+from .._manager import OutputPluginManager
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.state import HyperglassState
+
+
+class AppendDirective(OutputPlugin):
+    """Append a value for a specific platform & directive."""
+
+    platforms: t.Sequence[str] = ("juniper",)
+    directives: t.Sequence[str] = ("test_directive",)
+
+    def process(self, *, output, query):  # noqa: D102
+        return (*output, "directive")
+
+
+class AppendCommon(OutputPlugin):
+    """Append a value for all queries."""
+
+    common: bool = True
+
+    def process(self, *, output, query):  # noqa: D102
+        return (*output, "common")
+
+
+class AppendOther(OutputPlugin):
+    """Append a value for a different platform."""
+
+    platforms: t.Sequence[str] = ("arista_eos",)
+    directives: t.Sequence[str] = ("test_directive",)
+
+    def process(self, *, output, query):  # noqa: D102
+        return (*output, "other")
+
+
+class AppendLate(OutputPlugin):
+    """Append a value for all queries, registered after the pipeline is built."""
+
+    common: bool = True
+
+    def process(self, *, output, query):  # noqa: D102
+        return (*output, "late")
+
+
+def _query(platform: str, directive_id: str) -> t.Any:
+    device = type("Device", (), {"platform": platform})
+    directive = type("Directive", (), {"id": directive_id})
+    return type("Query", (), {"device": device, "directive": directive})
+
+
+@pytest.fixture
+def state() -> t.Generator["HyperglassState", None, None]:
+    _state = use_state()
+    manager = OutputPluginManager()
+    manager.reset()
+    for plugin in (AppendCommon, AppendDirective, AppendOther):
+        manager.register(plugin)
+    yield _state
+    manager.reset()
+
+
+def test_output_plugin_routing(state):
+    manager = OutputPluginManager()
+    result = manager.execute(output=(), query=_query("juniper", "test_directive"))
+    assert result == ("directive", "common")
+    result = manager.execute(output=(), query=_query("arista_eos", "test_directive"))
+    assert result == ("other", "common")
+    result = manager.execute(output=(), query=_query("juniper", "other_directive"))
+    assert result == ("common",)
+
+
+def test_output_plugin_no_redis_access(state, monkeypatch):
+    manager = OutputPluginManager()
+    query = _query("juniper", "test_directive")
+    manager.execute(output=(), query=query)
+    calls = []
+
+    def counting_get(*args, **kwargs):
+        calls.append(args)
+        raise AssertionError("Plugins should not be loaded from Redis on every execution")
+
+    monkeypatch.setattr(state.redis, "get", counting_get)
+    for _ in range(5):
+        assert manager.execute(output=(), query=query) == ("directive", "common")
+        assert [str(p) for p in manager] == ["AppendCommon", "AppendDirective", "AppendOther"]
+    assert len(calls) == 0
+
+
+def test_output_plugin_registration_rebuilds(state):
+    manager = OutputPluginManager()
+    before = manager.pipeline()
+    manager.register(AppendLate)
+    after = manager.pipeline()
+    assert after.generation != before.generation
+    result = manager.execute(output=(), query=_query("juniper", "test_directive"))
+    assert result == ("directive", "common", "late")
@@ -0,0 +1,207 @@
+"""Serialization of values stored in Redis."""
+
+# Standard Library
+import zlib
+import pickle
+import typing as t
+from functools import lru_cache
+
+__all__ = (
+    "Codec",
+    "CodecError",
+    "CompressedCodec",
+    "JSONCodec",
+    "MsgPackCodec",
+    "PickleCodec",
+    "get_codec",
+)
+
+CodecName = t.Literal["pickle", "json", "msgpack"]
+CompressionName = t.Literal["zlib", "brotli", "zstd"]
+
+# Prefixes of values stored by a compressed codec, identifying whether the value is compressed.
+RAW = b"\x00"
+COMPRESSED = b"\x01"
+
+
+class CodecError(ValueError):
+    """Raised when a stored value can't be decoded by a codec."""
+
+
+def _enc_hook(value: t.Any) -> t.Any:
+    """Encode objects with a JSON-compatible representation, such as columnar route tables."""
+    to_builtins = getattr(value, "to_builtins", None)
+    if to_builtins is None:
+        raise NotImplementedError(f"Objects of type {type(value).__name__} are not supported")
+    return to_builtins()
+
+
+class Codec:
+    """Encode values for storage in Redis & decode them again."""
+
+    name: t.ClassVar[str]
+
+    def __repr__(self) -> str:
+        """Represent codec by name."""
+        return "{}()".format(type(self).__name__)
+
+    def dumps(self, value: t.Any) -> bytes:
+        """Serialize a value."""
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> t.Any:
+        """Deserialize a value."""
+        raise NotImplementedError
+
+    def encode(self, value: t.Any) -> bytes:
+        """Encode a value for storage."""
+        return self.dumps(value)
+
+    def decode(self, data: bytes) -> t.Any:
+        """Decode a stored value, raising `CodecError` if it wasn't encoded by this codec."""
+        try:
+            return self.loads(data)
+        except Exception as err:
+            raise CodecError(f"Unable to decode value with {self!r}: {err!s}") from err
+
+
+class PickleCodec(Codec):
+    """Serialize any Python object with pickle.
+
+    Only use with a Redis instance that is trusted, since unpickling a value can execute
+    arbitrary code.
+    """
+
+    name = "pickle"
+
+    def dumps(self, value: t.Any) -> bytes:
+        """Serialize a value with pickle."""
+        return pickle.dumps(value)
+
+    def loads(self, data: bytes) -> t.Any:
+        """Deserialize a value with pickle."""
+        return pickle.loads(data)  # noqa
+
+
+class JSONCodec(Codec):
+    """Serialize JSON-compatible values as JSON."""
+
+    name = "json"
+
+    def __init__(self) -> None:
+        """Create reusable encoder & decoder."""
+        # Third Party
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, value: t.Any) -> bytes:
+        """Serialize a value as JSON."""
+        return self._encoder.encode(value)
+
+    def loads(self, data: bytes) -> t.Any:
+        """Deserialize a JSON value."""
+        return self._decoder.decode(data)
+
+
+class MsgPackCodec(Codec):
+    """Serialize JSON-compatible values as MessagePack."""
+
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        """Create reusable encoder & decoder."""
+        # Third Party
+        import msgspec
+
+        self._encoder = msgspec.msgpack.Encoder(enc_hook=_enc_hook)
+        self._decoder = msgspec.msgpack.Decoder()
+
+    def dumps(self, value: t.Any) -> bytes:
+        """Serialize a value as MessagePack."""
+        return self._encoder.encode(value)
+
+    def loads(self, data: bytes) -> t.Any:
+        """Deserialize a MessagePack value."""
+        return self._decoder.decode(data)
+
+
+def _compressor(
+    compression: CompressionName,
+) -> t.Tuple[t.Callable[[bytes], bytes], t.Callable[[bytes], bytes]]:
+    """Get compress & decompress functions for a compression algorithm."""
+    if compression == "zlib":
+        return (lambda data: zlib.compress(data, 1)), zlib.decompress
+    if compression == "brotli":
+        # Third Party
+        import brotli
+
+        return (lambda data: brotli.compress(data, quality=4)), brotli.decompress
+    if compression == "zstd":
+        # Third Party
+        import zstandard
+
+        compressor = zstandard.ZstdCompressor(level=3)
+        decompressor = zstandard.ZstdDecompressor()
+        return compressor.compress, decompressor.decompress
+    raise ValueError(f"Unsupported compression {compression!r}")
+
+
+class CompressedCodec(Codec):
+    """Compress values serialized by another codec, if they're at least `threshold` bytes."""
+
+    codec: Codec
+    compression: CompressionName
+    threshold: int
+
+    def __init__(self, codec: Codec, *, compression: CompressionName, threshold: int) -> None:
+        """Wrap `codec` with compression."""
+        self.codec = codec
+        self.compression = compression
+        self.threshold = threshold
+        self.name = f"{codec.name}+{compression}"
+        self._compress, self._decompress = _compressor(compression)
+
+    def __repr__(self) -> str:
+        """Represent codec by its serializer & compression."""
+        return "CompressedCodec({!r}, compression={!r}, threshold={!r})".format(
+            self.codec, self.compression, self.threshold
+        )
+
+    def dumps(self, value: t.Any) -> bytes:
+        """Serialize a value, compressing it if it's large enough."""
+        data = self.codec.dumps(value)
+        if len(data) >= self.threshold:
+            return COMPRESSED + self._compress(data)
+        return RAW + data
+
+    def loads(self, data: bytes) -> t.Any:
+        """Decompress a value if needed, and deserialize it."""
+        prefix, data = data[:1], data[1:]
+        if prefix == COMPRESSED:
+            return self.codec.loads(self._decompress(data))
+        if prefix == RAW:
+            return self.codec.loads(data)
+        raise ValueError("Value was not stored by a compressed codec")
+
+
+CODECS: t.Dict[str, t.Type[Codec]] = {
+    PickleCodec.name: PickleCodec,
+    JSONCodec.name: JSONCodec,
+    MsgPackCodec.name: MsgPackCodec,
+}
+
+
+@lru_cache
+def get_codec(
+    name: CodecName,
+    *,
+    compression: t.Optional[CompressionName] = None,
+    threshold: int = 0,
+) -> Codec:
+    """Get a codec by name, optionally compressing values of at least `threshold` bytes."""
+    codec = CODECS[name]()
+    if compression is None:
+        return codec
+    return CompressedCodec(codec, compression=compression, threshold=threshold)
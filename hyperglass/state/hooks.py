@@ -19,24 +19,26 @@ if t.TYPE_CHECKING:
     from hyperglass.models.config.devices import Devices
 
     # Local
-    from .redis import RedisManager
+    from .redis import RedisManager, AsyncRedisManager
 
 
 @lru_cache
-def _use_state(attr: t.Optional[str] = None) -> "HyperglassState":
-    """Get hyperglass state by property.
+def _use_state() -> "HyperglassState":
+    """Get the process-wide hyperglass state instance.
 
     Implemented separately due to typing issues related to lru_cache described here:
     https://github.com/python/mypy/issues/8356
     https://github.com/python/mypy/issues/9112
+
+    Only the state container itself is cached. Properties are resolved on every call so they
+    reflect the state snapshot's current generation.
     """
-    if attr is None:
-        return HyperglassState(settings=Settings)
-    if attr in ("cache", "redis"):
-        return HyperglassState(settings=Settings).cache
-    if attr in HyperglassState.properties():
-        return getattr(HyperglassState(settings=Settings), attr)
-    raise StateError("'{attr}' does not exist on HyperglassState", attr=attr)
+    return HyperglassState(settings=Settings)
+
+
+@lru_cache
+def _state_properties() -> t.Tuple[str, ...]:
+    return HyperglassState.properties()
 
 
 @t.overload
@@ -59,6 +61,11 @@ def use_state(attr: t.Literal["cache", "redis"]) -> "RedisManager":
     """Directly access hyperglass Redis cache manager."""
 
 
+@t.overload
+def use_state(attr: t.Literal["async_cache"]) -> "AsyncRedisManager":
+    """Directly access hyperglass asyncio Redis cache manager."""
+
+
 @t.overload
 def use_state(attr: t.Literal["directives"]) -> "Directives":
     """Access all hyperglass directives."""
@@ -74,4 +81,11 @@ def use_state(attr=None) -> "HyperglassState":
 
 def use_state(attr: t.Optional[str] = None) -> "HyperglassState":
     """Access global hyperglass state."""
-    return _use_state(attr)
+    state = _use_state()
+    if attr is None:
+        return state
+    if attr in ("cache", "redis"):
+        return state.cache
+    if attr in _state_properties():
+        return getattr(state, attr)
+    raise StateError("'{attr}' does not exist on HyperglassState", attr=attr)
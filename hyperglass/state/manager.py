@@ -10,7 +10,7 @@ from redis import Redis, ConnectionPool
 from hyperglass.util import repr_from_attrs
 
 # Local
-from .redis import RedisManager
+from .redis import RedisManager, AsyncRedisManager
 
 if t.TYPE_CHECKING:
     # Project
@@ -25,6 +25,7 @@ class StateManager:
 
     settings: "HyperglassSettings"
     redis: RedisManager
+    aredis: AsyncRedisManager
     _namespace: str = "hyperglass.state"
 
     def __init__(self, *, settings: "HyperglassSettings") -> None:
@@ -34,6 +35,9 @@ class StateManager:
         connection_pool = ConnectionPool.from_url(**self.settings.redis_connection_pool)
         redis = Redis(connection_pool=connection_pool)
         self.redis = RedisManager(instance=redis, namespace=self._namespace)
+        self.aredis = AsyncRedisManager(
+            **self.settings.redis_connection_pool, namespace=self._namespace
+        )
 
     def __repr__(self) -> str:
         """Represent state manager by name and namespace."""
@@ -0,0 +1,216 @@
+"""In-process query response cache & per-tier cache statistics."""
+
+# Standard Library
+import time
+import typing as t
+from collections import Counter, OrderedDict
+
+# Third Party
+import msgspec
+
+# Project
+from hyperglass.log import log
+
+# Local
+from .hooks import use_state
+
+if t.TYPE_CHECKING:
+    # Project
+    from hyperglass.models.data.columnar import RouteColumns
+
+    # Local
+    from .redis import AsyncRedisManager
+
+__all__ = (
+    "CacheStats",
+    "CachedQuery",
+    "LocalQueryCache",
+    "tier_hit_rates",
+    "use_cache_stats",
+    "use_local_cache",
+)
+
+CacheTier = t.Literal["local", "redis"]
+
+STATS_KEY = ("cache", "stats")
+
+# Minimum interval, in seconds, between writes of a worker's cache statistics to Redis.
+STATS_INTERVAL = 10.0
+
+
+class CachedQuery(t.NamedTuple):
+    """A query response held in memory."""
+
+    output: t.Union["RouteColumns", t.Dict[str, t.Any], str]
+    timestamp: t.Optional[str]
+    size: int
+    expires_at: float
+
+
+def _size(output: t.Union["RouteColumns", t.Dict[str, t.Any], str]) -> int:
+    """Approximate the memory used by a query response."""
+    if isinstance(output, str):
+        return len(output)
+    if hasattr(output, "nbytes"):
+        return output.nbytes
+    return len(msgspec.json.encode(output))
+
+
+class LocalQueryCache:
+    """Least-recently-used cache of query responses, in front of Redis.
+
+    Entries are bounded by count & approximate total size. An entry expires `ttl` seconds after
+    it was last read from or written to Redis, which is never later than the Redis entry itself
+    expires. All entries are dropped when the state generation changes, which happens when
+    configuration is published or the cache is cleared.
+    """
+
+    max_entries: int
+    max_bytes: int
+
+    def __init__(self, *, max_entries: int, max_bytes: int) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, CachedQuery]" = OrderedDict()
+        self._generation: t.Optional[int] = None
+
+    def __repr__(self) -> str:
+        """Represent cache by its limits & current usage."""
+        return "LocalQueryCache(max_entries={!r}, max_bytes={!r}, entries={!r})".format(
+            self.max_entries, self.max_bytes, len(self._entries)
+        )
+
+    def __len__(self) -> int:
+        """Get the number of cached responses."""
+        return len(self._entries)
+
+    def _sync(self, generation: int) -> None:
+        """Drop all entries if the state generation has changed."""
+        if generation != self._generation:
+            if self._entries:
+                log.bind(entries=len(self._entries)).debug("Dropping local query cache")
+            self.clear()
+            self._generation = generation
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def get(self, key: str, *, generation: int) -> t.Optional[CachedQuery]:
+        """Get an unexpired response, marking it as most recently used."""
+        self._sync(generation)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(
+        self,
+        key: str,
+        *,
+        output: t.Union["RouteColumns", t.Dict[str, t.Any], str],
+        timestamp: t.Optional[str],
+        ttl: float,
+        generation: int,
+    ) -> None:
+        """Cache a response for `ttl` seconds, evicting the least recently used as needed."""
+        self._sync(generation)
+        self._pop(key)
+        size = _size(output)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = CachedQuery(
+            output=output, timestamp=timestamp, size=size, expires_at=time.monotonic() + ttl
+        )
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self.size = 0
+
+
+class CacheStats:
+    """Count which cache tier served each query.
+
+    Counters are kept in memory & periodically added to totals in Redis, so that hit rates
+    include all worker processes.
+    """
+
+    TIERS: t.ClassVar[t.Tuple[str, ...]] = ("local", "redis", "miss")
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self.counts: Counter = Counter()
+        self._pending: Counter = Counter()
+        self._flushed_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        """Represent statistics by hit rates."""
+        return "CacheStats({})".format(
+            ", ".join(f"{tier}={rate:.2f}" for tier, rate in self.hit_rates().items())
+        )
+
+    def record(self, tier: t.Optional[CacheTier]) -> None:
+        """Count a query served by `tier`, or a cache miss if `tier` is `None`."""
+        self.counts[tier or "miss"] += 1
+        self._pending[tier or "miss"] += 1
+
+    def hit_rates(self) -> t.Dict[str, float]:
+        """Get the fraction of this worker's queries served by each tier."""
+        return tier_hit_rates(self.counts)
+
+    async def flush(self, redis: "AsyncRedisManager", *, force: bool = False) -> None:
+        """Add counters recorded since the last flush to the totals in Redis."""
+        if not self._pending or (
+            not force and time.monotonic() - self._flushed_at < STATS_INTERVAL
+        ):
+            return
+        pending, self._pending = self._pending, Counter()
+        self._flushed_at = time.monotonic()
+        name = redis.key(STATS_KEY)
+        async with redis.instance.pipeline(transaction=False) as pipeline:
+            for tier, count in pending.items():
+                pipeline.hincrby(name, tier, count)
+            await pipeline.execute()
+
+
+def tier_hit_rates(counts: t.Mapping[str, int]) -> t.Dict[str, float]:
+    """Get the fraction of queries served by each cache tier."""
+    total = sum(counts.get(tier, 0) for tier in CacheStats.TIERS)
+    return {tier: counts.get(tier, 0) / total if total else 0.0 for tier in CacheStats.TIERS}
+
+
+_local: t.Optional[LocalQueryCache] = None
+_stats = CacheStats()
+
+
+def use_local_cache() -> t.Optional[LocalQueryCache]:
+    """Get this process's local query cache, or `None` if the local cache is disabled.
+
+    If the local cache configuration has changed, a new, empty cache is created.
+    """
+    global _local
+    config = use_state("params").cache.local
+    if config.enable is False:
+        _local = None
+        return None
+    max_bytes = config.max_size * 1024 * 1024
+    if _local is None or (_local.max_entries, _local.max_bytes) != (config.max_entries, max_bytes):
+        _local = LocalQueryCache(max_entries=config.max_entries, max_bytes=max_bytes)
+    return _local
+
+
+def use_cache_stats() -> CacheStats:
+    """Get this process's cache statistics."""
+    return _stats
@@ -1,8 +1,10 @@
 """Interact with redis for state management."""
 
 # Standard Library
-import pickle
+import copy
 import typing as t
+import asyncio
+import weakref
 from types import TracebackType
 from typing import overload
 from datetime import datetime, timedelta
@@ -11,26 +13,24 @@ from datetime import datetime, timedelta
 from hyperglass.log import log
 from hyperglass.exceptions.private import StateError
 
+# Local
+from .codecs import Codec, CodecError, get_codec
+
 if t.TYPE_CHECKING:
     # Third Party
     from redis import Redis
     from redis.client import Pipeline
+    from redis.asyncio import Redis as AsyncRedis
 
 
-class RedisManager:
-    """Convenience wrapper for managing a redis session."""
+RedisManagerT = t.TypeVar("RedisManagerT", bound="BaseRedisManager")
 
-    instance: "Redis"
-    namespace: str
 
-    def __init__(self, instance: "Redis", namespace: str) -> None:
-        """Set up Redis connection and add configuration objects."""
-        self.instance = instance
-        self.namespace = namespace
+class BaseRedisManager:
+    """Namespaced key handling common to synchronous & asynchronous redis managers."""
 
-    def __repr__(self) -> str:
-        """Alias repr to Redis instance's repr."""
-        return repr(self.instance)
+    namespace: str
+    codec: Codec
 
     def __str__(self) -> str:
         """String-friendly redis manager."""
@@ -48,6 +48,30 @@ class RedisManager:
             return self._key_join(*key)
         return self._key_join(key)
 
+    def with_codec(self: RedisManagerT, codec: Codec) -> RedisManagerT:
+        """Get a manager that shares this manager's connections, but encodes values with `codec`."""
+        if codec is self.codec:
+            return self
+        manager = copy.copy(self)
+        manager.codec = codec
+        return manager
+
+
+class RedisManager(BaseRedisManager):
+    """Convenience wrapper for managing a redis session."""
+
+    instance: "Redis"
+
+    def __init__(self, instance: "Redis", namespace: str, codec: t.Optional[Codec] = None) -> None:
+        """Set up Redis connection and add configuration objects."""
+        self.instance = instance
+        self.namespace = namespace
+        self.codec = codec or get_codec("pickle")
+
+    def __repr__(self) -> str:
+        """Alias repr to Redis instance's repr."""
+        return repr(self.instance)
+
     def check(self) -> bool:
         """Ensure the redis instance is running and reachable."""
         result = self.instance.ping()
@@ -61,23 +85,42 @@ class RedisManager:
         """Delete a key and value from the cache."""
         self.instance.delete(self.key(key))
 
+    def delete_matching(self, pattern: str = "*", *, batch_size: int = 1000) -> int:
+        """Delete all keys in the namespace that match `pattern`, without blocking Redis.
+
+        Unlike `FLUSHDB`, keys outside the namespace, such as those of other applications
+        sharing the Redis database, are left intact.
+        """
+        deleted = 0
+        batch = []
+        for name in self.instance.scan_iter(match=self.key(pattern), count=batch_size):
+            batch.append(name)
+            if len(batch) >= batch_size:
+                deleted += self.instance.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += self.instance.unlink(*batch)
+        return deleted
+
     def expire(
         self,
         key: t.Union[str, t.Sequence[str]],
         *,
         expire_in: t.Optional[t.Union[timedelta, int]] = None,
         expire_at: t.Optional[t.Union[datetime, int]] = None,
+        nx: bool = False,
     ) -> None:
         """Expire a cache key, either at a time, or in a number of seconds.
 
-        If no at or in time is specified, the key is deleted.
+        If no at or in time is specified, the key is deleted. If `nx` is set, the expiration is
+        only set if the key doesn't already have one.
         """
         key = self.key(key)
         if isinstance(expire_at, (datetime, int)):
-            self.instance.expireat(key, expire_at)
+            self.instance.expireat(key, expire_at, nx=nx)
             return
         if isinstance(expire_in, (timedelta, int)):
-            self.instance.expire(key, expire_in)
+            self.instance.expire(key, expire_in, nx=nx)
             return
         self.instance.delete(key)
 
@@ -92,7 +135,7 @@ class RedisManager:
         name = self.key(key)
         value: t.Optional[bytes] = self.instance.get(name)
         if isinstance(value, bytes):
-            return pickle.loads(value)  # noqa
+            return self.codec.decode(value)
         if raise_if_none is True:
             raise StateError("'{key}' ('{name}') does not exist in Redis store", key=key, name=name)
         if value_if_none is not None:
@@ -102,7 +145,12 @@ class RedisManager:
     def set(self, key: t.Union[str, t.Sequence[str]], value: t.Any) -> None:
         """Add an object to the cache."""
         name = self.key(key)
-        self.instance.set(name, pickle.dumps(value))
+        self.instance.set(name, self.codec.encode(value))
+
+    def incr(self, key: t.Union[str, t.Sequence[str]]) -> int:
+        """Increment an integer counter, creating it if it doesn't exist."""
+        name = self.key(key)
+        return self.instance.incr(name)
 
     @overload
     def get_map(self, key: str, item: str) -> t.Any:
@@ -121,13 +169,13 @@ class RedisManager:
             value = self.instance.hgetall(name)
 
         if isinstance(value, bytes):
-            return pickle.loads(value)  # noqa
+            return self.codec.decode(value)
         return None
 
     def set_map_item(self, key: str, item: str, value: t.Any) -> None:
         """Add a value to a hash map (dict)."""
         name = self.key(key)
-        self.instance.hset(name, item, pickle.dumps(value))
+        self.instance.hset(name, item, self.codec.encode(value))
 
     def pipeline(self):
         """Enter a Redis Pipeline, but expose all the custom interaction methods."""
@@ -155,9 +203,10 @@ class RedisManager:
                 parent: "Redis",
                 instance: "Pipeline",
                 namespace: str,
+                codec: Codec,
             ) -> None:
                 pipeline_self.parent = parent
-                super().__init__(instance=instance, namespace=namespace)
+                super().__init__(instance=instance, namespace=namespace, codec=codec)
 
             def __enter__(
                 pipeline_self: "RedisManagerPipeline",  # noqa: N805 Avoid `self` namespace conflict
@@ -184,4 +233,213 @@ class RedisManager:
             parent=self.instance,
             instance=self.instance.pipeline(),
             namespace=self.namespace,
+            codec=self.codec,
+        )
+
+
+class AsyncRedisManager(BaseRedisManager):
+    """Convenience wrapper for managing an asyncio redis session.
+
+    Used on the request path, so that waiting on Redis doesn't block the event loop. Multi-field
+    lookups & stores are pipelined, so each takes a single round trip. Values that can't be
+    decoded by the manager's codec, for example because they were stored with a different
+    codec, are treated as missing.
+    """
+
+    url: str
+    max_connections: int
+
+    def __init__(
+        self,
+        *,
+        url: str,
+        max_connections: int,
+        namespace: str,
+        codec: t.Optional[Codec] = None,
+    ) -> None:
+        """Set up connection parameters; connections are opened on first use."""
+        self.url = url
+        self.max_connections = max_connections
+        self.namespace = namespace
+        self.codec = codec or get_codec("pickle")
+        # asyncio connections are bound to the event loop they were created in, so each event
+        # loop gets its own client & connection pool.
+        self._instances: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRedis]" = (
+            weakref.WeakKeyDictionary()
         )
+
+    def __repr__(self) -> str:
+        """Represent async redis manager by its namespace & codec."""
+        return "AsyncRedisManager(namespace={!r}, codec={!r})".format(self.namespace, self.codec)
+
+    def _decode(self, name: str, value: bytes) -> t.Tuple[bool, t.Any]:
+        """Decode a value, returning whether it could be decoded & the decoded value."""
+        try:
+            return True, self.codec.decode(value)
+        except CodecError as err:
+            log.bind(key=name, error=str(err)).debug("Ignoring undecodable cached value")
+            return False, None
+
+    @property
+    def instance(self) -> "AsyncRedis":
+        """Get the redis client for the running event loop."""
+        # Third Party
+        from redis.asyncio import Redis as AsyncRedis
+        from redis.asyncio import ConnectionPool as AsyncConnectionPool
+
+        loop = asyncio.get_running_loop()
+        instance = self._instances.get(loop)
+        if instance is None:
+            pool = AsyncConnectionPool.from_url(url=self.url, max_connections=self.max_connections)
+            instance = AsyncRedis(connection_pool=pool)
+            self._instances[loop] = instance
+        return instance
+
+    async def check(self) -> bool:
+        """Ensure the redis instance is running and reachable."""
+        result = await self.instance.ping()
+        if result is False:
+            raise RuntimeError("Redis instance {!r} is not running or reachable".format(self))
+        return result
+
+    async def close(self) -> None:
+        """Close the running event loop's redis client & its connections."""
+        instance = self._instances.pop(asyncio.get_running_loop(), None)
+        if instance is not None:
+            await instance.close(close_connection_pool=True)
+
+    async def get(
+        self,
+        key: t.Union[str, t.Sequence[str]],
+        *,
+        raise_if_none: bool = False,
+        value_if_none: t.Any = None,
+    ) -> t.Union[None, t.Any]:
+        """Get and decode a value from the cache."""
+        name = self.key(key)
+        value: t.Optional[bytes] = await self.instance.get(name)
+        if isinstance(value, bytes):
+            decoded, value = self._decode(name, value)
+            if decoded:
+                return value
+        if raise_if_none is True:
+            raise StateError("'{key}' ('{name}') does not exist in Redis store", key=key, name=name)
+        if value_if_none is not None:
+            return value_if_none
+        return None
+
+    async def set(self, key: t.Union[str, t.Sequence[str]], value: t.Any) -> None:
+        """Add an object to the cache."""
+        await self.instance.set(self.key(key), self.codec.encode(value))
+
+    async def delete(self, key: t.Union[str, t.Sequence[str]]) -> None:
+        """Delete a key and value from the cache."""
+        await self.instance.delete(self.key(key))
+
+    async def expire(
+        self, key: t.Union[str, t.Sequence[str]], *, expire_in: t.Union[timedelta, int]
+    ) -> None:
+        """Expire a cache key in a number of seconds."""
+        await self.instance.expire(self.key(key), expire_in)
+
+    async def get_map_items(
+        self,
+        key: str,
+        *items: str,
+        expire_in: t.Optional[t.Union[timedelta, int]] = None,
+    ) -> t.Dict[str, t.Any]:
+        """Get values from a Redis hash map in a single round trip.
+
+        If `expire_in` is set, the hash map's expiration is reset in the same round trip. Items
+        that don't exist are omitted from the result.
+        """
+        (result,) = await self.get_many_map_items((key,), *items, expire_in=expire_in)
+        return result
+
+    async def get_many_map_items(
+        self,
+        keys: t.Sequence[str],
+        *items: str,
+        expire_in: t.Optional[t.Union[timedelta, int]] = None,
+    ) -> t.List[t.Dict[str, t.Any]]:
+        """Get the same values from several Redis hash maps in a single round trip.
+
+        Results are in the same order as `keys`. If `expire_in` is set, each hash map's expiration
+        is reset in the same round trip. Items that don't exist are omitted from each result.
+        """
+        names = [self.key(key) for key in keys]
+        if not names:
+            return []
+        async with self.instance.pipeline(transaction=False) as pipeline:
+            for name in names:
+                pipeline.hmget(name, items)
+                if expire_in is not None:
+                    pipeline.expire(name, expire_in)
+            responses = await pipeline.execute()
+        step = 1 if expire_in is None else 2
+        results = []
+        for name, values in zip(names, responses[::step]):
+            result = {}
+            for item, value in zip(items, values):
+                if isinstance(value, bytes):
+                    decoded, value = self._decode(name, value)
+                    if decoded:
+                        result[item] = value
+            results.append(result)
+        return results
+
+    async def get_map(self, key: str, item: t.Optional[str] = None) -> t.Any:
+        """Get a Redis hash map or hash map value."""
+        name = self.key(key)
+        if isinstance(item, str):
+            value = await self.instance.hget(name, item)
+            if isinstance(value, bytes):
+                return self._decode(name, value)[1]
+            return None
+        values = await self.instance.hgetall(name)
+        result = {}
+        for item_name, value in values.items():
+            decoded, value = self._decode(name, value)
+            if decoded:
+                result[item_name.decode()] = value
+        return result
+
+    async def set_map(
+        self,
+        key: str,
+        items: t.Dict[str, t.Any],
+        *,
+        expire_in: t.Optional[t.Union[timedelta, int]] = None,
+        nx: bool = False,
+    ) -> None:
+        """Add values to a Redis hash map in a single round trip, optionally setting its expiry.
+
+        If `nx` is set, the expiration is only set if the hash map doesn't already have one.
+        """
+        await self.set_many_maps({key: items}, expire_in=expire_in, nx=nx)
+
+    async def set_many_maps(
+        self,
+        maps: t.Dict[str, t.Dict[str, t.Any]],
+        *,
+        expire_in: t.Optional[t.Union[timedelta, int]] = None,
+        nx: bool = False,
+    ) -> None:
+        """Add values to several Redis hash maps in a single round trip.
+
+        If `expire_in` is set, each hash map's expiration is set in the same round trip. If `nx` is
+        set, each expiration is only set if the hash map doesn't already have one.
+        """
+        if not maps:
+            return
+        async with self.instance.pipeline(transaction=False) as pipeline:
+            for key, items in maps.items():
+                name = self.key(key)
+                pipeline.hset(name, mapping={k: self.codec.encode(v) for k, v in items.items()})
+                if expire_in is not None:
+                    pipeline.expire(name, expire_in, nx=nx)
+            await pipeline.execute()
+
+    async def set_map_item(self, key: str, item: str, value: t.Any) -> None:
+        """Add a value to a hash map (dict)."""
+        await self.instance.hset(self.key(key), item, self.codec.encode(value))
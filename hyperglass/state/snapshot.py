@@ -0,0 +1,101 @@
+"""Per-process snapshot of deserialized state objects."""
+
+# Standard Library
+import time
+import typing as t
+import threading
+
+if t.TYPE_CHECKING:
+    # Local
+    from .redis import RedisManager
+
+GENERATION_KEY = "generation"
+
+
+class StateSnapshot:
+    """Keep deserialized state objects in memory until the state generation changes.
+
+    Every write of configuration objects to Redis increments a generation counter. Instead of
+    fetching & unpickling an object on every access, each process keeps the deserialized object
+    and only checks the (tiny) generation counter at most once per `check_interval` seconds. When
+    the counter changes, all objects are dropped and lazily reloaded on next access.
+    """
+
+    redis: "RedisManager"
+    check_interval: float
+
+    def __init__(self, redis: "RedisManager", *, check_interval: float = 1.0) -> None:
+        """Initialize an empty snapshot."""
+        self.redis = redis
+        self.check_interval = check_interval
+        self._objects: t.Dict[str, t.Any] = {}
+        self._staged: t.Dict[str, t.Any] = {}
+        self._generation: t.Optional[int] = None
+        self._checked_at: float = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """Represent snapshot by generation & loaded keys."""
+        return "StateSnapshot(generation={!r}, keys={!r})".format(
+            self._generation, tuple(self._objects.keys())
+        )
+
+    def _current_generation(self) -> int:
+        value = self.redis.instance.get(self.redis.key(GENERATION_KEY))
+        if value is None:
+            return 0
+        return int(value)
+
+    def _check(self) -> None:
+        """Drop all objects if the generation has changed since the last check."""
+        now = time.monotonic()
+        if self._generation is not None and now - self._checked_at < self.check_interval:
+            return
+        generation = self._current_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._objects = {}
+                self._generation = generation
+            self._checked_at = now
+
+    @property
+    def generation(self) -> int:
+        """Get the state generation this snapshot reflects."""
+        self._check()
+        return self._generation
+
+    def get(
+        self,
+        key: t.Union[str, t.Sequence[str]],
+        *,
+        raise_if_none: bool = False,
+        value_if_none: t.Any = None,
+    ) -> t.Any:
+        """Get a deserialized object, loading it from Redis only if it isn't already loaded."""
+        name = self.redis.key(key)
+        if name in self._staged:
+            return self._staged[name]
+        self._check()
+        try:
+            return self._objects[name]
+        except KeyError:
+            pass
+        value = self.redis.get(key, raise_if_none=raise_if_none)
+        if value is None:
+            return value_if_none
+        with self._lock:
+            self._objects[name] = value
+        return value
+
+    def stage(self, **objects: t.Any) -> None:
+        """Serve objects that have not been written to Redis yet, until the next invalidation."""
+        with self._lock:
+            self._staged.update({self.redis.key(key): value for key, value in objects.items()})
+
+    def invalidate(self) -> None:
+        """Drop all objects and force a generation check on next access."""
+        with self._lock:
+            self._objects = {}
+            self._staged = {}
+            self._generation = None
+            self._checked_at = 0.0
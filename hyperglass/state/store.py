@@ -1,79 +1,148 @@
 """Primary state container."""
 
 # Standard Library
+import time
 import typing as t
+from contextlib import contextmanager
 
 # Local
 from .manager import StateManager
+from .snapshot import GENERATION_KEY, StateSnapshot
 
 if t.TYPE_CHECKING:
     # Project
     from hyperglass.models.ui import UIParameters
+    from hyperglass.models.system import HyperglassSettings
     from hyperglass.plugins._base import HyperglassPlugin
     from hyperglass.models.directive import Directive, Directives
     from hyperglass.models.config.params import Params
     from hyperglass.models.config.devices import Devices
 
     # Local
-    from .manager import RedisManager
+    from .redis import RedisManager, AsyncRedisManager
 
 
 PluginT = t.TypeVar("PluginT", bound="HyperglassPlugin")
 
+# Keys of configuration objects, as opposed to cached data such as query output.
+CONFIG_KEYS = ("params", "devices", "directives", "ui_params", "plugins.*")
+
 
 class HyperglassState(StateManager):
     """Primary hyperglass state container."""
 
+    snapshot: StateSnapshot
+
+    def __init__(self, *, settings: "HyperglassSettings") -> None:
+        """Set up Redis connection and the in-process state snapshot."""
+        super().__init__(settings=settings)
+        self.snapshot = StateSnapshot(self.redis)
+        self._staged: t.Optional[t.Dict[str, t.Any]] = None
+
     def add_plugin(self, _type: str, plugin: "HyperglassPlugin") -> None:
         """Add a plugin to its list by type."""
         current = self.plugins(_type)
-        self.redis.set(("plugins", _type), list({*current, plugin}))
+        self.publish(**{f"plugins.{_type}": list({*current, plugin})})
 
     def remove_plugin(self, _type: str, plugin: "HyperglassPlugin") -> None:
         """Remove a plugin from its list by type."""
         current = self.plugins(_type)
         plugins = {p for p in current if p != plugin}
-        self.redis.set(("plugins", _type), list(plugins))
+        self.publish(**{f"plugins.{_type}": list(plugins)})
 
     def reset_plugins(self, _type: str) -> None:
         """Remove all plugins of `_type`."""
-        self.redis.set(("plugins", _type), [])
+        self.publish(**{f"plugins.{_type}": []})
 
     def add_directive(self, *directives: t.Union["Directive", t.Dict[str, t.Any]]) -> None:
         """Add a directive."""
+        # The snapshot's directives may be in use elsewhere, so they're copied before adding.
         current = self.directives
-        current.add(*directives, unique_by="id")
-        self.redis.set("directives", current)
+        updated = current.__class__(*current)
+        updated.add(*directives, unique_by="id")
+        self.publish(directives=updated)
+
+    def publish(self, **objects: t.Any) -> None:
+        """Write state objects to Redis and advance the state generation.
+
+        Other processes drop their snapshot once they see the new generation; this process drops
+        its snapshot immediately so subsequent reads reflect the written objects. Within a
+        `transaction`, objects are only written when the transaction ends.
+        """
+        if self._staged is not None:
+            self._staged.update(objects)
+            self.snapshot.stage(**objects)
+            return
+        with self.redis.pipeline() as pipeline:
+            for key, value in objects.items():
+                pipeline.set(key, value)
+            pipeline.incr(GENERATION_KEY)
+        self.snapshot.invalidate()
+
+    @contextmanager
+    def transaction(self) -> t.Generator[None, None, None]:
+        """Publish all objects published within the context in a single Redis transaction.
+
+        Published objects are visible to this process immediately, but other processes see
+        either none or all of them, under a single new generation. If an exception is raised,
+        nothing is written.
+        """
+        staged: t.Dict[str, t.Any] = {}
+        self._staged = staged
+        try:
+            yield
+        finally:
+            self._staged = None
+            self.snapshot.invalidate()
+        self.publish(**staged)
+
+    def _new_generation(self) -> None:
+        # Start a generation no process has seen, so every process drops its in-memory state
+        # & cached query responses.
+        self.redis.instance.set(self.redis.key(GENERATION_KEY), time.time_ns())
+        self.snapshot.invalidate()
 
     def clear(self) -> None:
-        """Delete all cache keys."""
-        self.redis.instance.flushdb(asynchronous=True)
+        """Delete all hyperglass keys, including cached query output."""
+        self.redis.delete_matching("*")
+        self._new_generation()
+
+    def clear_config(self) -> None:
+        """Delete configuration & plugin keys, leaving cached data intact."""
+        for pattern in CONFIG_KEYS:
+            self.redis.delete_matching(pattern)
+        self._new_generation()
 
     @property
     def cache(self) -> "RedisManager":
         """Get the redis manager instance."""
         return self.redis
 
+    @property
+    def async_cache(self) -> "AsyncRedisManager":
+        """Get the asyncio redis manager for the request path, using the configured cache codec."""
+        return self.aredis.with_codec(self.params.cache.query_codec)
+
     @property
     def params(self) -> "Params":
         """Get hyperglass configuration parameters (`hyperglass.yaml`)."""
-        return self.redis.get("params", raise_if_none=True)
+        return self.snapshot.get("params", raise_if_none=True)
 
     @property
     def devices(self) -> "Devices":
         """Get hyperglass devices (`devices.yaml`)."""
-        return self.redis.get("devices", raise_if_none=True)
+        return self.snapshot.get("devices", raise_if_none=True)
 
     @property
     def ui_params(self) -> "UIParameters":
         """UI parameters, built from params."""
-        return self.redis.get("ui_params", raise_if_none=True)
+        return self.snapshot.get("ui_params", raise_if_none=True)
 
     @property
     def directives(self) -> "Directives":
         """All directives."""
-        return self.redis.get("directives", raise_if_none=True)
+        return self.snapshot.get("directives", raise_if_none=True)
 
     def plugins(self, _type: str) -> t.List[PluginT]:
         """Get plugins by type."""
-        return self.redis.get(("plugins", _type), raise_if_none=False, value_if_none=[])
+        return self.snapshot.get(("plugins", _type), raise_if_none=False, value_if_none=[])
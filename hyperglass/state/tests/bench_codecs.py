@@ -0,0 +1,94 @@
+"""Benchmark size, encode & decode time of cache codecs on large route tables.
+
+Run with:
+
+    python3 -m hyperglass.state.tests.bench_codecs
+"""
+
+# Standard Library
+import time
+import random
+import typing as t
+
+# Local
+from ..codecs import Codec, get_codec
+
+ROUTE_COUNTS = (100, 1000, 5000)
+ROUNDS = 20
+THRESHOLD = 16384
+
+CODECS = (
+    ("pickle", None),
+    ("json", None),
+    ("msgpack", None),
+    ("pickle", "zlib"),
+    ("json", "zlib"),
+    ("msgpack", "zlib"),
+    ("json", "brotli"),
+    ("msgpack", "brotli"),
+    ("json", "zstd"),
+    ("msgpack", "zstd"),
+)
+
+
+def _route_table(count: int) -> t.Dict[str, t.Any]:
+    """Build output shaped like `BGPRouteTable.export_dict()` for a community query."""
+    rand = random.Random(count)
+    routes = [
+        {
+            "prefix": f"10.{i // 256 % 256}.{i % 256}.0/24",
+            "active": i % 3 == 0,
+            "age": rand.randint(60, 10_000_000),
+            "weight": 0,
+            "med": rand.choice((0, 10, 100)),
+            "local_preference": rand.choice((100, 150, 200)),
+            "as_path": [rand.randint(1, 400_000) for _ in range(rand.randint(1, 8))],
+            "communities": [
+                f"{rand.randint(1, 65535)}:{rand.randint(1, 65535)}"
+                for _ in range(rand.randint(0, 12))
+            ],
+            "next_hop": f"192.0.2.{i % 250 + 1}",
+            "source_as": rand.randint(1, 400_000),
+            "source_rid": f"198.51.100.{i % 250 + 1}",
+            "peer_rid": f"203.0.113.{i % 250 + 1}",
+            "rpki_state": rand.randint(0, 3),
+        }
+        for i in range(count)
+    ]
+    return {"vrf": "default", "count": count, "routes": routes, "winning_weight": "high"}
+
+
+def _measure(codec: Codec, value: t.Any) -> t.Tuple[int, float, float]:
+    encoded = codec.encode(value)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        codec.encode(value)
+    encode_ms = (time.perf_counter() - start) / ROUNDS * 1000
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        codec.decode(encoded)
+    decode_ms = (time.perf_counter() - start) / ROUNDS * 1000
+    return len(encoded), encode_ms, decode_ms
+
+
+def main() -> None:
+    """Compare each codec on route tables of increasing size."""
+    for count in ROUTE_COUNTS:
+        table = _route_table(count)
+        print(f"routes: {count}")
+        for name, compression in CODECS:
+            label = name if compression is None else f"{name}+{compression}"
+            try:
+                codec = get_codec(name, compression=compression, threshold=THRESHOLD)
+            except ImportError:
+                print(f"  {label:<16} (not installed)")
+                continue
+            size, encode_ms, decode_ms = _measure(codec, table)
+            print(
+                f"  {label:<16} {size / 1024:>9.1f} KiB"
+                f"  encode {encode_ms:>7.2f} ms  decode {decode_ms:>7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
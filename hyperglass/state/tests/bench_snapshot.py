@@ -0,0 +1,76 @@
+"""Benchmark per-request state access cost with & without the in-process snapshot.
+
+Requires a running Redis instance. Run with:
+
+    python3 -m hyperglass.state.tests.bench_snapshot
+"""
+
+# Standard Library
+import time
+import typing as t
+
+# Project
+from hyperglass.state import use_state
+from hyperglass.configuration import init_ui_params
+from hyperglass.models.directive import Directives
+from hyperglass.models.config.params import Params
+from hyperglass.models.config.devices import Devices
+
+DEVICE_COUNT = 800
+REQUESTS = 200
+
+# Approximate number of state property accesses made while serving one `/api/query` request.
+ACCESSES_PER_REQUEST = (
+    ("params", 8),
+    ("devices", 4),
+    ("directives", 1),
+)
+
+
+def _devices(count: int) -> t.List[t.Dict[str, t.Any]]:
+    return [
+        {
+            "name": f"router{i:04d}",
+            "address": f"192.0.2.{i % 250 + 1}",
+            "credential": {"username": "", "password": ""},
+            "platform": "juniper",
+            "attrs": {"source4": "192.0.2.1", "source6": "2001:db8::1"},
+            "directives": ["juniper_bgp_route"],
+        }
+        for i in range(count)
+    ]
+
+
+def _measure(func: t.Callable[[str], t.Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        for attr, count in ACCESSES_PER_REQUEST:
+            for _ in range(count):
+                func(attr)
+    return (time.perf_counter() - start) / REQUESTS * 1000
+
+
+def main() -> None:
+    """Publish a large configuration and compare state access strategies."""
+    state = use_state()
+    params = Params()
+    directives = Directives.new(
+        {"juniper_bgp_route": {"name": "BGP Route", "field": {"description": "test"}}}
+    )
+    state.publish(params=params, directives=directives)
+    devices = Devices(*_devices(DEVICE_COUNT))
+    state.publish(devices=devices, ui_params=init_ui_params(params=params, devices=devices))
+
+    try:
+        redis_ms = _measure(lambda attr: state.redis.get(attr, raise_if_none=True))
+        snapshot_ms = _measure(lambda attr: getattr(state, attr))
+    finally:
+        state.clear()
+
+    print(f"devices: {DEVICE_COUNT}, requests: {REQUESTS}")
+    print(f"redis get + unpickle: {redis_ms:.3f} ms/request")
+    print(f"in-process snapshot:  {snapshot_ms:.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
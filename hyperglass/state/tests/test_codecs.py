@@ -0,0 +1,73 @@
+"""Test cache serialization codecs."""
+
+# Standard Library
+import asyncio
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.config.cache import Cache
+from hyperglass.models.config.params import Params
+
+# Local
+from ..hooks import use_state
+from ..codecs import RAW, COMPRESSED, CodecError, get_codec
+
+OUTPUT = {
+    "vrf": "default",
+    "count": 2,
+    "routes": [
+        {"prefix": "192.0.2.0/24", "as_path": [65000, 65001], "communities": ["65000:1"]},
+        {"prefix": "198.51.100.0/24", "as_path": [65000], "communities": []},
+    ],
+    "winning_weight": "high",
+}
+
+
+@pytest.mark.parametrize("name", ("pickle", "json", "msgpack"))
+@pytest.mark.parametrize("compression", (None, "zlib", "brotli"))
+def test_round_trip(name, compression):
+    codec = get_codec(name, compression=compression, threshold=64)
+    for value in (OUTPUT, "plain text output", "2024-01-01 00:00:00"):
+        assert codec.decode(codec.encode(value)) == value
+
+
+def test_compression_threshold():
+    codec = get_codec("json", compression="zlib", threshold=64)
+    assert codec.encode("short").startswith(RAW)
+    assert codec.encode(OUTPUT).startswith(COMPRESSED)
+    large = {"routes": [OUTPUT] * 100}
+    assert len(codec.encode(large)) < len(get_codec("json").encode(large))
+
+
+def test_mismatched_codec():
+    stored = get_codec("pickle").encode(OUTPUT)
+    for codec in (get_codec("json"), get_codec("msgpack", compression="zlib")):
+        with pytest.raises(CodecError):
+            codec.decode(stored)
+
+
+def test_async_cache_codec(state):
+    state.publish(params=Params(cache=Cache(codec="json", compression="zlib")))
+
+    async def run():
+        cache = use_state("async_cache")
+        assert cache.codec is get_codec("json", compression="zlib", threshold=16384)
+        await cache.set_map("codec-test", {"output": OUTPUT, "timestamp": "now"}, expire_in=10)
+        assert await cache.get_map_items("codec-test", "output", "timestamp") == {
+            "output": OUTPUT,
+            "timestamp": "now",
+        }
+        # Values stored with another codec are treated as missing.
+        await cache.with_codec(get_codec("pickle")).set_map_item("codec-test", "output", OUTPUT)
+        assert await cache.get_map_items("codec-test", "output", "timestamp") == {
+            "timestamp": "now"
+        }
+        await cache.delete("codec-test")
+        await cache.close()
+
+    try:
+        asyncio.run(run())
+    finally:
+        state.clear()
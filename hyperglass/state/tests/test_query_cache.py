@@ -0,0 +1,80 @@
+"""Test in-process query response cache."""
+
+# Standard Library
+import time
+import asyncio
+
+# Local
+from ..hooks import use_state
+from ..query_cache import STATS_KEY, CacheStats, LocalQueryCache, tier_hit_rates
+
+
+def _put(cache: LocalQueryCache, key: str, output: str, *, ttl: float = 60, generation: int = 1):
+    cache.put(key, output=output, timestamp="now", ttl=ttl, generation=generation)
+
+
+def test_lru_eviction():
+    cache = LocalQueryCache(max_entries=2, max_bytes=1024)
+    _put(cache, "one", "1")
+    _put(cache, "two", "2")
+    assert cache.get("one", generation=1).output == "1"
+    _put(cache, "three", "3")
+    assert cache.get("two", generation=1) is None
+    assert cache.get("one", generation=1) is not None
+    assert cache.get("three", generation=1) is not None
+
+
+def test_size_limit():
+    cache = LocalQueryCache(max_entries=10, max_bytes=10)
+    _put(cache, "one", "x" * 6)
+    _put(cache, "two", "x" * 6)
+    assert len(cache) == 1
+    assert cache.size == 6
+    _put(cache, "large", "x" * 11)
+    assert cache.get("large", generation=1) is None
+    assert cache.get("two", generation=1) is not None
+
+
+def test_expiry():
+    cache = LocalQueryCache(max_entries=10, max_bytes=1024)
+    _put(cache, "one", "1", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("one", generation=1) is None
+    assert cache.size == 0
+
+
+def test_generation():
+    cache = LocalQueryCache(max_entries=10, max_bytes=1024)
+    _put(cache, "one", {"routes": []})
+    assert cache.get("one", generation=2) is None
+    assert len(cache) == 0
+
+
+def test_clear_changes_generation():
+    state = use_state()
+    state.clear()
+    before = state.snapshot.generation
+    state.clear()
+    assert state.snapshot.generation != before
+
+
+def test_stats():
+    stats = CacheStats()
+    for tier in ("local", "local", "redis", None):
+        stats.record(tier)
+    assert stats.hit_rates() == {"local": 0.5, "redis": 0.25, "miss": 0.25}
+
+    state = use_state()
+    state.clear()
+
+    async def run():
+        cache = state.aredis
+        await stats.flush(cache, force=True)
+        counts = await cache.instance.hgetall(cache.key(STATS_KEY))
+        await cache.close()
+        return {key.decode(): int(value) for key, value in counts.items()}
+
+    try:
+        assert tier_hit_rates(asyncio.run(run())) == stats.hit_rates()
+    finally:
+        state.clear()
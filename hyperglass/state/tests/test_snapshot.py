@@ -0,0 +1,53 @@
+"""Test in-process state snapshot."""
+
+# Standard Library
+import typing as t
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.config.params import Params
+
+# Local
+from ..hooks import use_state
+from ..snapshot import GENERATION_KEY
+
+
+@pytest.fixture
+def params() -> t.Dict[str, t.Any]:
+    """Publish a site title that tests can change."""
+    return {"site_title": "first"}
+
+
+def test_snapshot_reuses_objects(state, monkeypatch):
+    first = state.params
+    calls = []
+    original = state.redis.get
+
+    def counting_get(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(state.redis, "get", counting_get)
+    for _ in range(10):
+        assert state.params is first
+        assert use_state("params") is first
+    assert len(calls) == 0, "Snapshot should not read from Redis for loaded objects"
+
+
+def test_snapshot_publish_invalidates(state):
+    assert state.params.site_title == "first"
+    state.publish(params=Params(site_title="second"))
+    assert state.params.site_title == "second"
+    assert use_state("params").site_title == "second"
+
+
+def test_snapshot_external_generation(state):
+    state.snapshot.check_interval = 0
+    first = state.params
+    # Simulate another process writing new params.
+    state.redis.set("params", Params(site_title="external"))
+    assert state.params is first
+    state.redis.incr(GENERATION_KEY)
+    assert state.params.site_title == "external"
@@ -0,0 +1,114 @@
+"""Test state store transactions & scoped clearing."""
+
+# Standard Library
+import typing as t
+import asyncio
+
+# Third Party
+import pytest
+
+# Project
+from hyperglass.models.directive import Directives
+from hyperglass.models.config.params import Params
+
+# Local
+from ..snapshot import GENERATION_KEY
+
+
+@pytest.fixture
+def params() -> t.Dict[str, t.Any]:
+    """Publish a site title that tests can change."""
+    return {"site_title": "first"}
+
+
+def test_transaction(state):
+    generation = state.snapshot.generation
+    with state.transaction():
+        state.publish(params=Params(site_title="second"))
+        # Visible to this process, but not yet written.
+        assert state.params.site_title == "second"
+        assert state.redis.get("params").site_title == "first"
+        state.publish(**{"plugins.input": []})
+    assert state.redis.get("params").site_title == "second"
+    assert state.snapshot.generation == generation + 1
+
+
+def test_transaction_error(state):
+    with pytest.raises(RuntimeError):
+        with state.transaction():
+            state.publish(params=Params(site_title="second"))
+            raise RuntimeError("Invalid configuration")
+    assert state.params.site_title == "first"
+
+
+def test_add_directive(state):
+    state.publish(
+        directives=Directives({"id": "one", "name": "One", "field": {"description": "one"}})
+    )
+    current = state.directives
+    state.add_directive({"id": "two", "name": "Two", "field": {"description": "two"}})
+    # Directives already read aren't changed.
+    assert current.ids == ("one",)
+    assert state.directives.ids == ("one", "two")
+
+
+def test_clear_config(state):
+    state.redis.set_map_item("query.test", "output", "cached")
+    state.publish(**{"plugins.output": []})
+    state.clear_config()
+    assert state.redis.get("params") is None
+    assert state.redis.get("plugins.output") is None
+    assert state.redis.get_map("query.test", "output") == "cached"
+
+
+def test_clear_is_namespaced(state):
+    state.redis.instance.set("other.application", "value")
+    try:
+        state.redis.set_map_item("query.test", "output", "cached")
+        state.clear()
+        assert state.redis.get_map("query.test", "output") is None
+        assert state.redis.get("params") is None
+        assert state.redis.instance.get(state.redis.key(GENERATION_KEY)) is not None
+        assert state.redis.instance.get("other.application") == b"value"
+    finally:
+        state.redis.instance.delete("other.application")
+
+
+def test_get_many_map_items(state):
+    async def run():
+        cache = state.async_cache
+        await cache.set_map("query.one", {"output": "one", "timestamp": "now"})
+        await cache.set_map("query.two", {"output": "two"})
+        try:
+            assert await cache.get_many_map_items(
+                ("query.two", "query.missing", "query.one"), "output", "timestamp", expire_in=10
+            ) == [{"output": "two"}, {}, {"output": "one", "timestamp": "now"}]
+            assert await cache.instance.ttl(cache.key("query.one")) == 10
+            assert await cache.get_many_map_items((), "output") == []
+        finally:
+            await cache.delete("query.one")
+            await cache.delete("query.two")
+            await cache.close()
+
+    asyncio.run(run())
+
+
+def test_set_many_maps(state):
+    async def run():
+        cache = state.async_cache
+        try:
+            await cache.set_many_maps(
+                {"query.one": {"output": "one"}, "query.two": {"output": "two"}}, expire_in=10
+            )
+            assert await cache.get_many_map_items(("query.one", "query.two"), "output") == [
+                {"output": "one"},
+                {"output": "two"},
+            ]
+            assert await cache.instance.ttl(cache.key("query.two")) == 10
+            await cache.set_many_maps({})
+        finally:
+            await cache.delete("query.one")
+            await cache.delete("query.two")
+            await cache.close()
+
+    asyncio.run(run())
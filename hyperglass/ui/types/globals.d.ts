@@ -44,7 +44,11 @@ export declare global {
   type QueryResponse = {
     random: string;
     cached: boolean;
+    cache_tier: 'local' | 'redis' | null;
+    stale: boolean;
     runtime: number;
+    queue_depth: number;
+    queue_time: number;
     level: ResponseLevel;
     timestamp: string;
     keywords: string[];